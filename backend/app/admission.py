@@ -0,0 +1,252 @@
+# app/admission.py
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+# Requests in flight across both tiers before anyone has to queue. Sync
+# routes run in the threadpool, so keep this at or below its size (40).
+ADMISSION_CAPACITY = int(os.environ.get("ADMISSION_CAPACITY", "32"))
+
+TIER_BY_PATH = {
+    "/pattern/basic": "basic",
+    "/pattern/pro": "pro",
+    "/pattern/basic/sweep": "basic",
+    "/pattern/pro/sweep": "pro",
+}
+
+# Recent queue times kept per tier for percentiles.
+QUEUE_TIME_SAMPLES = 1024
+
+
+class Shed(Exception):
+    """
+    Raised when a request is not admitted; carries the reason and a
+    Retry-After hint in seconds.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TierPolicy:
+    """
+    Admission rules for one tier.
+
+    priority: lower is served first when a slot frees up.
+    max_queue: waiters allowed before new arrivals are shed.
+    queue_timeout: seconds a request may wait before it is considered stale.
+    reserve: slots this tier must leave free for higher-priority tiers.
+    """
+
+    def __init__(self, priority: int, max_queue: int, queue_timeout: float, reserve: int = 0):
+        self.priority = priority
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.reserve = reserve
+
+
+def default_policies(capacity: int) -> Dict[str, TierPolicy]:
+    return {
+        "pro": TierPolicy(priority=0, max_queue=capacity * 4, queue_timeout=2.0),
+        "basic": TierPolicy(
+            priority=1,
+            max_queue=capacity,
+            queue_timeout=0.5,
+            reserve=max(1, capacity // 4),
+        ),
+    }
+
+
+class AdmissionController:
+    """
+    Shared pool of request slots with per-tier queues.
+
+    When a slot frees up it goes to the highest-priority waiter. BASIC also
+    has to leave `reserve` slots free for PRO, and a BASIC arrival is shed
+    immediately while PRO requests are already waiting. Under overload BASIC
+    is turned away first and PRO keeps the capacity.
+
+    Runs entirely on the event loop, so it needs no locks.
+    """
+
+    def __init__(self, capacity: int = ADMISSION_CAPACITY, policies: Optional[Dict[str, TierPolicy]] = None):
+        self.capacity = capacity
+        self.policies = policies or default_policies(capacity)
+        self.in_flight = 0
+        self._order = sorted(self.policies, key=lambda t: self.policies[t].priority)
+        self._waiters = {tier: deque() for tier in self.policies}
+        self._service_ewma = 0.005
+        self.stats = {
+            tier: {
+                "admitted": 0,
+                "shed_queue_full": 0,
+                "shed_overload": 0,
+                "shed_deadline": 0,
+                "queue_times": deque(maxlen=QUEUE_TIME_SAMPLES),
+            }
+            for tier in self.policies
+        }
+
+    def _has_room(self, tier: str) -> bool:
+        return self.capacity - self.in_flight > self.policies[tier].reserve
+
+    def _waiting(self, tier: str) -> int:
+        return sum(1 for fut in self._waiters[tier] if not fut.done())
+
+    def retry_after(self) -> int:
+        """
+        Seconds until the current backlog should have drained.
+        """
+        backlog = self.in_flight + sum(self._waiting(t) for t in self._waiters)
+        return max(1, math.ceil(self._service_ewma * backlog / max(self.capacity, 1)))
+
+    def _shed(self, tier: str, reason: str) -> Shed:
+        self.stats[tier][f"shed_{reason}"] += 1
+        return Shed(reason, self.retry_after())
+
+    async def acquire(self, tier: str) -> float:
+        """
+        Wait for a slot and return the time spent queued (seconds), or raise
+        Shed if the request should be rejected.
+        """
+        policy = self.policies[tier]
+        higher_waiting = any(
+            self._waiting(other)
+            for other in self._order
+            if self.policies[other].priority < policy.priority
+        )
+        if higher_waiting:
+            raise self._shed(tier, "overload")
+
+        if not self._waiting(tier) and self._has_room(tier):
+            self.in_flight += 1
+            self._admitted(tier, 0.0)
+            return 0.0
+
+        if self._waiting(tier) >= policy.max_queue:
+            raise self._shed(tier, "queue_full")
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[tier].append(fut)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(fut, policy.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._shed(tier, "deadline")
+        except asyncio.CancelledError:
+            # Client went away; give back a slot we were handed meanwhile.
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+        finally:
+            if not fut.done() or fut.cancelled():
+                try:
+                    self._waiters[tier].remove(fut)
+                except ValueError:
+                    pass
+
+        queued = time.perf_counter() - start
+        self._admitted(tier, queued)
+        return queued
+
+    def _admitted(self, tier: str, queued: float) -> None:
+        stats = self.stats[tier]
+        stats["admitted"] += 1
+        stats["queue_times"].append(queued)
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        self.in_flight -= 1
+        if service_time is not None:
+            self._service_ewma = 0.9 * self._service_ewma + 0.1 * service_time
+        self._grant()
+
+    def _grant(self) -> None:
+        """
+        Hand free slots to waiters, highest priority first.
+        """
+        while self.in_flight < self.capacity:
+            for tier in self._order:
+                waiters = self._waiters[tier]
+                while waiters and waiters[0].done():
+                    waiters.popleft()
+                if waiters and self._has_room(tier):
+                    self.in_flight += 1
+                    waiters.popleft().set_result(None)
+                    break
+            else:
+                return
+
+    def snapshot(self) -> dict:
+        out = {"capacity": self.capacity, "in_flight": self.in_flight, "tiers": {}}
+        for tier, stats in self.stats.items():
+            times = sorted(stats["queue_times"])
+
+            def pct(p: float) -> float:
+                if not times:
+                    return 0.0
+                return round(times[min(len(times) - 1, int(p / 100.0 * len(times)))] * 1000.0, 3)
+
+            out["tiers"][tier] = {
+                "queued": self._waiting(tier),
+                "admitted": stats["admitted"],
+                "shed_queue_full": stats["shed_queue_full"],
+                "shed_overload": stats["shed_overload"],
+                "shed_deadline": stats["shed_deadline"],
+                "queue_time_ms": {"p50": pct(50), "p99": pct(99), "max": pct(100)},
+            }
+        return out
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to the tiered
+    /pattern/* routes; everything else passes straight through.
+
+    Each server process has its own controller, so with several uvicorn
+    workers the limits apply per worker.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        tier = TIER_BY_PATH.get(scope.get("path")) if scope["type"] == "http" else None
+        if tier is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(tier)
+        except Shed as exc:
+            await _send_503(send, exc)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - start)
+
+
+async def _send_503(send, exc: Shed) -> None:
+    body = json.dumps({"detail": "Server busy, please retry", "reason": exc.reason}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(exc.retry_after).encode()),
+            (b"cache-control", b"no-store"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,293 @@
+# app/echogram.py
+
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+# A recording is a 2-D uint8 intensity array saved as .npy:
+# axis 0 = pings (time), axis 1 = depth samples.
+SONAR_DATA_DIR = os.environ.get(
+    "SONAR_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sonar"),
+)
+
+PYRAMID_VERSION = 1
+TILE_SIZE = 256
+# Pings pooled per build chunk at level 0; keeps memory flat for long recordings.
+BUILD_CHUNK_PINGS = TILE_SIZE * 16
+# A <pyramid>.tmp directory untouched for this long is left over from a
+# builder that died without cleaning up, not a build in progress.
+STALE_BUILD_S = float(os.environ.get("ECHOGRAM_STALE_BUILD_S", "600"))
+
+
+_RECORDING_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+def is_valid_recording_id(recording_id: str) -> bool:
+    return bool(_RECORDING_ID.match(recording_id or ""))
+
+
+def recording_path(recording_id: str, data_dir: Optional[str] = None) -> str:
+    if not is_valid_recording_id(recording_id):
+        raise ValueError(f"invalid recording id: {recording_id!r}")
+    return os.path.join(data_dir or SONAR_DATA_DIR, f"{recording_id}.npy")
+
+
+def pyramid_dir(recording_id: str, data_dir: Optional[str] = None) -> str:
+    if not is_valid_recording_id(recording_id):
+        raise ValueError(f"invalid recording id: {recording_id!r}")
+    return os.path.join(data_dir or SONAR_DATA_DIR, f"{recording_id}.pyramid")
+
+
+def pool_2x2(block: np.ndarray, pooling: str) -> np.ndarray:
+    """
+    Downsample a 2-D uint8 block by 2 on both axes with max or mean pooling.
+
+    Odd edges are padded by repeating the last row/column.
+    """
+    rows, cols = block.shape
+    if rows % 2 or cols % 2:
+        block = np.pad(block, ((0, rows % 2), (0, cols % 2)), mode="edge")
+    quads = block.reshape(block.shape[0] // 2, 2, block.shape[1] // 2, 2)
+    if pooling == "max":
+        return quads.max(axis=(1, 3))
+    return quads.mean(axis=(1, 3), dtype=np.float32).round().astype(np.uint8)
+
+
+def _pool_level(level: np.ndarray, pooling: str) -> np.ndarray:
+    """
+    Pool a whole level in chunks of pings so a memory-mapped full-resolution
+    recording is never decoded at once.
+    """
+    return np.concatenate([
+        pool_2x2(np.asarray(level[start:start + BUILD_CHUNK_PINGS]), pooling)
+        for start in range(0, level.shape[0], BUILD_CHUNK_PINGS)
+    ])
+
+
+def _write_level(level: np.ndarray, tiles_fh, offsets: List[int]) -> dict:
+    """
+    Cut one level into TILE_SIZE x TILE_SIZE tiles, compress and append them.
+    """
+    rows, cols = level.shape
+    tiles_x = -(-rows // TILE_SIZE)
+    tiles_y = -(-cols // TILE_SIZE)
+    first = len(offsets) - 1
+    for tx in range(tiles_x):
+        strip = np.asarray(level[tx * TILE_SIZE:(tx + 1) * TILE_SIZE])
+        for ty in range(tiles_y):
+            tile = np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8)
+            part = strip[:, ty * TILE_SIZE:(ty + 1) * TILE_SIZE]
+            tile[:part.shape[0], :part.shape[1]] = part
+            tiles_fh.write(zlib.compress(tile.tobytes(), 6))
+            offsets.append(tiles_fh.tell())
+    return {
+        "pings": rows,
+        "samples": cols,
+        "tiles_x": tiles_x,
+        "tiles_y": tiles_y,
+        "first_tile": first,
+    }
+
+
+def build_pyramid(
+    recording_id: str,
+    pooling: str = "max",
+    data_dir: Optional[str] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> dict:
+    """
+    Build the tile pyramid for a recording and return its index.
+
+    Level 0 is full resolution; each following level halves both axes until
+    the whole echogram fits in one tile. Tiles are zlib streams concatenated
+    into tiles.bin, with their byte offsets in offsets.npy, so serving a
+    tile is one slice of a memory-mapped file. `progress` is called with
+    the completed fraction after each level.
+    """
+    if pooling not in ("max", "mean"):
+        raise ValueError(f"unknown pooling: {pooling}")
+
+    source = np.load(recording_path(recording_id, data_dir), mmap_mode="r")
+    if source.ndim != 2 or source.dtype != np.uint8:
+        raise ValueError("recordings must be 2-D uint8 arrays (pings x samples)")
+
+    out_dir = pyramid_dir(recording_id, data_dir)
+    tmp_dir = out_dir + ".tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        index = _build_into(source, recording_id, pooling, tmp_dir, progress)
+    except BaseException:
+        # Failed or cancelled: don't leave a half-built pyramid that reads
+        # as 'building' forever.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _publish(tmp_dir, out_dir)
+    return index
+
+
+def _publish(tmp_dir: str, out_dir: str) -> None:
+    # The finished build moves to its own versioned directory and out_dir is
+    # a symlink to it, swapped with one rename: readers see either the old
+    # pyramid or the new one, never a gap. The previous version stays on
+    # disk for readers that resolved the old link just before the swap.
+    version_dir = f"{out_dir}.v{time.time_ns()}"
+    os.rename(tmp_dir, version_dir)
+    if os.path.isdir(out_dir) and not os.path.islink(out_dir):
+        # Pyramid from before versioned builds: move it aside once.
+        os.rename(out_dir, f"{out_dir}.v0")
+    link = out_dir + ".link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, out_dir)
+    _remove_old_versions(out_dir, keep=2)
+
+
+def _remove_old_versions(out_dir: str, keep: int) -> None:
+    parent, prefix = os.path.split(out_dir)
+    prefix += ".v"
+    versions = sorted(
+        (name for name in os.listdir(parent) if name.startswith(prefix) and name[len(prefix):].isdigit()),
+        key=lambda name: int(name[len(prefix):]),
+    )
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def _build_into(
+    source: np.ndarray,
+    recording_id: str,
+    pooling: str,
+    tmp_dir: str,
+    progress: Optional[Callable[[float], None]],
+) -> dict:
+    n_levels = 1 + max(0, math.ceil(math.log2(max(source.shape) / TILE_SIZE)))
+    offsets = [0]
+    levels = []
+    with open(os.path.join(tmp_dir, "tiles.bin"), "wb") as tiles_fh:
+        level = source
+        levels.append(_write_level(level, tiles_fh, offsets))
+        while max(level.shape) > TILE_SIZE:
+            if progress is not None:
+                progress(len(levels) / n_levels)
+            level = _pool_level(level, pooling)
+            levels.append(_write_level(level, tiles_fh, offsets))
+
+    np.save(os.path.join(tmp_dir, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    index = {
+        "version": PYRAMID_VERSION,
+        "recording_id": recording_id,
+        "pooling": pooling,
+        "tile_size": TILE_SIZE,
+        "levels": levels,
+    }
+    with open(os.path.join(tmp_dir, "index.json"), "w") as fh:
+        json.dump(index, fh)
+    return index
+
+
+class EchogramPyramid:
+    """
+    Read side of a built pyramid: memory-maps tiles.bin and offsets.npy once
+    and serves any tile as a constant-time range read.
+    """
+
+    def __init__(self, path: str):
+        # Resolve the pyramid's link once so all three files come from the
+        # same build even if a rebuild swaps it meanwhile.
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "index.json")) as fh:
+            st = os.fstat(fh.fileno())
+            self.stamp = (st.st_ino, st.st_mtime_ns)
+            self.index = json.load(fh)
+        if self.index.get("version") != PYRAMID_VERSION:
+            raise ValueError(f"unsupported pyramid version in {path}")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        with open(os.path.join(path, "tiles.bin"), "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def tile_compressed(self, level: int, tx: int, ty: int) -> bytes:
+        """
+        zlib-compressed bytes of one TILE_SIZE x TILE_SIZE uint8 tile.
+
+        Raises KeyError for tiles outside the pyramid.
+        """
+        levels = self.index["levels"]
+        if not 0 <= level < len(levels):
+            raise KeyError(level)
+        info = levels[level]
+        if not (0 <= tx < info["tiles_x"] and 0 <= ty < info["tiles_y"]):
+            raise KeyError((level, tx, ty))
+        n = info["first_tile"] + tx * info["tiles_y"] + ty
+        return self._mm[int(self.offsets[n]):int(self.offsets[n + 1])]
+
+    def tile(self, level: int, tx: int, ty: int) -> bytes:
+        """
+        Raw (decompressed) bytes of one tile, row-major pings x samples.
+        """
+        return zlib.decompress(self.tile_compressed(level, tx, ty))
+
+
+_open_pyramids: Dict[str, EchogramPyramid] = {}
+_open_lock = threading.Lock()
+
+
+def open_pyramid(recording_id: str, data_dir: Optional[str] = None) -> Optional[EchogramPyramid]:
+    """
+    Cached pyramid for a recording, or None if it hasn't been built yet.
+
+    The cache entry is checked against the current index.json's inode and
+    mtime, so a rebuild by another process (a job worker) is picked up on
+    the next request.
+    """
+    path = pyramid_dir(recording_id, data_dir)
+    try:
+        st = os.stat(os.path.join(path, "index.json"))
+    except FileNotFoundError:
+        return None
+    stamp = (st.st_ino, st.st_mtime_ns)
+    pyramid = _open_pyramids.get(path)
+    if pyramid is not None and pyramid.stamp == stamp:
+        return pyramid
+    with _open_lock:
+        pyramid = _open_pyramids.get(path)
+        if pyramid is None or pyramid.stamp != stamp:
+            pyramid = EchogramPyramid(path)
+            _open_pyramids[path] = pyramid
+    return pyramid
+
+
+def pyramid_status(recording_id: str, data_dir: Optional[str] = None) -> str:
+    """
+    One of: 'missing' (no recording), 'ready', 'building', 'pending'.
+    """
+    if os.path.exists(os.path.join(pyramid_dir(recording_id, data_dir), "index.json")):
+        return "ready"
+    if not os.path.exists(recording_path(recording_id, data_dir)):
+        return "missing"
+    if _build_in_progress(pyramid_dir(recording_id, data_dir) + ".tmp"):
+        return "building"
+    return "pending"
+
+
+def _build_in_progress(tmp_dir: str) -> bool:
+    # A live builder keeps writing tiles.bin; a killed one (no chance to
+    # clean up) leaves a directory that stops changing.
+    try:
+        paths = [tmp_dir] + [os.path.join(tmp_dir, name) for name in os.listdir(tmp_dir)]
+        touched = max(os.path.getmtime(p) for p in paths)
+    except OSError:
+        return False
+    return time.time() - touched < STALE_BUILD_S
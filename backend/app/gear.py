@@ -0,0 +1,535 @@
+# app/gear.py
+
+import hashlib
+import json
+import os
+import random
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# JSON file with "rods", "reels" and "lines" lists (real inventory). Without
+# one, PRO setups keep their template rod/reel/line text.
+GEAR_CATALOG_PATH = os.environ.get("GEAR_CATALOG_PATH")
+DEFAULT_CATALOG_SIZE = {"rods": 4000, "reels": 3000, "lines": 3000}
+
+TOP_K = 3
+
+POWERS = ["ultralight", "light", "medium-light", "medium", "medium-heavy", "heavy", "extra-heavy"]
+ACTIONS = ["moderate", "moderate-fast", "fast", "extra-fast"]
+REEL_TYPES = ["spinning", "casting"]
+LINE_MATERIALS = ["fluorocarbon", "monofilament", "braid"]
+
+# Small price term so that, among equally good matches, better value wins.
+PRICE_WEIGHT = 0.002
+
+
+# ---------- Indexed tables ----------
+
+
+class GearTable:
+    """
+    One kind of gear as columns plus precomputed indexes.
+
+    Categorical attributes get a boolean bitmap per value; numeric
+    attributes get a sorted copy with its argsort. A query ORs bitmaps
+    within an attribute and ANDs across attributes, walks the narrowest
+    numeric range through its sorted index, and checks the remaining
+    ranges on just those rows.
+    """
+
+    def __init__(self, items: List[dict], categorical: Sequence[str], numeric: Sequence[str]):
+        self.items = items
+        self.size = len(items)
+        self.columns = {
+            name: np.asarray([item[name] for item in items], dtype=np.float64) for name in numeric
+        }
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        for name in categorical:
+            values = np.asarray([item[name] for item in items])
+            self.bitmaps[name] = {value: values == value for value in np.unique(values).tolist()}
+        self.sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for name in numeric:
+            order = np.argsort(self.columns[name], kind="stable")
+            self.sorted[name] = (self.columns[name][order], order)
+
+    def select(
+        self,
+        equals: Optional[Dict[str, Sequence[str]]] = None,
+        ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+    ) -> np.ndarray:
+        """
+        Row indices where each categorical attribute is one of the allowed
+        values and each numeric attribute lies in its [lo, hi] range.
+        """
+        mask = None
+        for name, allowed in (equals or {}).items():
+            bitmaps = self.bitmaps[name]
+            hit = None
+            for value in allowed:
+                bits = bitmaps.get(value)
+                if bits is not None:
+                    hit = bits if hit is None else hit | bits
+            if hit is None:
+                return np.empty(0, dtype=np.int64)
+            mask = hit if mask is None else mask & hit
+
+        if not ranges:
+            return np.flatnonzero(mask) if mask is not None else np.arange(self.size)
+
+        spans = []
+        for name, (lo, hi) in ranges.items():
+            values, _ = self.sorted[name]
+            start = np.searchsorted(values, lo, "left")
+            stop = np.searchsorted(values, hi, "right")
+            spans.append((stop - start, name, start, stop))
+        spans.sort(key=lambda s: s[0])
+
+        _, name, start, stop = spans[0]
+        rows = self.sorted[name][1][start:stop]
+        for _, other, _, _ in spans[1:]:
+            lo, hi = ranges[other]
+            col = self.columns[other][rows]
+            rows = rows[(col >= lo) & (col <= hi)]
+        if mask is not None:
+            rows = rows[mask[rows]]
+        return rows
+
+    def top_k(self, rows: np.ndarray, targets: Dict[str, Tuple[float, float]], k: int) -> List[Tuple[int, float]]:
+        """
+        The k rows closest to the targets ({attribute: (target, scale)}),
+        as (row, score) pairs with lower scores better.
+        """
+        if len(rows) == 0:
+            return []
+        score = PRICE_WEIGHT * self.columns["price"][rows]
+        for name, (target, scale) in targets.items():
+            score = score + np.abs(self.columns[name][rows] - target) / scale
+        if len(rows) > k:
+            best = np.argpartition(score, k)[:k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(score[best], kind="stable")]
+        return [(int(rows[i]), float(score[i])) for i in best]
+
+
+# ---------- Setup specs ----------
+
+
+# What each kind of presentation wants from a rod, reel and line. Ranges
+# are (lo, hi, target); line tests are in lb of the given material.
+PROFILES = {
+    "finesse": {
+        "reel_type": "spinning",
+        "powers": ["light", "medium-light"],
+        "actions": ["fast", "extra-fast"],
+        "length_in": (78, 90, 84),
+        "gear_ratio": (5.8, 6.6, 6.2),
+        "reel_size": (1000, 3000, 2500),
+        "line": ("braid", (8, 15, 10)),
+        "leader": ("fluorocarbon", (5, 10, 7)),
+    },
+    "bottom": {
+        "reel_type": "casting",
+        "powers": ["medium-heavy", "heavy"],
+        "actions": ["fast", "extra-fast"],
+        "length_in": (84, 92, 86),
+        "gear_ratio": (7.0, 8.5, 7.3),
+        "reel_size": (100, 200, 150),
+        "line": ("fluorocarbon", (12, 20, 16)),
+        "leader": None,
+    },
+    "moving": {
+        "reel_type": "casting",
+        "powers": ["medium", "medium-heavy"],
+        "actions": ["moderate-fast", "fast"],
+        "length_in": (80, 88, 84),
+        "gear_ratio": (6.3, 7.5, 7.1),
+        "reel_size": (100, 200, 150),
+        "line": ("fluorocarbon", (12, 17, 15)),
+        "leader": None,
+    },
+    "cranking": {
+        "reel_type": "casting",
+        "powers": ["medium", "medium-heavy"],
+        "actions": ["moderate", "moderate-fast"],
+        "length_in": (82, 94, 86),
+        "gear_ratio": (5.1, 6.6, 6.0),
+        "reel_size": (100, 200, 150),
+        "line": ("fluorocarbon", (10, 15, 12)),
+        "leader": None,
+    },
+    "jerkbait": {
+        "reel_type": "casting",
+        "powers": ["medium-light", "medium"],
+        "actions": ["fast", "moderate-fast"],
+        "length_in": (78, 86, 82),
+        "gear_ratio": (6.3, 7.5, 7.0),
+        "reel_size": (100, 200, 150),
+        "line": ("fluorocarbon", (8, 12, 10)),
+        "leader": None,
+    },
+}
+
+# Braid is rated about three times higher than fluoro/mono of the same
+# diameter, so line adjustments are scaled for it.
+_BRAID_FACTOR = 3.0
+
+
+def lure_profile(lure: str, setup_type: str) -> str:
+    """
+    Gear profile for a lure, refining the coarse setup type
+    ('finesse' / 'bottom' / 'moving') for treble-hook baits.
+    """
+    if setup_type != "moving":
+        return setup_type
+    l = lure.lower()
+    if "crank" in l or "lipless" in l or "squarebill" in l:
+        return "cranking"
+    if "jerkbait" in l:
+        return "jerkbait"
+    return "moving"
+
+
+def _shift(rng: Tuple[float, float, float], delta: float) -> Tuple[float, float, float]:
+    return (rng[0] + delta, rng[1] + delta, rng[2] + delta)
+
+
+def _shift_line(line, delta: float):
+    material, rng = line
+    factor = _BRAID_FACTOR if material == "braid" else 1.0
+    return (material, _shift(rng, delta * factor))
+
+
+def _clarity_class(clarity: str) -> str:
+    clarity = clarity.lower().strip()
+    return clarity if clarity in ("clear", "muddy") else "other"
+
+
+def _bottom_class(bottom_composition: Optional[str]) -> str:
+    bottom = (bottom_composition or "").lower()
+    if "grass" in bottom or "vegetation" in bottom:
+        return "grass"
+    return "rock" if "rock" in bottom else "other"
+
+
+def setup_spec(
+    profile: str,
+    depth_zone: str,
+    clarity: str,
+    bottom_composition: Optional[str],
+    wind_speed: float,
+) -> dict:
+    """
+    Gear constraints for a profile, adjusted for depth zone, water clarity,
+    bottom and wind.
+    """
+    spec = dict(PROFILES[profile])
+    spec["powers"] = list(spec["powers"])
+    clarity = clarity.lower().strip()
+    bottom = (bottom_composition or "").lower()
+
+    if depth_zone == "offshore":
+        # Longer rods for long casts and hooksets at distance.
+        spec["length_in"] = _shift(spec["length_in"], 2)
+        if profile == "cranking":
+            # Low gear for torque, thinner line so the bait dives deeper.
+            spec["gear_ratio"] = _shift(spec["gear_ratio"], -0.4)
+            spec["line"] = _shift_line(spec["line"], -2)
+        elif profile == "bottom":
+            spec["gear_ratio"] = _shift(spec["gear_ratio"], 0.4)
+    elif depth_zone == "shallow" and profile == "bottom":
+        spec["line"] = _shift_line(spec["line"], 3)
+
+    if clarity == "clear":
+        spec["line"] = _shift_line(spec["line"], -2)
+        if spec["leader"] is not None:
+            spec["leader"] = _shift_line(spec["leader"], -1)
+    elif clarity == "muddy":
+        spec["line"] = _shift_line(spec["line"], 2)
+
+    if "grass" in bottom or "vegetation" in bottom:
+        if profile in ("bottom", "moving"):
+            spec["line"] = ("braid", (30, 65, 50) if profile == "bottom" else (30, 50, 40))
+            spec["leader"] = None
+    elif "rock" in bottom:
+        # Abrasion: go a little heavier.
+        spec["line"] = _shift_line(spec["line"], 2)
+        if spec["leader"] is not None:
+            spec["leader"] = _shift_line(spec["leader"], 2)
+
+    if wind_speed >= 10:
+        spec["length_in"] = _shift(spec["length_in"], 2)
+        if profile == "finesse":
+            spec["powers"].append("medium")
+
+    return spec
+
+
+# ---------- Catalog ----------
+
+
+class GearCatalog:
+    """
+    Rods, reels and lines with attribute indexes, matched against setup
+    specs. Matches are memoized per (profile, conditions) since the spec
+    space is small and the catalog doesn't change once loaded.
+    """
+
+    def __init__(self, rods: List[dict], reels: List[dict], lines: List[dict]):
+        self.rods = GearTable(rods, ("type", "power", "action"), ("length_in", "line_min_lb", "line_max_lb", "price"))
+        self.reels = GearTable(reels, ("type",), ("gear_ratio", "size", "price"))
+        self.lines = GearTable(lines, ("material",), ("test_lb", "price"))
+        self._memo: Dict[tuple, List[dict]] = {}
+        self._lock = threading.Lock()
+        # sha256 of the file the catalog was parsed from (see load_catalog).
+        self.digest = "in-memory"
+
+    def __len__(self) -> int:
+        return self.rods.size + self.reels.size + self.lines.size
+
+    def _match_rods(self, spec: dict, k: int) -> List[Tuple[int, float]]:
+        lo, hi, target = spec["length_in"]
+        material, (_, _, line_target) = spec["leader"] or spec["line"]
+        if material == "braid":
+            line_target /= _BRAID_FACTOR
+        attempts = [
+            (
+                {"type": [spec["reel_type"]], "power": spec["powers"], "action": spec["actions"]},
+                {
+                    "length_in": (lo, hi),
+                    "line_min_lb": (-np.inf, line_target),
+                    "line_max_lb": (line_target, np.inf),
+                },
+            ),
+            # Relax the line rating, then the action, before giving up.
+            ({"type": [spec["reel_type"]], "power": spec["powers"], "action": spec["actions"]}, {"length_in": (lo, hi)}),
+            ({"type": [spec["reel_type"]], "power": spec["powers"]}, None),
+        ]
+        for equals, ranges in attempts:
+            rows = self.rods.select(equals, ranges)
+            if len(rows):
+                return self.rods.top_k(rows, {"length_in": (target, 6.0)}, k)
+        return []
+
+    def _match_reels(self, spec: dict, k: int) -> List[Tuple[int, float]]:
+        r_lo, r_hi, r_target = spec["gear_ratio"]
+        s_lo, s_hi, s_target = spec["reel_size"]
+        for ranges in ({"gear_ratio": (r_lo, r_hi), "size": (s_lo, s_hi)}, None):
+            rows = self.reels.select({"type": [spec["reel_type"]]}, ranges)
+            if len(rows):
+                return self.reels.top_k(
+                    rows, {"gear_ratio": (r_target, 0.5), "size": (s_target, 1000.0)}, k
+                )
+        return []
+
+    def _match_line(self, line, k: int) -> List[Tuple[int, float]]:
+        material, (lo, hi, target) = line
+        for ranges in ({"test_lb": (lo, hi)}, None):
+            rows = self.lines.select({"material": [material]}, ranges)
+            if len(rows):
+                return self.lines.top_k(rows, {"test_lb": (target, max(target * 0.2, 1.0))}, k)
+        return []
+
+    def match(self, spec: dict, k: int = TOP_K) -> List[dict]:
+        """
+        Up to k rod/reel/line(/leader) setups for a spec, best first, each
+        with the catalog items and a combined score.
+        """
+        rods = self._match_rods(spec, k)
+        reels = self._match_reels(spec, k)
+        lines = self._match_line(spec["line"], k)
+        leader = self._match_line(spec["leader"], 1) if spec["leader"] is not None else []
+        if not rods or not reels or not lines:
+            return []
+
+        # The i-th setup pairs the i-th best rod, reel and line, so the
+        # alternatives are actually different gear rather than the same rod
+        # with a near-identical spool of line.
+        setups = []
+        for i in range(min(k, max(len(rods), len(reels), len(lines)))):
+            r, r_score = rods[min(i, len(rods) - 1)]
+            c, c_score = reels[min(i, len(reels) - 1)]
+            l, l_score = lines[min(i, len(lines) - 1)]
+            setups.append({
+                "rod": self.rods.items[r],
+                "reel": self.reels.items[c],
+                "line": self.lines.items[l],
+                "leader": self.lines.items[leader[0][0]] if leader else None,
+                "score": round(r_score + c_score + l_score, 4),
+            })
+        return setups
+
+    def best_setups(
+        self,
+        profile: str,
+        depth_zone: str,
+        clarity: str,
+        bottom_composition: Optional[str],
+        wind_speed: float,
+        k: int = TOP_K,
+    ) -> List[dict]:
+        # Key on what setup_spec actually reads, never the raw client strings,
+        # so the memo stays bounded by the (small) spec space.
+        key = (profile, depth_zone, _clarity_class(clarity), _bottom_class(bottom_composition), wind_speed >= 10, k)
+        setups = self._memo.get(key)
+        if setups is None:
+            spec = setup_spec(profile, depth_zone, clarity, bottom_composition, wind_speed)
+            setups = self.match(spec, k)
+            with self._lock:
+                self._memo[key] = setups
+        return setups
+
+
+# ---------- Formatting ----------
+
+
+def describe_rod(rod: dict) -> str:
+    feet, inches = divmod(int(rod["length_in"]), 12)
+    return (
+        f"{rod['name']}: {feet}'{inches}\" {rod['power']} {rod['type']} rod, {rod['action']} action "
+        f"({rod['line_min_lb']:g}–{rod['line_max_lb']:g} lb, ${rod['price']:.0f})"
+    )
+
+
+def describe_reel(reel: dict) -> str:
+    return f"{reel['name']}: {reel['size']:g}-size {reel['type']} reel, {reel['gear_ratio']:.1f}:1 (${reel['price']:.0f})"
+
+
+def describe_line(line: dict, leader: Optional[dict] = None) -> str:
+    text = f"{line['test_lb']:g} lb {line['material']} ({line['name']})"
+    if leader is not None:
+        text += f" to {leader['test_lb']:g} lb {leader['material']} leader ({leader['name']})"
+    return text
+
+
+# ---------- Loading ----------
+
+
+_SERIES = ["Ridgeline", "Tidewater", "Ironwood", "Current", "Falcon", "Summit", "Driftline", "Backwater"]
+
+
+def generate_catalog(
+    rods: int = DEFAULT_CATALOG_SIZE["rods"],
+    reels: int = DEFAULT_CATALOG_SIZE["reels"],
+    lines: int = DEFAULT_CATALOG_SIZE["lines"],
+    seed: int = 0,
+) -> GearCatalog:
+    """
+    Deterministic synthetic catalog with realistic attribute ranges, for
+    tests and benchmarks only; the made-up items are never served.
+    """
+    rng = random.Random(seed)
+    line_ratings = [(2, 6), (4, 8), (6, 12), (8, 17), (10, 20), (12, 25), (15, 30)]
+
+    rod_items = []
+    for i in range(rods):
+        kind = rng.choice(REEL_TYPES)
+        p = rng.randint(1, 5) if kind == "spinning" else rng.randint(2, 6)
+        lo, hi = line_ratings[p]
+        rod_items.append({
+            "id": f"rod-{i:05d}",
+            "name": f"{rng.choice(_SERIES)} {kind[0].upper()}{rng.randint(100, 999)}",
+            "type": kind,
+            "power": POWERS[p],
+            "action": rng.choice(ACTIONS),
+            "length_in": rng.randint(66, 96),
+            "line_min_lb": lo + rng.choice((-2, 0, 0, 2)),
+            "line_max_lb": hi + rng.choice((-3, 0, 0, 5)),
+            "price": round(rng.uniform(50, 500), 2),
+        })
+
+    reel_items = []
+    for i in range(reels):
+        kind = rng.choice(REEL_TYPES)
+        if kind == "spinning":
+            size = rng.choice((1000, 2000, 2500, 3000, 4000))
+            ratio = rng.choice((5.2, 5.8, 6.0, 6.2, 6.4))
+        else:
+            size = rng.choice((100, 150, 200, 300))
+            ratio = rng.choice((5.1, 5.4, 6.3, 6.6, 7.1, 7.3, 7.5, 8.1, 8.3))
+        reel_items.append({
+            "id": f"reel-{i:05d}",
+            "name": f"{rng.choice(_SERIES)} {size}{rng.choice('ABCHSX')}",
+            "type": kind,
+            "size": size,
+            "gear_ratio": ratio,
+            "price": round(rng.uniform(40, 450), 2),
+        })
+
+    tests = {
+        "fluorocarbon": (4, 6, 8, 10, 12, 14, 15, 17, 20, 25),
+        "monofilament": (6, 8, 10, 12, 14, 17, 20, 25),
+        "braid": (10, 15, 20, 30, 40, 50, 65),
+    }
+    line_items = []
+    for i in range(lines):
+        material = rng.choice(LINE_MATERIALS)
+        line_items.append({
+            "id": f"line-{i:05d}",
+            "name": f"{rng.choice(_SERIES)} {material[:4].title()} {rng.randint(10, 99)}",
+            "material": material,
+            "test_lb": rng.choice(tests[material]),
+            "price": round(rng.uniform(8, 60), 2),
+        })
+
+    return GearCatalog(rod_items, reel_items, line_items)
+
+
+def load_catalog(path: str) -> GearCatalog:
+    """
+    Catalog from a JSON file. Its digest covers the exact bytes parsed, so
+    it identifies what is served even if the file is replaced later.
+    """
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    data = json.loads(raw)
+    catalog = GearCatalog(data["rods"], data["reels"], data["lines"])
+    catalog.digest = hashlib.sha256(raw).hexdigest()
+    return catalog
+
+
+_catalog: Optional[GearCatalog] = None
+_catalog_lock = threading.Lock()
+# Path that last failed to load (not retried) and why.
+_catalog_failed_path: Optional[str] = None
+_catalog_error: Optional[str] = None
+
+
+def get_catalog() -> Optional[GearCatalog]:
+    """
+    Process-wide catalog loaded from GEAR_CATALOG_PATH, or None when no real
+    catalog is configured or the file can't be used (the reason is kept for
+    catalog_status()).
+    """
+    global _catalog, _catalog_failed_path, _catalog_error
+    if _catalog is None and GEAR_CATALOG_PATH and GEAR_CATALOG_PATH != _catalog_failed_path:
+        with _catalog_lock:
+            if _catalog is None and GEAR_CATALOG_PATH != _catalog_failed_path:
+                try:
+                    _catalog = load_catalog(GEAR_CATALOG_PATH)
+                    _catalog_error = None
+                except (OSError, ValueError, KeyError, TypeError) as exc:
+                    _catalog_failed_path, _catalog_error = GEAR_CATALOG_PATH, str(exc)
+    return _catalog
+
+
+def catalog_status() -> dict:
+    catalog = get_catalog()
+    return {
+        "path": GEAR_CATALOG_PATH,
+        "loaded": catalog is not None,
+        "error": _catalog_error,
+        "items": len(catalog) if catalog is not None else 0,
+    }
+
+
+def catalog_digest() -> str:
+    """
+    Digest of the catalog get_catalog() serves, or "none" without one. The
+    catalog is loaded once per process, so this is fixed after first use.
+    """
+    catalog = get_catalog()
+    return catalog.digest if catalog is not None else "none"
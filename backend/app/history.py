@@ -0,0 +1,294 @@
+# app/history.py
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+
+HISTORY_DB_PATH = os.environ.get(
+    "HISTORY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "history.sqlite3"),
+)
+HISTORY_ENABLED = os.environ.get("HISTORY_ENABLED", "1") != "0"
+
+# Records waiting to be written; past this, new records are dropped.
+HISTORY_QUEUE_SIZE = int(os.environ.get("HISTORY_QUEUE_SIZE", "20000"))
+FLUSH_BATCH = 1000
+FLUSH_INTERVAL_S = 0.5
+
+# Normalized condition columns, covering both tiers' request fields.
+CONDITION_FIELDS = (
+    "temp_f",
+    "month",
+    "clarity",
+    "wind_speed",
+    "sky_condition",
+    "depth_ft",
+    "bottom_composition",
+    "latitude",
+    "day_of_year",
+    "temp_trend",
+)
+
+# Free-text fields the engine compares case- and whitespace-insensitively;
+# stored lower-cased and stripped so " Muddy" and "muddy" group together.
+TEXT_FIELDS = ("clarity", "sky_condition", "bottom_composition")
+
+
+def normalize_conditions(conditions: dict) -> dict:
+    """
+    Condition values as stored: text fields lower-cased and stripped.
+    """
+    return {
+        name: value.strip().lower() if name in TEXT_FIELDS and isinstance(value, str) else value
+        for name, value in conditions.items()
+    }
+
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS history (
+    ts REAL NOT NULL,
+    tier TEXT NOT NULL,
+    {", ".join(CONDITION_FIELDS)},
+    result_key TEXT NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_ts ON history (ts);
+CREATE INDEX IF NOT EXISTS history_tier_ts ON history (tier, ts);
+CREATE INDEX IF NOT EXISTS history_month_ts ON history (month, ts);
+CREATE INDEX IF NOT EXISTS history_clarity_ts ON history (clarity, ts);
+"""
+
+_INSERT = (
+    f"INSERT INTO history (ts, tier, {', '.join(CONDITION_FIELDS)}, result_key, status) "
+    f"VALUES ({', '.join('?' * (len(CONDITION_FIELDS) + 4))})"
+)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class HistoryRecorder:
+    """
+    Write-behind audit trail of served recommendations.
+
+    record() only appends a row tuple to a bounded in-memory queue, so the
+    request path never touches disk. A background thread drains the queue
+    into SQLite in batched transactions, every FLUSH_INTERVAL_S or sooner
+    once the queue is half full. When the queue is full new records are
+    dropped and counted rather than blocking the request.
+
+    A disabled recorder never opens the database or starts the flusher.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        capacity: int = HISTORY_QUEUE_SIZE,
+        batch_size: int = FLUSH_BATCH,
+        flush_interval: float = FLUSH_INTERVAL_S,
+        enabled: bool = True,
+    ):
+        self.db_path = db_path or HISTORY_DB_PATH
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        if enabled:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._write_conn = _connect(self.db_path)
+            self._write_conn.executescript(_SCHEMA)
+            self._read_conn = _connect(self.db_path)
+
+        self.stats = {
+            "recorded": 0,
+            "dropped": 0,
+            "flushed": 0,
+            "batches": 0,
+            "flush_errors": 0,
+        }
+
+    # ---------- Hot path ----------
+
+    def record(self, tier: str, conditions: dict, result_key: str, status: int = 200) -> bool:
+        """
+        Queue one served result. Returns False if it was dropped.
+        """
+        if not self.enabled:
+            return False
+        conditions = normalize_conditions(conditions)
+        row = (
+            (time.time(), tier)
+            + tuple(conditions.get(name) for name in CONDITION_FIELDS)
+            + (result_key, status)
+        )
+        with self._lock:
+            if len(self._queue) >= self.capacity:
+                self.stats["dropped"] += 1
+                return False
+            self._queue.append(row)
+            self.stats["recorded"] += 1
+            backlog = len(self._queue)
+        if backlog * 2 >= self.capacity:
+            self._wakeup.set()
+        return True
+
+    # ---------- Flushing ----------
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far; returns the number of rows written.
+        """
+        written = 0
+        if self._write_conn is None:
+            return written
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    n = min(self.batch_size, len(self._queue))
+                    batch = [self._queue.popleft() for _ in range(n)]
+                if not batch:
+                    return written
+                try:
+                    with self._write_conn:
+                        self._write_conn.execute("BEGIN")
+                        self._write_conn.executemany(_INSERT, batch)
+                except sqlite3.Error:
+                    self._requeue(batch)
+                    return written
+                written += len(batch)
+                with self._lock:
+                    self.stats["flushed"] += len(batch)
+                    self.stats["batches"] += 1
+
+    def _requeue(self, batch: list) -> None:
+        # Put a failed batch back in front, keeping as much as still fits.
+        with self._lock:
+            self.stats["flush_errors"] += 1
+            room = max(0, self.capacity - len(self._queue))
+            keep = batch[:room]
+            self.stats["dropped"] += len(batch) - len(keep)
+            self._queue.extendleft(reversed(keep))
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None or self._write_conn is None:
+                return
+            self._thread = threading.Thread(target=self._run, name="history-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the flusher after writing whatever is still queued.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self.flush()
+
+    # ---------- Queries ----------
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        tier: Optional[str] = None,
+        limit: int = 1000,
+        **conditions,
+    ) -> List[dict]:
+        """
+        Flushed records with since <= ts < until matching the given tier and
+        condition values, newest first. Records become visible once the
+        flusher has written them (within about FLUSH_INTERVAL_S).
+        """
+        unknown = set(conditions) - set(CONDITION_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown condition fields: {sorted(unknown)}")
+        if self._read_conn is None:
+            return []
+        conditions = normalize_conditions(conditions)
+
+        clauses, args = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            args.append(until)
+        if tier is not None:
+            clauses.append("tier = ?")
+            args.append(tier)
+        for name, value in conditions.items():
+            if value is not None:
+                clauses.append(f"{name} = ?")
+                args.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                f"SELECT * FROM history {where} ORDER BY ts DESC LIMIT ?",
+                args + [limit],
+            ).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats, pending=len(self._queue), capacity=self.capacity, enabled=self.enabled)
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    return {
+        "ts": row["ts"],
+        "tier": row["tier"],
+        "conditions": {name: row[name] for name in CONDITION_FIELDS if row[name] is not None},
+        "result_key": row["result_key"],
+        "status": row["status"],
+    }
+
+
+_history: Optional[HistoryRecorder] = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> HistoryRecorder:
+    """
+    Process-wide recorder, started on first use and flushed at exit.
+    """
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                recorder = HistoryRecorder(enabled=HISTORY_ENABLED)
+                recorder.start()
+                atexit.register(recorder.stop)
+                _history = recorder
+    return _history
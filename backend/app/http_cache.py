@@ -0,0 +1,321 @@
+# app/http_cache.py
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:  # brotli is optional; gzip is always available
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+from app import gear, lures
+
+
+# Bump whenever the pattern rules change so cached results are invalidated.
+ENGINE_VERSION = "7"
+
+CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=3600"
+# Stock levels go stale much faster than the rules do.
+STOCK_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=60"
+MIN_COMPRESS_SIZE = 256
+MAX_ENTRIES = 4096
+
+
+def canonical_query(conditions: dict) -> str:
+    """
+    Build the canonical query string for a set of request conditions.
+
+    Fields keep their declared order and unset (None) fields are dropped.
+    Floats are rendered with repr, so 55.0 and 55.00 both become 55.0; ints
+    are left as they are (55 stays 55). Callers pass validated request
+    models, which already coerce float fields such as temp_f to float, so a
+    client sending temp_f=55 still gets the 55.0 key.
+    """
+    pairs = []
+    for name, value in conditions.items():
+        if value is None:
+            continue
+        if isinstance(value, float):
+            value = repr(value)
+        pairs.append((name, str(value)))
+    return urlencode(pairs)
+
+
+def condition_key(tier: str, conditions: dict) -> str:
+    """
+    Deterministic cache key for a pattern request: tier + canonical query.
+    """
+    return f"{tier}?{canonical_query(conditions)}"
+
+
+# ---------- Engine sources ----------
+
+# path -> ((mtime_ns, size), sha256); a file is only rehashed when it changes.
+_digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: Optional[str]) -> str:
+    """
+    sha256 of a data file, or "none" when the path is unset or missing.
+    """
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    if st is None:
+        return "none"
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _digests_lock:
+        cached = _digests.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    with _digests_lock:
+        _digests[path] = (stamp, h.hexdigest())
+    return h.hexdigest()
+
+
+def engine_sources() -> dict:
+    """
+    What pattern results are built from: the rules version plus digests of
+    the gear catalog and lure index this process loaded (or "none"). These
+    are taken at load time, not from the files on disk, so they always
+    describe the data actually served.
+    """
+    return {
+        "engine_version": ENGINE_VERSION,
+        "gear_catalog": gear.catalog_digest(),
+        "lure_index": lures.index_digest(),
+    }
+
+
+def has_stock_data(sources: dict) -> bool:
+    return sources["gear_catalog"] != "none" or sources["lure_index"] != "none"
+
+
+def make_etag(key: str, sources: Optional[dict] = None) -> str:
+    """
+    Weak ETag derived from the engine sources and the condition key, so
+    swapping the gear catalog or lure index invalidates cached results.
+
+    The tag is weak because the gzip/brotli/identity bodies are different
+    bytes for the same result.
+    """
+    if sources is None:
+        sources = engine_sources()
+    parts = [sources["engine_version"], sources["gear_catalog"], sources["lure_index"], key]
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against our ETag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def accepted_codings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """
+    Content codings in an Accept-Encoding header mapped to their q-values.
+    """
+    accepted: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    return accepted
+
+
+def accepts(accept_encoding: Optional[str], coding: str) -> bool:
+    """
+    Whether a client sending this Accept-Encoding takes `coding` (q > 0,
+    directly or through '*').
+    """
+    accepted = accepted_codings(accept_encoding)
+    return accepted.get(coding, accepted.get("*", 0.0)) > 0
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Pick the best content coding we can serve from an Accept-Encoding header.
+
+    Returns one of: 'br', 'gzip', 'identity'.
+    """
+    if brotli is not None and accepts(accept_encoding, "br"):
+        return "br"
+    if accepts(accept_encoding, "gzip"):
+        return "gzip"
+    return "identity"
+
+
+class CachedResult:
+    """
+    One serialized pattern result plus its lazily built compressed variants.
+    """
+
+    __slots__ = ("etag", "bodies")
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.bodies: Dict[str, bytes] = {"identity": body}
+
+    def body_for(self, encoding: str) -> bytes:
+        """
+        Return the body for the given coding, compressing it only once.
+        """
+        if encoding == "identity" or len(self.bodies["identity"]) < MIN_COMPRESS_SIZE:
+            return self.bodies["identity"]
+        body = self.bodies.get(encoding)
+        if body is None:
+            raw = self.bodies["identity"]
+            if encoding == "br":
+                body = brotli.compress(raw)
+            else:
+                body = gzip.compress(raw, compresslevel=9, mtime=0)
+            self.bodies[encoding] = body
+        return body
+
+
+class ResultCache:
+    """
+    Bounded LRU of serialized pattern results keyed by condition key.
+
+    Also counts hits, misses, 304s and identity vs. sent body bytes so the
+    benchmark (and anyone debugging) can see what the cache is doing.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "bytes_identity": 0,
+            "bytes_sent": 0,
+        }
+
+    def get_or_build(self, key: str, builder: Callable[[], dict], etag: Optional[str] = None) -> CachedResult:
+        if etag is None:
+            etag = make_etag(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            # An entry built from older sources carries an older ETag.
+            if entry is not None and entry.etag == etag:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry
+
+        # Build outside the lock; two racing misses just build the same thing.
+        body = json.dumps(builder(), ensure_ascii=False, separators=(",", ":"))
+        entry = CachedResult(etag, body.encode("utf-8"))
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def record_sent(self, identity_size: int, sent_size: int) -> None:
+        with self._lock:
+            self.stats["bytes_identity"] += identity_size
+            self.stats["bytes_sent"] += sent_size
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.stats["not_modified"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+result_cache = ResultCache()
+
+
+def cached_json_response(
+    request: Request,
+    tier: str,
+    conditions: dict,
+    builder: Callable[[], dict],
+    cache: Optional[ResultCache] = None,
+    includes_stock: bool = False,
+) -> Response:
+    """
+    Serve a pattern result with ETag / If-None-Match (GET and HEAD) /
+    Cache-Control handling and a precompressed body matching the client's
+    Accept-Encoding.
+
+    includes_stock marks results that carry catalog gear or in-stock baits;
+    when such data is configured they get the shorter STOCK_CACHE_CONTROL.
+    """
+    if cache is None:
+        cache = result_cache
+    key = condition_key(tier, conditions)
+    sources = engine_sources()
+    etag = make_etag(key, sources)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": STOCK_CACHE_CONTROL if includes_stock and has_stock_data(sources) else CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "Content-Location": f"/pattern/{tier}?{canonical_query(conditions)}",
+    }
+
+    # The ETag only depends on the key, so a revalidation never builds a result.
+    # Only safe methods revalidate: a POST with If-None-Match still gets a body.
+    if request.method in ("GET", "HEAD") and etag_matches(request.headers.get("if-none-match"), etag):
+        cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    entry = cache.get_or_build(key, builder, etag)
+    identity = entry.bodies["identity"]
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    body = entry.body_for(encoding)
+    if body is not identity:
+        headers["Content-Encoding"] = encoding
+    cache.record_sent(len(identity), len(body))
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,375 @@
+# app/jobs.py
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+from app import echogram, regional
+
+
+JOB_DB_PATH = os.environ.get(
+    "JOB_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "jobs.sqlite3"),
+)
+# Worker processes run at lower OS priority so request handlers in the
+# server process always win the CPU when they need it.
+JOB_WORKER_NICE = int(os.environ.get("JOB_WORKER_NICE", "10"))
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+FINAL_STATES = ("succeeded", "failed", "cancelled")
+
+# How often a running job writes progress / checks for cancellation.
+PROGRESS_INTERVAL_S = 0.2
+
+# Each queue heartbeats the running jobs it owns; a running job whose owner
+# has been silent for HEARTBEAT_TIMEOUT_S is assumed dead and re-queued.
+HEARTBEAT_INTERVAL_S = float(os.environ.get("JOB_HEARTBEAT_INTERVAL_S", "5"))
+HEARTBEAT_TIMEOUT_S = float(os.environ.get("JOB_HEARTBEAT_TIMEOUT_S", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    dedupe_key TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at);
+CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status);
+"""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Add columns introduced after a database was first created.
+    """
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for name, decl in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+
+
+# ---------- Job handlers (run inside worker processes) ----------
+
+
+def _run_sonar_pyramid(params: dict, report: Callable[[float], None]) -> dict:
+    index = echogram.build_pyramid(
+        params["recording_id"],
+        pooling=params.get("pooling", "max"),
+        data_dir=params.get("data_dir"),
+        progress=report,
+    )
+    return {"recording_id": params["recording_id"], "levels": len(index["levels"])}
+
+
+def _run_regional_precompute(params: dict, report: Callable[[float], None]) -> dict:
+    path = regional.precompute_phase_grids(
+        params["raster_id"],
+        data_dir=params.get("data_dir"),
+        progress=report,
+    )
+    return {"raster_id": params["raster_id"], "path": path}
+
+
+# kind -> (handler, required params, optional params clients may set)
+JOB_KINDS: Dict[str, tuple] = {
+    "sonar_pyramid": (_run_sonar_pyramid, {"recording_id"}, {"pooling"}),
+    "regional_precompute": (_run_regional_precompute, {"raster_id"}, set()),
+}
+
+
+def validate_params(kind: str, params: dict) -> None:
+    """
+    Check client-supplied params for a job kind; raises ValueError.
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"unknown job kind: {kind}")
+    _, required, optional = JOB_KINDS[kind]
+    missing = required - set(params)
+    unknown = set(params) - required - optional
+    if missing:
+        raise ValueError(f"missing params for {kind}: {sorted(missing)}")
+    if unknown:
+        raise ValueError(f"unknown params for {kind}: {sorted(unknown)}")
+
+
+def _worker_init(nice: int) -> None:
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+
+def _run_job(db_path: str, job_id: str, kind: str, params: dict) -> dict:
+    """
+    Worker-process entry point. Progress and cancellation go through the
+    job's own row so nothing needs to be shared with the server process.
+    """
+    conn = _connect(db_path)
+    last = [0.0]
+
+    def report(fraction: float) -> None:
+        now = time.monotonic()
+        if now - last[0] < PROGRESS_INTERVAL_S and fraction < 1.0:
+            return
+        last[0] = now
+        row = conn.execute(
+            "UPDATE jobs SET progress = ? WHERE id = ? RETURNING cancel_requested",
+            (min(max(fraction, 0.0), 1.0), job_id),
+        ).fetchone()
+        if row is not None and row["cancel_requested"]:
+            raise JobCancelled(job_id)
+
+    try:
+        report(0.0)
+        return JOB_KINDS[kind][0](params, report)
+    finally:
+        conn.close()
+
+
+# ---------- Queue ----------
+
+
+class JobQueue:
+    """
+    Persistent priority queue of background jobs executed by a process pool.
+
+    Jobs are rows in SQLite, so queued work survives restarts. A dispatcher
+    thread claims the highest-priority queued job whenever a worker slot is
+    free; cancellation is immediate for queued jobs and cooperative (checked
+    on each progress report) for running ones.
+
+    Several server processes may share one database: claims are a single
+    UPDATE, and running rows carry their owner and a heartbeat so only jobs
+    of a dead owner are re-queued.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_workers: Optional[int] = None):
+        self.db_path = db_path or JOB_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._conn = _connect(self.db_path)
+        self._conn.executescript(_SCHEMA)
+        _migrate(self._conn)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(self.max_workers)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- Client API ----------
+
+    def submit(
+        self,
+        kind: str,
+        params: dict,
+        priority: str = "normal",
+        dedupe_key: Optional[str] = None,
+    ) -> dict:
+        """
+        Queue a job and return its status row. With a dedupe_key, an already
+        queued or running job with the same key is returned instead.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"unknown priority: {priority}")
+
+        with self._lock:
+            if dedupe_key is not None:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                    (dedupe_key,),
+                ).fetchone()
+                if row is not None:
+                    return _row_to_dict(row)
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, params, priority, dedupe_key, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params), PRIORITIES[priority], dedupe_key, time.time()),
+            )
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_dict(row) if row is not None else None
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+        return self.get(job_id)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    # ---------- Dispatcher ----------
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_worker_init,
+                initargs=(JOB_WORKER_NICE,),
+            )
+            self._thread = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _claim_next(self) -> Optional[sqlite3.Row]:
+        now = time.time()
+        with self._lock:
+            # One statement, so two queues sharing the database never claim
+            # the same row.
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' "
+                "ORDER BY priority, created_at LIMIT 1) AND status = 'queued' "
+                "RETURNING *",
+                (self.owner, now, now),
+            ).fetchone()
+
+    def _heartbeat(self) -> None:
+        """
+        Refresh our running jobs and re-queue those whose owner went silent.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+                (now, self.owner),
+            )
+            dead = "status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)"
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE {dead} AND cancel_requested = 1",
+                (now, now - HEARTBEAT_TIMEOUT_S),
+            )
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, started_at = NULL, "
+                f"heartbeat_at = NULL, progress = 0 WHERE {dead}",
+                (now - HEARTBEAT_TIMEOUT_S,),
+            ).rowcount
+        if requeued:
+            self._wakeup.set()
+
+    def _dispatch(self) -> None:
+        last_beat = 0.0
+        while not self._stopped.is_set():
+            if time.monotonic() - last_beat >= HEARTBEAT_INTERVAL_S:
+                self._heartbeat()
+                last_beat = time.monotonic()
+            # Timed, so a full pool never keeps stop() or the heartbeat waiting.
+            if not self._slots.acquire(timeout=0.5):
+                continue
+            row = self._claim_next()
+            if row is None:
+                self._slots.release()
+                self._wakeup.wait(0.5)
+                self._wakeup.clear()
+                continue
+            future = self._pool.submit(
+                _run_job, self.db_path, row["id"], row["kind"], json.loads(row["params"])
+            )
+            future.add_done_callback(lambda f, job_id=row["id"]: self._finish(job_id, f))
+
+    def _finish(self, job_id: str, future) -> None:
+        self._slots.release()
+        status, result, error = "succeeded", None, None
+        try:
+            result = json.dumps(future.result())
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as exc:  # noqa: BLE001 - any job failure is recorded
+            status, error = "failed", f"{type(exc).__name__}: {exc}"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "progress = CASE WHEN ? = 'succeeded' THEN 1.0 ELSE progress END "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (status, result, error, time.time(), status, job_id, self.owner),
+            )
+        self._wakeup.set()
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    priority_names = {v: k for k, v in PRIORITIES.items()}
+    return {
+        "job_id": row["id"],
+        "kind": row["kind"],
+        "priority": priority_names[row["priority"]],
+        "status": row["status"],
+        "progress": round(row["progress"], 4),
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Process-wide job queue, started on first use.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                queue = JobQueue()
+                queue.start()
+                _queue = queue
+    return _queue
@@ -0,0 +1,424 @@
+# app/knowledge.py
+
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app import http_cache
+from app.pattern_logic import build_pattern_summary, infer_depth_zone, classify_phase
+
+
+# Optional extra knowledge: every .txt/.md file here is split into
+# paragraphs and indexed alongside the engine's own text.
+KNOWLEDGE_DIR = os.environ.get(
+    "KNOWLEDGE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge"),
+)
+# Prebuilt index (see `python -m app.knowledge build`); rebuilt in memory if
+# absent, unreadable or built from other rules or knowledge files.
+KNOWLEDGE_INDEX_PATH = os.environ.get("KNOWLEDGE_INDEX_PATH")
+
+KNOWLEDGE_EXTENSIONS = (".txt", ".md")
+
+INDEX_MAGIC = b"AIQBM25\x01"
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from how i if in into is it its "
+    "me my of on or so than that the their them then there these they this to "
+    "up use what when where which while who why will with you your".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens with stopwords dropped and a light plural strip
+    ('banks' -> 'bank', 'grass' stays 'grass').
+    """
+    tokens = []
+    for tok in _TOKEN.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+# ---------- Corpus ----------
+
+
+# Inputs swept through the engine to collect every snippet it can produce.
+# One spring and one fall month, since the same water temperature maps to
+# different phases depending on whether the lake is warming or cooling.
+_SWEEP = {
+    "month": [4, 10],
+    "temp_f": [45.0, 55.0, 65.0, 75.0, 85.0],
+    "clarity": ["clear", "stained", "muddy"],
+    "wind_speed": [2.0, 6.0, 12.0],
+    "sky_condition": ["sunny", "cloudy"],
+    "depth_ft": [None, 5.0, 12.0, 25.0],
+    "bottom_composition": [None, "rock", "grass", "sand"],
+}
+
+
+def _wind_label(wind_speed: float) -> str:
+    if wind_speed >= 10:
+        return "windy"
+    if wind_speed <= 3:
+        return "calm"
+    return "breezy"
+
+
+def engine_documents() -> List[dict]:
+    """
+    Snippets from the pattern engine (targets, tips, color guidance, lures
+    and setups), each tagged with the conditions that produce it.
+
+    A snippet only gets a tag for a condition (e.g. 'muddy', 'rock') when it
+    is specific to some of that condition's values, so generic advice isn't
+    pulled toward every query.
+    """
+    seen: Dict[tuple, dict] = {}
+    names = list(_SWEEP)
+    for values in itertools.product(*_SWEEP.values()):
+        inputs = dict(zip(names, values))
+        summary = build_pattern_summary(**inputs)
+        context = {
+            "phase": summary["phase"],
+            "depth zone": summary["depth_zone"],
+            "clarity": inputs["clarity"],
+            "wind": _wind_label(inputs["wind_speed"]),
+            "sky": inputs["sky_condition"],
+            "bottom": inputs["bottom_composition"] or "any bottom",
+        }
+
+        snippets = [("target", t) for t in summary["recommended_targets"]]
+        snippets += [("strategy tip", t) for t in summary["strategy_tips"]]
+        snippets += [("color guidance", t) for t in summary["color_recommendations"]]
+        snippets += [
+            (
+                "setup",
+                f"{s['lure']}: {s['technique']}; rod {s['rod']}; reel {s['reel']}; "
+                f"line {s['line']}; hook {s['hook_or_leader']}; size {s['lure_size']}",
+            )
+            for s in summary["lure_setups"]
+        ]
+
+        for kind, text in snippets:
+            doc = seen.setdefault((kind, text), {"kind": kind, "text": text, "context": {}})
+            for dim, value in context.items():
+                doc["context"].setdefault(dim, set()).add(value)
+
+    all_values = {
+        "phase": {classify_phase(t, m) for t in _SWEEP["temp_f"] for m in _SWEEP["month"]},
+        "depth zone": {
+            infer_depth_zone(classify_phase(t, m), d)
+            for t in _SWEEP["temp_f"] for m in _SWEEP["month"] for d in _SWEEP["depth_ft"]
+        },
+        "clarity": set(_SWEEP["clarity"]),
+        "wind": {_wind_label(w) for w in _SWEEP["wind_speed"]},
+        "sky": set(_SWEEP["sky_condition"]),
+        "bottom": {b or "any bottom" for b in _SWEEP["bottom_composition"]},
+    }
+
+    docs = []
+    for doc in seen.values():
+        tags = []
+        for dim, values in doc["context"].items():
+            if values != all_values[dim]:
+                tags.extend(sorted(values))
+        docs.append({
+            "text": doc["text"],
+            "source": f"engine:{doc['kind']}",
+            "tags": tags,
+        })
+    return docs
+
+
+def knowledge_sources(knowledge_dir: Optional[str] = None) -> dict:
+    """
+    What an index is built from: the engine's sources (rules version, gear
+    catalog and lure index, as in http_cache.engine_sources()) plus a digest
+    over the knowledge files' names and contents.
+    """
+    knowledge_dir = knowledge_dir or KNOWLEDGE_DIR
+    h = hashlib.sha256()
+    if os.path.isdir(knowledge_dir):
+        for name in sorted(os.listdir(knowledge_dir)):
+            if name.endswith(KNOWLEDGE_EXTENSIONS):
+                h.update(name.encode("utf-8") + b"\0")
+                h.update(http_cache.file_digest(os.path.join(knowledge_dir, name)).encode("ascii"))
+    return {**http_cache.engine_sources(), "knowledge_files": h.hexdigest()}
+
+
+def file_documents(knowledge_dir: Optional[str] = None) -> List[dict]:
+    """
+    Paragraphs from .txt/.md files in the knowledge directory.
+    """
+    knowledge_dir = knowledge_dir or KNOWLEDGE_DIR
+    if not os.path.isdir(knowledge_dir):
+        return []
+    docs = []
+    for name in sorted(os.listdir(knowledge_dir)):
+        if not name.endswith(KNOWLEDGE_EXTENSIONS):
+            continue
+        with open(os.path.join(knowledge_dir, name), encoding="utf-8") as fh:
+            paragraphs = re.split(r"\n\s*\n", fh.read())
+        for para in paragraphs:
+            para = " ".join(para.split())
+            if para:
+                docs.append({"text": para, "source": f"file:{name}", "tags": []})
+    return docs
+
+
+# ---------- Index ----------
+
+
+class BM25Index:
+    """
+    Inverted index with precomputed BM25 impact weights.
+
+    Each posting stores its term's full BM25 contribution for that document,
+    so a query is just summing the postings of its terms. Arrays may be
+    backed by a memory-mapped file (see save/load).
+    """
+
+    def __init__(self, vocab: Dict[str, int], term_offsets, postings_doc, postings_weight, docs):
+        self.vocab = vocab
+        self.term_offsets = term_offsets
+        self.postings_doc = postings_doc
+        self.postings_weight = postings_weight
+        self._docs = docs
+        self._mm = None
+        # knowledge_sources() the index was built from, if known.
+        self.sources: Optional[dict] = None
+
+    @property
+    def n_docs(self) -> int:
+        return len(self._docs)
+
+    @classmethod
+    def build(cls, docs: Iterable[dict], k1: float = K1, b: float = B) -> "BM25Index":
+        docs = list(docs)
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(len(docs), dtype=np.float32)
+        for doc_id, doc in enumerate(docs):
+            tokens = tokenize(doc["text"] + " " + " ".join(doc.get("tags", ())))
+            lengths[doc_id] = len(tokens)
+            for tok in tokens:
+                tfs = postings.setdefault(tok, {})
+                tfs[doc_id] = tfs.get(doc_id, 0) + 1
+
+        n = max(len(docs), 1)
+        avgdl = float(lengths.mean()) if len(docs) else 1.0
+        norms = k1 * (1 - b + b * lengths / max(avgdl, 1e-9))
+
+        terms = sorted(postings)
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        doc_chunks, weight_chunks = [], []
+        for i, term in enumerate(terms):
+            ids = np.fromiter(postings[term].keys(), dtype=np.uint32)
+            tf = np.fromiter(postings[term].values(), dtype=np.float32)
+            df = len(ids)
+            idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+            doc_chunks.append(ids)
+            weight_chunks.append((idf * tf * (k1 + 1) / (tf + norms[ids])).astype(np.float32))
+            term_offsets[i + 1] = term_offsets[i] + df
+
+        return cls(
+            vocab={term: i for i, term in enumerate(terms)},
+            term_offsets=term_offsets,
+            postings_doc=np.concatenate(doc_chunks) if doc_chunks else np.zeros(0, np.uint32),
+            postings_weight=np.concatenate(weight_chunks) if weight_chunks else np.zeros(0, np.float32),
+            docs=[json.dumps({"text": d["text"], "source": d.get("source", "")}) for d in docs],
+        )
+
+    def doc(self, doc_id: int) -> dict:
+        raw = self._docs[doc_id]
+        if isinstance(raw, (bytes, bytearray, memoryview)):
+            raw = bytes(raw).decode("utf-8")
+        return json.loads(raw)
+
+    def search(self, query: str, k: int = 5) -> List[dict]:
+        """
+        Top-k documents for a free-text query, best first.
+        """
+        ids, weights = [], []
+        for term in set(tokenize(query)):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            lo, hi = int(self.term_offsets[t]), int(self.term_offsets[t + 1])
+            ids.append(self.postings_doc[lo:hi])
+            weights.append(self.postings_weight[lo:hi])
+        if not ids:
+            return []
+
+        ids = np.concatenate(ids)
+        weights = np.concatenate(weights)
+        candidates, inverse = np.unique(ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = []
+        for i in top:
+            doc = self.doc(int(candidates[i]))
+            doc["score"] = round(float(scores[i]), 4)
+            results.append(doc)
+        return results
+
+    # ---------- Serialization ----------
+
+    def save(self, path: str) -> None:
+        """
+        Write the index as one file: magic, JSON header, then 8-byte aligned
+        arrays that load() maps without copying.
+        """
+        doc_blobs = [d.encode("utf-8") if isinstance(d, str) else bytes(d) for d in self._docs]
+        doc_offsets = np.zeros(len(doc_blobs) + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in doc_blobs], out=doc_offsets[1:])
+        vocab_blob = "\n".join(sorted(self.vocab, key=self.vocab.get)).encode("utf-8")
+
+        arrays = {
+            "term_offsets": np.asarray(self.term_offsets, dtype=np.int64),
+            "postings_doc": np.asarray(self.postings_doc, dtype=np.uint32),
+            "postings_weight": np.asarray(self.postings_weight, dtype=np.float32),
+            "doc_offsets": doc_offsets,
+            "vocab": np.frombuffer(vocab_blob, dtype=np.uint8),
+            "docs": np.frombuffer(b"".join(doc_blobs), dtype=np.uint8),
+        }
+        layout, offset = {}, 0
+        for name, arr in arrays.items():
+            layout[name] = [offset, arr.dtype.str, int(arr.size)]
+            offset += -(-arr.nbytes // 8) * 8
+        header = json.dumps({"n_docs": len(doc_blobs), "sources": self.sources, "arrays": layout}).encode("utf-8")
+        header += b" " * (-(len(INDEX_MAGIC) + 8 + len(header)) % 8)
+
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(INDEX_MAGIC)
+            fh.write(struct.pack("<Q", len(header)))
+            fh.write(header)
+            for arr in arrays.values():
+                data = arr.tobytes()
+                fh.write(data)
+                fh.write(b"\0" * (-len(data) % 8))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, sources: Optional[dict] = None) -> "BM25Index":
+        """
+        Map an index written by save(). With `sources`, raises ValueError
+        unless the index was built from exactly those sources.
+        """
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a knowledge index")
+        (header_len,) = struct.unpack_from("<Q", mm, len(INDEX_MAGIC))
+        start = len(INDEX_MAGIC) + 8
+        header = json.loads(mm[start:start + header_len])
+        built_from = header.get("sources") or {}
+        if sources is not None and built_from != sources:
+            stale = sorted(k for k in sources if built_from.get(k) != sources[k])
+            raise ValueError(f"{path} is stale ({', '.join(stale)} changed)")
+        base = start + header_len
+
+        arrays = {}
+        for name, (offset, dtype, count) in header["arrays"].items():
+            arrays[name] = np.frombuffer(mm, dtype=np.dtype(dtype), count=count, offset=base + offset)
+
+        vocab_terms = arrays["vocab"].tobytes().decode("utf-8").split("\n")
+        docs = _DocView(arrays["docs"], arrays["doc_offsets"])
+        index = cls(
+            vocab={term: i for i, term in enumerate(vocab_terms) if term},
+            term_offsets=arrays["term_offsets"],
+            postings_doc=arrays["postings_doc"],
+            postings_weight=arrays["postings_weight"],
+            docs=docs,
+        )
+        index._mm = mm
+        index.sources = header.get("sources")
+        return index
+
+
+class _DocView:
+    """
+    Lazy list of stored documents over the mapped blob + offsets arrays.
+    """
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> memoryview:
+        return memoryview(self._blob[int(self._offsets[i]):int(self._offsets[i + 1])])
+
+
+def build_default_index(knowledge_dir: Optional[str] = None) -> BM25Index:
+    index = BM25Index.build(engine_documents() + file_documents(knowledge_dir))
+    index.sources = knowledge_sources(knowledge_dir)
+    return index
+
+
+_index: Optional[BM25Index] = None
+_index_error: Optional[str] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> BM25Index:
+    """
+    Process-wide index: the prebuilt file if KNOWLEDGE_INDEX_PATH is set and
+    current, otherwise built from the engine corpus and knowledge files.
+    The app builds it at startup; the first caller builds it otherwise.
+    """
+    global _index, _index_error
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = None
+                if KNOWLEDGE_INDEX_PATH:
+                    try:
+                        index = BM25Index.load(KNOWLEDGE_INDEX_PATH, sources=knowledge_sources())
+                    except (OSError, ValueError, KeyError) as exc:
+                        _index_error = str(exc)
+                _index = index if index is not None else build_default_index()
+    return _index
+
+
+def index_status() -> dict:
+    loaded = _index is not None and _index._mm is not None
+    return {
+        "path": KNOWLEDGE_INDEX_PATH,
+        "loaded": loaded,
+        "error": _index_error,
+        "docs": _index.n_docs if _index is not None else 0,
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.knowledge build <out-path> [knowledge-dir]
+    # The knowledge dir must match KNOWLEDGE_DIR where the index is served.
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        sys.exit("usage: python -m app.knowledge build <out-path> [knowledge-dir]")
+    built = build_default_index(sys.argv[3] if len(sys.argv) > 3 else None)
+    built.save(sys.argv[2])
+    print(f"wrote {built.n_docs} documents, {len(built.vocab)} terms to {sys.argv[2]}")
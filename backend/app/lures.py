@@ -0,0 +1,433 @@
+# app/lures.py
+
+import hashlib
+import heapq
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Prebuilt index of real inventory written by `python -m app.lures build`.
+# Without one, PRO summaries recommend no concrete baits.
+LURE_INDEX_PATH = os.environ.get("LURE_INDEX_PATH")
+LURE_INDEX_VERSION = 1
+
+BAITS_PER_LURE = 3
+LEAF_SIZE = 16
+
+
+# ---------- Color space ----------
+
+
+# Representative sRGB for each named lure color (two-tone patterns use the
+# color that dominates the bait's silhouette).
+COLORS: Dict[str, Tuple[int, int, int]] = {
+    "green pumpkin": (96, 86, 44),
+    "watermelon": (95, 110, 60),
+    "black": (20, 20, 22),
+    "black/blue": (28, 32, 72),
+    "black/red": (52, 18, 18),
+    "junebug": (60, 30, 80),
+    "white": (245, 245, 245),
+    "pearl": (230, 232, 222),
+    "chartreuse": (200, 230, 30),
+    "white/chartreuse": (225, 240, 130),
+    "chartreuse/black back": (140, 160, 30),
+    "firetiger": (190, 170, 40),
+    "sexy shad": (175, 185, 180),
+    "translucent shad": (205, 210, 205),
+    "silver": (192, 192, 192),
+    "gold": (212, 175, 55),
+    "red craw": (170, 50, 30),
+    "orange craw": (185, 95, 40),
+    "brown": (100, 70, 40),
+    "blue": (40, 70, 160),
+    "purple": (90, 40, 120),
+    "smoke": (120, 115, 110),
+}
+
+# Target colors per (clarity, sunny?) -- the concrete version of the
+# guidance in pattern_logic.recommend_color_palettes.
+PALETTES: Dict[Tuple[str, bool], List[str]] = {
+    ("clear", True): ["translucent shad", "green pumpkin", "silver"],
+    ("clear", False): ["sexy shad", "green pumpkin", "watermelon"],
+    ("stained", True): ["green pumpkin", "white/chartreuse", "orange craw"],
+    ("stained", False): ["white/chartreuse", "firetiger", "chartreuse/black back"],
+    ("muddy", True): ["black/blue", "black/red", "chartreuse"],
+    ("muddy", False): ["black", "black/blue", "chartreuse/black back"],
+}
+
+
+def srgb_to_lab(rgb) -> np.ndarray:
+    """
+    CIE L*a*b* (D65) for sRGB values in 0-255; works on (..., 3) arrays.
+    Euclidean distance in Lab (delta E 1976) tracks perceived difference.
+    """
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    m = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ])
+    xyz = c @ m.T / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack(
+        [116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])],
+        axis=-1,
+    )
+
+
+COLOR_LAB = {name: srgb_to_lab(rgb) for name, rgb in COLORS.items()}
+
+
+def target_palette(clarity: str, sky_condition: str) -> List[str]:
+    clarity = clarity.lower().strip()
+    if clarity not in ("clear", "stained"):
+        clarity = "muddy"
+    return PALETTES[(clarity, "sun" in sky_condition.lower())]
+
+
+# ---------- Lure families ----------
+
+
+# Keyword -> catalog family; first match wins, so specific names come first.
+_FAMILY_KEYWORDS = [
+    ("swim jig", "swim jig"),
+    ("chatterbait", "chatterbait"),
+    ("spinnerbait", "spinnerbait"),
+    ("lipless", "lipless crankbait"),
+    ("squarebill", "squarebill"),
+    ("crankbait", "crankbait"),
+    ("jerkbait", "jerkbait"),
+    ("swimbait", "swimbait"),
+    ("blade bait", "blade bait"),
+    ("finesse jig", "finesse jig"),
+    ("jig", "jig"),
+    ("creature", "creature bait"),
+    ("carolina", "lizard"),
+    ("finesse worm", "finesse worm"),
+    ("worm", "worm"),
+]
+FAMILIES = sorted({family for _, family in _FAMILY_KEYWORDS})
+
+
+def lure_family(lure: str) -> Optional[str]:
+    l = lure.lower()
+    for keyword, family in _FAMILY_KEYWORDS:
+        if keyword in l:
+            return family
+    return None
+
+
+_COLOR_PATTERNS = {
+    name: re.compile(r"(?<![\w/])" + re.escape(name) + r"(?![\w/])") for name in COLORS
+}
+
+
+def named_colors(lure: str) -> List[str]:
+    """
+    Colors the lure text itself asks for, e.g. 'black/blue jig'.
+    """
+    l = lure.lower()
+    return [name for name, pattern in _COLOR_PATTERNS.items() if pattern.search(l)]
+
+
+# ---------- KD-tree ----------
+
+
+class KDTree:
+    """
+    Static k-d tree over a few thousand low-dimensional points.
+
+    Nodes are flat arrays (split dim/value, child ids, point range) so the
+    tree serializes as-is; queries walk Python-list copies of them, which
+    is faster than indexing numpy one node at a time.
+    """
+
+    def __init__(self, points: np.ndarray, order: np.ndarray, nodes: np.ndarray, splits: np.ndarray):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.order = np.asarray(order, dtype=np.int64)
+        self.nodes = np.asarray(nodes, dtype=np.int64)  # dim, left, right, start, stop
+        self.splits = np.asarray(splits, dtype=np.float64)
+        self._nodes = self.nodes.tolist()
+        self._splits = self.splits.tolist()
+        self._pts = self.points.tolist()
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def build(cls, points: np.ndarray, leaf_size: int = LEAF_SIZE) -> "KDTree":
+        points = np.asarray(points, dtype=np.float64)
+        order = np.arange(len(points))
+        nodes: List[list] = []
+        splits: List[float] = []
+        stack = [(0, len(points), -1, 0)]  # start, stop, parent, side
+        while stack:
+            start, stop, parent, side = stack.pop()
+            node_id = len(nodes)
+            nodes.append([-1, -1, -1, start, stop])
+            splits.append(0.0)
+            if parent >= 0:
+                nodes[parent][1 + side] = node_id
+            if stop - start <= leaf_size:
+                continue
+            block = points[order[start:stop]]
+            dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+            mid = (stop - start) // 2
+            part = np.argpartition(block[:, dim], mid)
+            order[start:stop] = order[start:stop][part]
+            nodes[node_id][0] = dim
+            splits[node_id] = float(points[order[start + mid], dim])
+            stack.append((start + mid, stop, node_id, 1))
+            stack.append((start, start + mid, node_id, 0))
+        return cls(points[order], order, np.asarray(nodes, dtype=np.int64).reshape(-1, 5), splits)
+
+    def query(self, x, k: int = 1) -> List[Tuple[float, int]]:
+        """
+        The k nearest points to x as (distance, original index), nearest
+        first.
+        """
+        x = [float(v) for v in x]
+        nodes, splits, pts = self._nodes, self._splits, self._pts
+        best: List[Tuple[float, int]] = []  # max-heap of (-d2, slot)
+        stack = [(0, 0.0)]
+        while stack:
+            node_id, bound = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            dim, left, right, start, stop = nodes[node_id]
+            if dim < 0:
+                for slot in range(start, stop):
+                    p = pts[slot]
+                    d2 = (p[0] - x[0]) ** 2 + (p[1] - x[1]) ** 2 + (p[2] - x[2]) ** 2
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, slot))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, slot))
+                continue
+            diff = x[dim] - splits[node_id]
+            near, far = (right, left) if diff >= 0 else (left, right)
+            # Push the far side first so the near side is searched first.
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+        order = self.order
+        return [(float(np.sqrt(-d2)), int(order[slot])) for d2, slot in sorted(best, reverse=True)]
+
+
+# ---------- Catalog + index ----------
+
+
+_SERIES = ["Ridgeline", "Tidewater", "Ironwood", "Current", "Falcon", "Summit", "Driftline", "Backwater"]
+
+
+def generate_skus(per_color: int = 80, seed: int = 0) -> List[dict]:
+    """
+    Deterministic synthetic SKU list (families x colors x variants), with
+    each variant's color jittered around its named color. For tests and
+    benchmarks only; the made-up SKUs are never served.
+    """
+    rng = random.Random(seed)
+    skus = []
+    for family in FAMILIES:
+        for color, rgb in COLORS.items():
+            for v in range(per_color):
+                jitter = tuple(min(255, max(0, c + rng.randint(-18, 18))) for c in rgb)
+                skus.append({
+                    "sku": f"{family[:3].upper()}-{len(skus):06d}",
+                    "name": f"{rng.choice(_SERIES)} {family} – {color}",
+                    "family": family,
+                    "color": color,
+                    "rgb": jitter,
+                    "price": round(rng.uniform(4, 25), 2),
+                    "stock": rng.choice((0, 0, 3, 8, 12, 25, 40)),
+                })
+    return skus
+
+
+class LureIndex:
+    """
+    In-stock SKUs grouped by lure family, one KD-tree over Lab colors per
+    family.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], trees: Dict[str, KDTree], members: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.trees = trees
+        self.members = members
+        # (family, target colors, limit) -> baits; the space is small.
+        self._memo: Dict[tuple, List[dict]] = {}
+        # sha256 of the file the index was loaded from (see load).
+        self.digest = "in-memory"
+
+    def __len__(self) -> int:
+        return len(self.columns["sku"])
+
+    @classmethod
+    def build(cls, skus: List[dict]) -> "LureIndex":
+        columns = {
+            "sku": np.asarray([s["sku"] for s in skus]),
+            "name": np.asarray([s["name"] for s in skus]),
+            "family": np.asarray([s["family"] for s in skus]),
+            "color": np.asarray([s["color"] for s in skus]),
+            "lab": srgb_to_lab(np.asarray([s["rgb"] for s in skus], dtype=np.float64).reshape(-1, 3)),
+            "price": np.asarray([s["price"] for s in skus], dtype=np.float64),
+            "stock": np.asarray([s["stock"] for s in skus], dtype=np.int64),
+        }
+        trees, members = {}, {}
+        in_stock = columns["stock"] > 0
+        for family in np.unique(columns["family"]).tolist():
+            rows = np.flatnonzero((columns["family"] == family) & in_stock)
+            if len(rows):
+                trees[family] = KDTree.build(columns["lab"][rows])
+                members[family] = rows
+        return cls(columns, trees, members)
+
+    def nearest(self, family: str, lab, k: int = 1) -> List[dict]:
+        tree = self.trees.get(family)
+        if tree is None:
+            return []
+        out = []
+        for dist, i in tree.query(lab, k):
+            row = int(self.members[family][i])
+            out.append({
+                "sku": str(self.columns["sku"][row]),
+                "name": str(self.columns["name"][row]),
+                "color": str(self.columns["color"][row]),
+                "price": float(self.columns["price"][row]),
+                "stock": int(self.columns["stock"][row]),
+                "delta_e": round(dist, 2),
+            })
+        return out
+
+    def baits_for(self, lure: str, palette: List[str], limit: int = BAITS_PER_LURE) -> List[dict]:
+        """
+        In-stock baits for a recommended lure, nearest to each target color
+        in turn (colors named in the lure text go first), without repeats.
+        Results are memoized, so treat them as read-only.
+        """
+        family = lure_family(lure)
+        if family is None:
+            return []
+        named = named_colors(lure)
+        targets = tuple(named + [c for c in palette if c not in named])
+        key = (family, targets, limit)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+
+        picked, seen = [], set()
+        for color in targets:
+            for bait in self.nearest(family, COLOR_LAB[color], k=2):
+                if bait["sku"] not in seen:
+                    seen.add(bait["sku"])
+                    picked.append(dict(bait, target=color))
+                    break
+            if len(picked) >= limit:
+                break
+        self._memo[key] = picked
+        return picked
+
+    # ---------- Snapshot ----------
+
+    def save(self, path: str) -> None:
+        arrays = {f"col_{name}": arr for name, arr in self.columns.items()}
+        for family, tree in self.trees.items():
+            arrays[f"tree_{family}_points"] = tree.points
+            arrays[f"tree_{family}_order"] = tree.order
+            arrays[f"tree_{family}_nodes"] = tree.nodes
+            arrays[f"tree_{family}_splits"] = tree.splits
+            arrays[f"tree_{family}_members"] = self.members[family]
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, version=np.array(LURE_INDEX_VERSION), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LureIndex":
+        # Hash the bytes actually loaded, not whatever is on disk later.
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        with np.load(io.BytesIO(raw)) as data:
+            if int(data["version"]) != LURE_INDEX_VERSION:
+                raise ValueError(f"{path} is lure index v{int(data['version'])}, expected v{LURE_INDEX_VERSION}")
+            columns = {k[4:]: data[k] for k in data.files if k.startswith("col_")}
+            families = {k[5:-7] for k in data.files if k.startswith("tree_") and k.endswith("_points")}
+            trees, members = {}, {}
+            for family in families:
+                p = f"tree_{family}_"
+                trees[family] = KDTree(data[p + "points"], data[p + "order"], data[p + "nodes"], data[p + "splits"])
+                members[family] = data[p + "members"]
+        index = cls(columns, trees, members)
+        index.digest = hashlib.sha256(raw).hexdigest()
+        return index
+
+
+_index: Optional[LureIndex] = None
+_index_lock = threading.Lock()
+# Path that last failed to load (not retried) and why.
+_index_failed_path: Optional[str] = None
+_index_error: Optional[str] = None
+
+
+def get_lure_index() -> Optional[LureIndex]:
+    """
+    Process-wide index loaded from LURE_INDEX_PATH, or None when no real
+    inventory is configured or the file can't be used (the reason is kept
+    for index_status()).
+    """
+    global _index, _index_failed_path, _index_error
+    if _index is None and LURE_INDEX_PATH and LURE_INDEX_PATH != _index_failed_path:
+        with _index_lock:
+            if _index is None and LURE_INDEX_PATH != _index_failed_path:
+                try:
+                    _index = LureIndex.load(LURE_INDEX_PATH)
+                    _index_error = None
+                except (OSError, ValueError, KeyError) as exc:
+                    _index_failed_path, _index_error = LURE_INDEX_PATH, str(exc)
+    return _index
+
+
+def index_status() -> dict:
+    index = get_lure_index()
+    return {
+        "path": LURE_INDEX_PATH,
+        "loaded": index is not None,
+        "error": _index_error,
+        "skus": len(index) if index is not None else 0,
+    }
+
+
+def index_digest() -> str:
+    """
+    Digest of the index get_lure_index() serves, or "none" without one.
+    """
+    index = get_lure_index()
+    return index.digest if index is not None else "none"
+
+
+def load_skus(path: str) -> List[dict]:
+    """
+    Inventory JSON: a list of {sku, name, family, color, rgb, price, stock}.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        skus = json.load(fh)
+    for sku in skus:
+        sku["rgb"] = tuple(sku["rgb"])
+    return skus
+
+
+if __name__ == "__main__":
+    # python -m app.lures build <inventory.json> <out-path>
+    if len(sys.argv) < 4 or sys.argv[1] != "build":
+        sys.exit("usage: python -m app.lures build <inventory.json> <out-path>")
+    built = LureIndex.build(load_skus(sys.argv[2]))
+    built.save(sys.argv[3])
+    print(f"wrote {len(built)} SKUs, {len(built.trees)} families to {sys.argv[3]}")
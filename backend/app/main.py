@@ -1,15 +1,60 @@
-from typing import Optional
+import asyncio
+import datetime
+import hmac
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from app.pattern_logic import (
-    build_basic_pattern_summary,
-    build_pattern_summary,
+from app import echogram, gear, lures, regional
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.echogram import (
+    TILE_SIZE,
+    is_valid_recording_id,
+    open_pyramid,
+    pyramid_status,
 )
+from app.history import get_history
+from app.http_cache import accepts, cached_json_response
+from app.jobs import FINAL_STATES, get_job_queue, validate_params
+from app.knowledge import get_index, index_status
+from app.planner import DEFAULT_BOAT_SPEED_MPH, DEFAULT_FISHING_HOURS, plan_trip
+from app.profiler import APP_MODULES, MAX_HZ, profile
+from app.regional import LAYERS, legend, regional_tiles
+from app.snapshot import basic_pattern_summary, get_snapshot, pattern_summary, snapshot_status
+from app.sweep import sweep, validate_axes
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build (or map) the /chat index before taking traffic rather than
+    # inside the first /chat request.
+    get_index()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Shared secret for /admin/* routes (X-Admin-Token header); unset disables them.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Longest profile a single /admin/profile call may run.
+MAX_PROFILE_SECONDS = 60.0
+
+# Map the prebuilt engine snapshot (ENGINE_SNAPSHOT_PATH) now rather than on
+# the first request; without one the engine builds its tables lazily.
+get_snapshot()
+
+# --- Tier-aware admission control for /pattern/* (inside CORS so 503s
+# still carry CORS headers) ---
+
+admission = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=admission)
 
 # --- CORS so frontend on :3000 can talk to backend on :8000 ---
 
@@ -33,9 +78,12 @@ class BasicPatternRequest(BaseModel):
     BASIC tier pattern request.
     """
     temp_f: float
-    month: int
+    month: int = Field(..., ge=1, le=12)
     clarity: str
     wind_speed: float
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    day_of_year: Optional[int] = Field(None, ge=1, le=366)
+    temp_trend: Optional[float] = None
 
 
 class ProPatternRequest(BaseModel):
@@ -43,12 +91,66 @@ class ProPatternRequest(BaseModel):
     PRO tier pattern request.
     """
     temp_f: float
-    month: int
+    month: int = Field(..., ge=1, le=12)
     clarity: str
     wind_speed: float
     sky_condition: str
     depth_ft: Optional[float] = None
     bottom_composition: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    day_of_year: Optional[int] = Field(None, ge=1, le=366)
+    temp_trend: Optional[float] = None
+
+
+class SweepAxis(BaseModel):
+    param: str
+    min: float
+    max: float
+
+
+class SweepRequest(BaseModel):
+    """
+    Pattern sweep: fixed conditions plus one or two ranges to sweep. Swept
+    fields may be left out of `conditions`.
+    """
+    conditions: dict
+    axes: List[SweepAxis]
+
+
+class Waypoint(BaseModel):
+    id: str
+    lat: float
+    lon: float
+    depth_ft: Optional[float] = None
+    bottom_composition: Optional[str] = None
+    features: List[str] = []
+    facing_deg: Optional[float] = None
+
+
+class ForecastHour(BaseModel):
+    temp_f: float
+    wind_speed: float
+    wind_dir_deg: Optional[float] = None
+    sky_condition: str
+
+
+class TripPlanRequest(BaseModel):
+    """
+    Multi-day trip: waypoints, an hourly forecast starting at `start_hour`
+    (local hour of day) and where the boat launches each morning.
+    """
+    waypoints: List[Waypoint]
+    forecast: List[ForecastHour]
+    month: int = Field(..., ge=1, le=12)
+    clarity: str
+    launch_lat: float
+    launch_lon: float
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    day_of_year: Optional[int] = Field(None, ge=1, le=366)
+    temp_trend: Optional[float] = None
+    start_hour: int = 0
+    fishing_hours: Tuple[int, int] = DEFAULT_FISHING_HOURS
+    boat_speed_mph: float = DEFAULT_BOAT_SPEED_MPH
 
 
 class ChatRequest(BaseModel):
@@ -59,6 +161,12 @@ class SonarRequest(BaseModel):
     video_id: Optional[str] = None
 
 
+class JobRequest(BaseModel):
+    kind: str
+    params: dict = {}
+    priority: str = "normal"
+
+
 # ---------- Routes ----------
 
 
@@ -67,51 +175,421 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics():
+    """
+    Admission control counters and queue-time percentiles per tier, the
+    history recorder's queue and drop counters, and whether the engine
+    snapshot, prebuilt knowledge index, gear catalog and lure index loaded.
+    """
+    return {
+        "admission": admission.snapshot(),
+        "history": get_history().snapshot(),
+        "engine_snapshot": snapshot_status(),
+        "knowledge_index": index_status(),
+        "gear_catalog": gear.catalog_status(),
+        "lure_index": lures.index_status(),
+    }
+
+
+def _basic_response(request: Request, req: BasicPatternRequest):
+    conditions = req.model_dump()
+    response = cached_json_response(
+        request,
+        "basic",
+        conditions,
+        lambda: basic_pattern_summary(**conditions),
+    )
+    get_history().record("basic", conditions, response.headers["etag"], response.status_code)
+    return response
+
+
+def _pro_response(request: Request, req: ProPatternRequest):
+    conditions = req.model_dump()
+    response = cached_json_response(
+        request,
+        "pro",
+        conditions,
+        lambda: pattern_summary(**conditions),
+        includes_stock=True,
+    )
+    get_history().record("pro", conditions, response.headers["etag"], response.status_code)
+    return response
+
+
 @app.post("/pattern/basic")
-def pattern_basic(req: BasicPatternRequest):
+def pattern_basic(req: BasicPatternRequest, request: Request):
     """
     BASIC SAGE Pattern Assistant endpoint.
 
     Returns a simplified pattern summary: phase, depth zone,
     and technique-level guidance.
     """
-    summary = build_basic_pattern_summary(
-        temp_f=req.temp_f,
-        month=req.month,
-        clarity=req.clarity,
-        wind_speed=req.wind_speed,
-    )
-    return summary
+    return _basic_response(request, req)
+
+
+@app.get("/pattern/basic")
+def pattern_basic_get(request: Request, req: BasicPatternRequest = Depends()):
+    """
+    Cacheable GET variant of /pattern/basic taking the same fields as
+    query parameters.
+    """
+    return _basic_response(request, req)
 
 
 @app.post("/pattern/pro")
-def pattern_pro(req: ProPatternRequest):
+def pattern_pro(req: ProPatternRequest, request: Request):
     """
     PRO SAGE Pattern Engine endpoint.
 
     Returns the full pattern summary including targets, strategy tips,
     color recommendations, and detailed setups.
     """
-    summary = build_pattern_summary(
-        temp_f=req.temp_f,
-        month=req.month,
-        clarity=req.clarity,
-        wind_speed=req.wind_speed,
-        sky_condition=req.sky_condition,
-        depth_ft=req.depth_ft,
-        bottom_composition=req.bottom_composition,
-    )
-    return summary
+    return _pro_response(request, req)
+
+
+@app.get("/pattern/pro")
+def pattern_pro_get(request: Request, req: ProPatternRequest = Depends()):
+    """
+    Cacheable GET variant of /pattern/pro taking the same fields as
+    query parameters.
+    """
+    return _pro_response(request, req)
+
+
+def _sweep_response(tier: str, model, req: SweepRequest):
+    axes = [axis.model_dump() for axis in req.axes]
+    try:
+        validate_axes(tier, axes)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        # Validate the fixed conditions as a normal request for the tier.
+        conditions = model(**{**req.conditions, **{a["param"]: a["min"] for a in axes}}).model_dump()
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=json.loads(exc.json()))
+    return sweep(tier, conditions, axes)
+
+
+@app.post("/pattern/basic/sweep")
+def pattern_basic_sweep(req: SweepRequest):
+    """
+    BASIC pattern across one or two condition ranges, as interval
+    segments (see app.sweep).
+    """
+    return _sweep_response("basic", BasicPatternRequest, req)
+
+
+@app.post("/pattern/pro/sweep")
+def pattern_pro_sweep(req: SweepRequest):
+    """
+    PRO pattern across one or two condition ranges (e.g. 40-90°F, or
+    0-25 mph wind), evaluated once per interval between the rules'
+    thresholds instead of once per sample.
+    """
+    return _sweep_response("pro", ProPatternRequest, req)
+
+
+@app.post("/trip/plan")
+def trip_plan(req: TripPlanRequest):
+    """
+    Schedule of which waypoint to fish each hour of a trip, with the
+    pattern and setup for every stop (see app.planner).
+    """
+    try:
+        return plan_trip(
+            waypoints=[w.model_dump() for w in req.waypoints],
+            forecast=[h.model_dump() for h in req.forecast],
+            month=req.month,
+            clarity=req.clarity,
+            launch=(req.launch_lat, req.launch_lon),
+            latitude=req.latitude,
+            day_of_year=req.day_of_year,
+            temp_trend=req.temp_trend,
+            start_hour=req.start_hour,
+            fishing_hours=req.fishing_hours,
+            boat_speed_mph=req.boat_speed_mph,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @app.post("/chat")
 def chat(req: ChatRequest):
-    return {"message": f"SAGE received: {req.message}"}
+    """
+    SAGE chat endpoint.
+
+    Answers with the most relevant snippets from the knowledge base
+    (engine guidance plus any added knowledge files), ranked by BM25.
+    """
+    return {
+        "message": f"SAGE received: {req.message}",
+        "answers": get_index().search(req.message, k=3),
+    }
 
 
 @app.post("/sonar")
 def sonar(req: SonarRequest):
+    """
+    Sonar Analysis endpoint.
+
+    If the video_id names a stored recording, a background job builds its
+    echogram tile pyramid; the response carries the job id to follow.
+    """
+    pyramid = None
+    job = None
+    if req.video_id and is_valid_recording_id(req.video_id):
+        pyramid = pyramid_status(req.video_id)
+        if pyramid in ("pending", "building"):
+            job = get_job_queue().submit(
+                "sonar_pyramid",
+                {"recording_id": req.video_id, "data_dir": echogram.SONAR_DATA_DIR},
+                dedupe_key=f"sonar_pyramid:{req.video_id}",
+            )
+
     return {
         "message": "Sonar Analysis placeholder",
         "input": {"video_id": req.video_id},
+        "pyramid": pyramid,
+        "job_id": job["job_id"] if job else None,
+    }
+
+
+def _ready_pyramid(recording_id: str):
+    if not is_valid_recording_id(recording_id):
+        raise HTTPException(status_code=404, detail="Unknown recording")
+    pyramid = open_pyramid(recording_id)
+    if pyramid is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Pyramid not available (status: {pyramid_status(recording_id)})",
+        )
+    return pyramid
+
+
+@app.get("/sonar/{recording_id}/pyramid")
+def sonar_pyramid(recording_id: str):
+    """
+    Level layout of a recording's echogram pyramid (shapes and tile counts),
+    so the player can map a zoom/time range to tile coordinates.
+    """
+    return _ready_pyramid(recording_id).index
+
+
+@app.get("/sonar/{recording_id}/tiles/{level}/{tx}/{ty}")
+def sonar_tile(recording_id: str, level: int, tx: int, ty: int, request: Request):
+    """
+    One TILE_SIZE x TILE_SIZE uint8 echogram tile (pings x depth samples).
+
+    Tiles are stored zlib-compressed, so clients accepting 'deflate' (q > 0)
+    get the stored bytes as-is; others get them decompressed.
+    """
+    pyramid = _ready_pyramid(recording_id)
+    try:
+        body = pyramid.tile_compressed(level, tx, ty)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    headers = {
+        "Cache-Control": "public, max-age=86400",
+        "Vary": "Accept-Encoding",
+        "X-Tile-Size": str(TILE_SIZE),
     }
+    if accepts(request.headers.get("accept-encoding"), "deflate"):
+        headers["Content-Encoding"] = "deflate"
+    else:
+        body = pyramid.tile(level, tx, ty)
+    return Response(content=body, media_type="application/octet-stream", headers=headers)
+
+
+@app.get("/regional/legend")
+def regional_legend():
+    """
+    Class labels and colors for each regional map layer.
+    """
+    return {layer: legend(layer) for layer in LAYERS}
+
+
+@app.get("/regional/{raster_id}/tiles/{layer}/{z}/{x}/{y}.png")
+def regional_tile(
+    raster_id: str,
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    month: Optional[int] = Query(None, ge=1, le=12),
+):
+    """
+    XYZ map tile of the seasonal phase, depth zone, or recommended
+    technique for every cell of a water-temperature raster.
+    """
+    if month is None:
+        month = datetime.date.today().month
+    try:
+        png = regional_tiles.tile(raster_id, layer, month, z, x, y)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown raster, layer or tile")
+    return Response(
+        content=png,
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
+@app.post("/regional/{raster_id}/reload")
+def regional_reload(raster_id: str):
+    """
+    Reload a raster from disk, evicting only tiles whose cells changed class.
+    """
+    try:
+        invalidated = regional_tiles.reload(raster_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown raster")
+    return {"raster_id": raster_id, "invalidated_tiles": invalidated}
+
+
+@app.post("/regional/{raster_id}/precompute", status_code=202)
+def regional_precompute(raster_id: str):
+    """
+    Queue classification of a raster for every month in the background.
+    """
+    try:
+        regional.raster_path(raster_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown raster")
+    return get_job_queue().submit(
+        "regional_precompute",
+        {"raster_id": raster_id, "data_dir": regional.RASTER_DATA_DIR},
+        priority="low",
+        dedupe_key=f"regional_precompute:{raster_id}",
+    )
+
+
+# ---------- Jobs ----------
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(req: JobRequest):
+    """
+    Queue a heavy analysis job and return its id immediately.
+    """
+    try:
+        validate_params(req.kind, req.params)
+        return get_job_queue().submit(req.kind, req.params, priority=req.priority)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events with the job's status whenever it changes, ending
+    once the job is finished.
+    """
+    # sqlite calls block, so keep them off the event loop.
+    queue = await run_in_threadpool(get_job_queue)
+    if await run_in_threadpool(queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    async def stream():
+        last = None
+        while True:
+            job = await run_in_threadpool(queue.get, job_id)
+            if job != last:
+                yield f"event: status\ndata: {json.dumps(job)}\n\n"
+                last = job
+            if job["status"] in FINAL_STATES:
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+# ---------- Admin ----------
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get("/history", dependencies=[Depends(require_admin)])
+def history(
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    tier: Optional[str] = None,
+    month: Optional[int] = None,
+    clarity: Optional[str] = None,
+    sky_condition: Optional[str] = None,
+    bottom_composition: Optional[str] = None,
+    limit: int = 100,
+):
+    """
+    Served recommendations in [since, until) (unix seconds), newest first,
+    optionally filtered by tier and conditions. Admin token required.
+    """
+    rows = get_history().query(
+        since=since,
+        until=until,
+        tier=tier,
+        limit=min(max(limit, 1), 1000),
+        month=month,
+        clarity=clarity,
+        sky_condition=sky_condition,
+        bottom_composition=bottom_composition,
+    )
+    return {"count": len(rows), "records": rows}
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+def admin_profile(seconds: float = 10.0, hz: float = 100.0, filter: Optional[str] = None):
+    """
+    Sample every thread's stack for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope input). filter=app keeps only frames from
+    app.pattern_logic, app.snapshot and app.main; any other value is a
+    comma-separated list of module prefixes.
+    """
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]")
+    if not 0 < hz <= MAX_HZ:
+        raise HTTPException(status_code=400, detail=f"hz must be in (0, {MAX_HZ}]")
+    if filter == "app":
+        modules = APP_MODULES
+    elif filter:
+        modules = tuple(m.strip() for m in filter.split(",") if m.strip())
+    else:
+        modules = None
+
+    try:
+        profiler = profile(seconds, hz, modules)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    stats = profiler.stats()
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Cache-Control": "no-store",
+            "X-Profile-Samples": str(stats["samples"]),
+            "X-Profile-Duration": str(stats["duration_s"]),
+            "X-Profile-Overhead": str(stats["overhead"]),
+        },
+    )
@@ -3,20 +3,26 @@
 from typing import List, Optional
 import calendar
 
+from app.gear import describe_line, describe_reel, describe_rod, get_catalog, lure_profile
+from app.lures import get_lure_index, target_palette
+from app.phase_model import PHASES, classify_phase_index
 
-def classify_phase(temp_f: float, month: int) -> str:
+
+def classify_phase(
+    temp_f: float,
+    month: int,
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
+) -> str:
     """
-    Very simple, first-pass phase classifier based on water temp and month.
+    Seasonal phase from water temp, time of year and (optionally) where the
+    lake is and which way the water temperature is heading.
+
+    Cutoffs come from the latitude/day-of-year threshold grid in
+    app.phase_model; temp_trend is in °F per week.
     """
-    if temp_f < 50:
-        return "winter"
-    if 50 <= temp_f < 60:
-        return "pre-spawn"
-    if 60 <= temp_f < 70:
-        return "spawn/post-spawn"
-    if 70 <= temp_f < 80:
-        return "summer"
-    return "fall"
+    return PHASES[classify_phase_index(temp_f, month, latitude, day_of_year, temp_trend)]
 
 
 def recommend_lures(phase: str) -> List[str]:
@@ -316,6 +322,24 @@ def recommend_color_palettes(clarity: str, sky_condition: str) -> List[str]:
     return out
 
 
+def recommend_baits(lures: List[str], clarity: str, sky_condition: str) -> List[dict]:
+    """
+    Concrete in-stock baits for each recommended lure, matched by color
+    against the palette for this clarity and sky. Empty unless real
+    inventory is configured (LURE_INDEX_PATH).
+    """
+    index = get_lure_index()
+    if index is None:
+        return []
+    palette = target_palette(clarity, sky_condition)
+    out = []
+    for lure in lures:
+        baits = index.baits_for(lure, palette)
+        if baits:
+            out.append({"lure": lure, "baits": baits})
+    return out
+
+
 def recommend_techniques(phase: str, depth_zone: str) -> List[str]:
     """
     BASIC-tier technique recommendations instead of specific lures.
@@ -450,6 +474,7 @@ def build_pro_setups(
         "lure_size": "3/8–1/2 oz moving baits; 2–3.5\" crankbaits or swimbaits",
     }
 
+    catalog = get_catalog()
     setups: List[dict] = []
 
     for lure in lures:
@@ -473,6 +498,31 @@ def build_pro_setups(
             "lure_size": base["lure_size"],
         }
 
+        # Real gear from the catalog (when one is configured) if it has a
+        # match; the template text above stays as the fallback.
+        matches = []
+        if catalog is not None:
+            matches = catalog.best_setups(
+                lure_profile(lure, setup_type),
+                depth_zone,
+                clarity,
+                bottom_composition,
+                wind_speed,
+            )
+        if matches:
+            best = matches[0]
+            setup["rod"] = describe_rod(best["rod"])
+            setup["reel"] = describe_reel(best["reel"])
+            setup["line"] = describe_line(best["line"], best["leader"])
+            setup["alternatives"] = [
+                {
+                    "rod": describe_rod(m["rod"]),
+                    "reel": describe_reel(m["reel"]),
+                    "line": describe_line(m["line"], m["leader"]),
+                }
+                for m in matches[1:]
+            ]
+
         setups.append(setup)
 
     # We don't dedupe by technique here because user may want distinct lines
@@ -480,23 +530,20 @@ def build_pro_setups(
     return setups
 
 
-def build_pattern_summary(
-    temp_f: float,
-    month: int,
+def pro_pattern_core(
+    phase: str,
+    depth_zone: str,
     clarity: str,
     wind_speed: float,
     sky_condition: str,
-    depth_ft: Optional[float] = None,
     bottom_composition: Optional[str] = None,
 ) -> dict:
     """
-    PRO-tier pattern summary builder.
+    Everything in the PRO summary that follows from the phase and depth
+    zone, i.e. all of it except the conditions echo and the notes. Prebuilt
+    engine snapshots (app.snapshot) store these per discrete key.
     """
-    month_name = calendar.month_name[month]  # e.g. 3 -> "March"
-
-    phase = classify_phase(temp_f, month)
     base_lures = recommend_lures(phase)
-    depth_zone = infer_depth_zone(phase, depth_ft)
     adjusted_lures = adjust_lures_for_clarity_and_bottom(
         base_lures,
         clarity=clarity,
@@ -513,6 +560,7 @@ def build_pattern_summary(
     )
 
     color_recs = recommend_color_palettes(clarity, sky_condition)
+    baits = recommend_baits(adjusted_lures, clarity, sky_condition)
     setups = build_pro_setups(
         lures=adjusted_lures,
         phase=phase,
@@ -523,15 +571,6 @@ def build_pattern_summary(
         sky_condition=sky_condition,
     )
 
-    # Clean, angler-friendly note
-    notes = (
-        f"In {month_name} with water around {temp_f:.0f}°F, {clarity} water, "
-        f"about {wind_speed:.0f} mph wind, and {sky_condition} skies, "
-        f"SAGE identifies this as a '{phase}' pattern with a '{depth_zone}' focus. "
-        f"The recommended lures, target areas, color guidelines, and gear setups "
-        f"are all tuned to this seasonal window and water color."
-    )
-
     return {
         "phase": phase,
         "depth_zone": depth_zone,
@@ -539,54 +578,135 @@ def build_pattern_summary(
         "recommended_targets": targets_and_tips["recommended_targets"],
         "strategy_tips": targets_and_tips["strategy_tips"],
         "color_recommendations": color_recs,
+        "recommended_baits": baits,
         "lure_setups": setups,
-        "conditions": {
-            "temp_f": temp_f,
-            "month": month,
-            "clarity": clarity,
-            "wind_speed": wind_speed,
-            "sky_condition": sky_condition,
-            "depth_ft": depth_ft,
-            "bottom_composition": bottom_composition,
-        },
-        "notes": notes,
     }
 
-def build_basic_pattern_summary(
+
+def finish_pattern_summary(
+    core: dict,
     temp_f: float,
     month: int,
     clarity: str,
     wind_speed: float,
+    sky_condition: str,
+    depth_ft: Optional[float] = None,
+    bottom_composition: Optional[str] = None,
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
 ) -> dict:
     """
-    BASIC-tier pattern summary.
+    Add the conditions echo and notes for these exact inputs to a PRO core
+    (in place) and return it.
+    """
+    month_name = calendar.month_name[month]  # e.g. 3 -> "March"
 
-    BASIC focuses on high-level seasonal pattern and technique guidance.
-    No lures, colors, gear, or PRO-specific features.
+    # Clean, angler-friendly note
+    notes = (
+        f"In {month_name} with water around {temp_f:.0f}°F, {clarity} water, "
+        f"about {wind_speed:.0f} mph wind, and {sky_condition} skies, "
+        f"SAGE identifies this as a '{core['phase']}' pattern with a '{core['depth_zone']}' focus. "
+        f"The recommended lures, target areas, color guidelines, and gear setups "
+        f"are all tuned to this seasonal window and water color."
+    )
+
+    core["conditions"] = {
+        "temp_f": temp_f,
+        "month": month,
+        "clarity": clarity,
+        "wind_speed": wind_speed,
+        "sky_condition": sky_condition,
+        "depth_ft": depth_ft,
+        "bottom_composition": bottom_composition,
+        "latitude": latitude,
+        "day_of_year": day_of_year,
+        "temp_trend": temp_trend,
+    }
+    core["notes"] = notes
+    return core
+
+
+def build_pattern_summary(
+    temp_f: float,
+    month: int,
+    clarity: str,
+    wind_speed: float,
+    sky_condition: str,
+    depth_ft: Optional[float] = None,
+    bottom_composition: Optional[str] = None,
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
+) -> dict:
     """
-    # Convert month number → full month name
-    month_name = calendar.month_name[month]  # e.g. 3 → "March"
+    PRO-tier pattern summary builder.
+    """
+    phase = classify_phase(temp_f, month, latitude, day_of_year, temp_trend)
+    depth_zone = infer_depth_zone(phase, depth_ft)
+    core = pro_pattern_core(phase, depth_zone, clarity, wind_speed, sky_condition, bottom_composition)
+    return finish_pattern_summary(
+        core,
+        temp_f,
+        month,
+        clarity,
+        wind_speed,
+        sky_condition,
+        depth_ft,
+        bottom_composition,
+        latitude,
+        day_of_year,
+        temp_trend,
+    )
 
-    # Compute phase + inferred depth
-    phase = classify_phase(temp_f, month)
+def basic_pattern_core(phase: str) -> dict:
+    """
+    BASIC summary minus the notes; it depends only on the phase.
+    """
     depth_zone = infer_depth_zone(phase, depth_ft=None)
 
     # High-level techniques only
     techniques = recommend_techniques(phase, depth_zone)
 
+    return {
+        "phase": phase,
+        "depth_zone": depth_zone,
+        "recommended_techniques": techniques,
+    }
+
+
+def finish_basic_pattern_summary(core: dict, temp_f: float, month: int, clarity: str, wind_speed: float) -> dict:
+    """
+    Add the notes for these exact inputs to a BASIC core (in place).
+    """
+    # Convert month number → full month name
+    month_name = calendar.month_name[month]  # e.g. 3 → "March"
+
     # Cleaner BASIC-tier note
-    notes = (
+    core["notes"] = (
         f"With water temperatures around {temp_f:.0f}°F in {month_name}, "
         f"{clarity} water, and roughly {wind_speed:.0f} mph wind, "
-        f"SAGE identifies this as a '{phase}' pattern. "
-        f"The inferred depth zone is '{depth_zone}', so these core techniques "
+        f"SAGE identifies this as a '{core['phase']}' pattern. "
+        f"The inferred depth zone is '{core['depth_zone']}', so these core techniques "
         f"are a solid starting point for the conditions."
     )
+    return core
 
-    return {
-        "phase": phase,
-        "depth_zone": depth_zone,
-        "recommended_techniques": techniques,
-        "notes": notes,
-    }
 
+def build_basic_pattern_summary(
+    temp_f: float,
+    month: int,
+    clarity: str,
+    wind_speed: float,
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
+) -> dict:
+    """
+    BASIC-tier pattern summary.
+
+    BASIC focuses on high-level seasonal pattern and technique guidance.
+    No lures, colors, gear, or PRO-specific features.
+    """
+    phase = classify_phase(temp_f, month, latitude, day_of_year, temp_trend)
+    return finish_basic_pattern_summary(basic_pattern_core(phase), temp_f, month, clarity, wind_speed)
@@ -0,0 +1,323 @@
+# app/phase_model.py
+
+import calendar
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# Seasonal phases; classify functions return these (or their indices).
+PHASES = ["winter", "pre-spawn", "spawn/post-spawn", "summer", "fall"]
+WINTER, PRE_SPAWN, SPAWN, SUMMER, FALL = range(5)
+
+# Used when a request doesn't say where the lake is (mid-latitude US).
+DEFAULT_LATITUDE = 35.0
+
+# A water-temperature trend (°F/week) at least this strong overrides the
+# calendar's idea of whether the lake is warming or cooling.
+TREND_THRESHOLD = 0.5
+
+LAT_MIN, LAT_MAX, LAT_STEP = 20.0, 55.0, 2.5
+DOY_STEP = 7
+SPRING_EQUINOX_DOY = 80
+FALL_EQUINOX_DOY = 265
+
+# Distinct (latitude, day_of_year) points whose season and thresholds are
+# kept; traffic repeats the same lakes and dates.
+SEASON_CACHE_SIZE = 8192
+
+# Threshold columns stored per grid node (°F):
+#   warming season: winter < W_WINTER <= pre-spawn < W_PRESPAWN <= spawn < W_SPAWN <= summer
+#   cooling season: winter < C_WINTER <= fall < C_SUMMER <= summer
+W_WINTER, W_PRESPAWN, W_SPAWN, C_WINTER, C_SUMMER = range(5)
+
+
+def trough_doy(latitude: float) -> float:
+    """
+    Day of year of the coldest water; later the farther north (ice-out).
+    """
+    return 30.0 + 0.8 * (latitude - 30.0)
+
+
+def peak_doy(latitude: float) -> float:
+    """
+    Day of year of the warmest water.
+    """
+    return 205.0 + 0.5 * (latitude - 30.0)
+
+
+def is_warming(latitude: float, day_of_year: float) -> bool:
+    return trough_doy(latitude) <= day_of_year < peak_doy(latitude)
+
+
+def _clamp01(x: float) -> float:
+    return 0.0 if x < 0.0 else 1.0 if x > 1.0 else x
+
+
+def reference_thresholds(latitude: float, day_of_year: float) -> Tuple[float, ...]:
+    """
+    The underlying phase-threshold model the grid is built from.
+
+    Northern fish move through each phase at cooler water than southern
+    fish. Lengthening days pull pre-spawn a few degrees earlier in spring,
+    and between the warmest water and the fall equinox shortening days
+    increasingly push the cooling lake into the fall pattern before it drops
+    below summer temperatures; that shift fades out again by the new year.
+    """
+    north = latitude - 30.0
+    winter = 50.0 - 0.25 * north
+    prespawn = 60.0 - 0.15 * north
+    summer = 70.0 - 0.2 * north
+
+    trough, peak = trough_doy(latitude), peak_doy(latitude)
+    spring = _clamp01((day_of_year - trough) / max(SPRING_EQUINOX_DOY - trough, 1.0))
+    if day_of_year < peak:
+        autumn = 0.0
+    elif day_of_year < FALL_EQUINOX_DOY:
+        # Slow at first: just past the peak the lake is still in summer.
+        autumn = ((day_of_year - peak) / max(FALL_EQUINOX_DOY - peak, 1.0)) ** 2
+    else:
+        # Ease back out by the new year so winter cooling starts unshifted
+        # and the grid has no step at day 365 -> 0.
+        autumn = 1.0 - _clamp01((day_of_year - FALL_EQUINOX_DOY) / (365.0 - FALL_EQUINOX_DOY))
+
+    return (
+        winter - 3.0 * spring,
+        prespawn,
+        summer,
+        winter,
+        summer + 20.0 * autumn,
+    )
+
+
+def _build_grid() -> np.ndarray:
+    lats = np.arange(LAT_MIN, LAT_MAX + LAT_STEP / 2, LAT_STEP)
+    # One extra column past day 365 so (j, j + 1) is always in range.
+    doys = np.arange(0, 366 + 2 * DOY_STEP, DOY_STEP)
+    grid = np.empty((len(lats), len(doys), 5), dtype=np.float64)
+    for i, lat in enumerate(lats):
+        for j, doy in enumerate(doys):
+            grid[i, j] = reference_thresholds(float(lat), float(min(doy, 365)))
+    return grid
+
+
+# Built once at import; scalar lookups use the nested-list copy, which is
+# much faster than indexing numpy from Python one value at a time.
+THRESHOLD_GRID = _build_grid()
+_GRID_ROWS: List[List[Tuple[float, ...]]] = [
+    [tuple(node) for node in row] for row in THRESHOLD_GRID.tolist()
+]
+_N_LAT = THRESHOLD_GRID.shape[0]
+
+
+def mid_month_doy(month: int) -> int:
+    """
+    Day of year of the 15th of a month (non-leap year).
+    """
+    return sum(calendar.mdays[1:month]) + 15
+
+
+def _normalize(latitude: float, day_of_year: float) -> Tuple[float, float]:
+    # Southern hemisphere: same model, seasons shifted half a year.
+    if latitude < 0:
+        latitude = -latitude
+        day_of_year = (day_of_year + 182.0) % 365.0
+    return latitude, day_of_year
+
+
+def phase_thresholds(latitude: float, day_of_year: float) -> Tuple[float, ...]:
+    """
+    Bilinear lookup of the five thresholds at (latitude, day_of_year).
+    """
+    latitude, day_of_year = _normalize(latitude, day_of_year)
+    i, j, w = _cell(latitude, day_of_year)
+    a, b, c, d = _GRID_ROWS[i][j], _GRID_ROWS[i][j + 1], _GRID_ROWS[i + 1][j], _GRID_ROWS[i + 1][j + 1]
+    wa, wb, wc, wd = w
+    return (
+        a[0] * wa + b[0] * wb + c[0] * wc + d[0] * wd,
+        a[1] * wa + b[1] * wb + c[1] * wc + d[1] * wd,
+        a[2] * wa + b[2] * wb + c[2] * wc + d[2] * wd,
+        a[3] * wa + b[3] * wb + c[3] * wc + d[3] * wd,
+        a[4] * wa + b[4] * wb + c[4] * wc + d[4] * wd,
+    )
+
+
+def _cell(latitude: float, day_of_year: float):
+    # Grid cell (i, j) holding the point plus its four corner weights.
+    if latitude <= LAT_MIN:
+        i, fx = 0, 0.0
+    elif latitude >= LAT_MAX:
+        i, fx = _N_LAT - 2, 1.0
+    else:
+        x = (latitude - LAT_MIN) / LAT_STEP
+        i = int(x)
+        fx = x - i
+    y = (day_of_year % 366.0) / DOY_STEP
+    j = int(y)
+    fy = y - j
+    gx, gy = 1 - fx, 1 - fy
+    return i, j, (gx * gy, gx * fy, fx * gy, fx * fy)
+
+
+def _phase_from(temp_f: float, warming: bool, t: Tuple[float, ...]) -> int:
+    if warming:
+        if temp_f < t[W_WINTER]:
+            return WINTER
+        if temp_f < t[W_PRESPAWN]:
+            return PRE_SPAWN
+        if temp_f < t[W_SPAWN]:
+            return SPAWN
+        return SUMMER
+    if temp_f < t[C_WINTER]:
+        return WINTER
+    if temp_f < t[C_SUMMER]:
+        return FALL
+    return SUMMER
+
+
+_MID_MONTH_DOY = [0] + [mid_month_doy(m) for m in range(1, 13)]
+
+# Month-only calls (no latitude, date or trend) are the common case, so
+# their thresholds and season are looked up once per month.
+_MONTH_TABLE = {
+    month: (
+        is_warming(DEFAULT_LATITUDE, mid_month_doy(month)),
+        phase_thresholds(DEFAULT_LATITUDE, mid_month_doy(month)),
+    )
+    for month in range(1, 13)
+}
+
+
+# (latitude, day_of_year) -> (calendar season is warming, thresholds).
+# Plain dict operations are atomic, so racing misses just store twice.
+_SEASONS: Dict[Tuple[float, float], Tuple[bool, Tuple[float, ...]]] = {}
+
+
+def _season(key: Tuple[float, float]) -> Tuple[bool, Tuple[float, ...]]:
+    # Cache miss: calendar season (before any trend) and thresholds at a point.
+    lat, doy = _normalize(*key)
+    value = (trough_doy(lat) <= doy < peak_doy(lat), phase_thresholds(lat, doy))
+    if len(_SEASONS) >= SEASON_CACHE_SIZE:
+        _SEASONS.clear()
+    _SEASONS[key] = value
+    return value
+
+
+def classify_phase_index(
+    temp_f: float,
+    month: int,
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
+) -> int:
+    """
+    Index into PHASES for one set of conditions.
+
+    temp_trend is the recent water-temperature change in °F per week; when
+    it is clearly rising or falling it decides warming vs cooling season.
+    """
+    if latitude is None and day_of_year is None:
+        warming, t = _MONTH_TABLE[month]
+    else:
+        key = (
+            DEFAULT_LATITUDE if latitude is None else latitude,
+            _MID_MONTH_DOY[month] if day_of_year is None else day_of_year,
+        )
+        warming, t = _SEASONS.get(key) or _season(key)
+    if temp_trend is not None:
+        warming = _trend_season(temp_trend, warming)
+    return _phase_from(temp_f, warming, t)
+
+
+def phase_breaks(
+    month: int,
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
+) -> List[float]:
+    """
+    The temperatures where classify_phase_index changes phase for these
+    (non-temperature) conditions, ascending. A temperature equal to a break
+    belongs to the warmer phase.
+    """
+    if latitude is None and day_of_year is None:
+        warming, t = _MONTH_TABLE[month]
+    else:
+        key = (
+            DEFAULT_LATITUDE if latitude is None else latitude,
+            _MID_MONTH_DOY[month] if day_of_year is None else day_of_year,
+        )
+        warming, t = _SEASONS.get(key) or _season(key)
+    if temp_trend is not None:
+        warming = _trend_season(temp_trend, warming)
+    if warming:
+        return sorted((t[W_WINTER], t[W_PRESPAWN], t[W_SPAWN]))
+    return sorted((t[C_WINTER], t[C_SUMMER]))
+
+
+def _trend_season(temp_trend: float, warming: bool) -> bool:
+    if temp_trend >= TREND_THRESHOLD:
+        return True
+    if temp_trend <= -TREND_THRESHOLD:
+        return False
+    return warming
+
+
+def classify_phase_array(
+    temps_f,
+    day_of_year,
+    latitude=DEFAULT_LATITUDE,
+    temp_trend=None,
+) -> np.ndarray:
+    """
+    Vectorized classify_phase_index. All arguments broadcast against each
+    other; returns int8 phase indices with -1 where the temperature is NaN.
+    """
+    temps = np.asarray(temps_f, dtype=np.float64)
+    lat = np.asarray(latitude, dtype=np.float64)
+    doy = np.asarray(day_of_year, dtype=np.float64)
+
+    south = lat < 0
+    lat = np.abs(lat)
+    doy = np.where(south, (doy + 182.0) % 365.0, doy)
+
+    x = (np.clip(lat, LAT_MIN, LAT_MAX) - LAT_MIN) / LAT_STEP
+    i = np.minimum(x.astype(np.int64), _N_LAT - 2)
+    fx = (x - i)[..., None]
+    y = (doy % 366.0) / DOY_STEP
+    j = y.astype(np.int64)
+    fy = (y - j)[..., None]
+
+    g = THRESHOLD_GRID
+    t = (
+        g[i, j] * (1 - fx) * (1 - fy)
+        + g[i, j + 1] * (1 - fx) * fy
+        + g[i + 1, j] * fx * (1 - fy)
+        + g[i + 1, j + 1] * fx * fy
+    )
+
+    warming = (doy >= trough_doy(lat)) & (doy < peak_doy(lat))
+    if temp_trend is not None:
+        trend = np.asarray(temp_trend, dtype=np.float64)
+        warming = np.where(
+            trend >= TREND_THRESHOLD, True,
+            np.where(trend <= -TREND_THRESHOLD, False, warming),
+        )
+
+    shape = np.broadcast_shapes(temps.shape, warming.shape, t.shape[:-1])
+    temps = np.broadcast_to(temps, shape)
+    warming = np.broadcast_to(warming, shape)
+    t = np.broadcast_to(t, shape + (5,))
+
+    warm_phase = np.where(
+        temps < t[..., W_WINTER], WINTER,
+        np.where(temps < t[..., W_PRESPAWN], PRE_SPAWN,
+                 np.where(temps < t[..., W_SPAWN], SPAWN, SUMMER)),
+    )
+    cool_phase = np.where(
+        temps < t[..., C_WINTER], WINTER,
+        np.where(temps < t[..., C_SUMMER], FALL, SUMMER),
+    )
+    phases = np.where(warming, warm_phase, cool_phase).astype(np.int8)
+    phases[np.isnan(temps)] = -1
+    return phases
@@ -0,0 +1,324 @@
+# app/planner.py
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.pattern_logic import build_pattern_summary, classify_phase, infer_depth_zone
+
+
+DEFAULT_BOAT_SPEED_MPH = 40.0
+DEFAULT_FISHING_HOURS = (6, 19)  # local hour-of-day window, end exclusive
+EARTH_RADIUS_MI = 3958.8
+
+# Score weights for one fishing hour at a waypoint.
+TARGET_WEIGHT = 1.0
+DEPTH_WEIGHT = 0.5
+
+# Words that link the engine's recommended targets to waypoint features
+# ("secondary points near spawning flats" <-> ["secondary point", "flat"]).
+TARGET_KEYWORDS = (
+    "point", "flat", "channel", "pocket", "dock", "bed", "drop", "hump", "ledge",
+    "current", "rock", "riprap", "grass", "creek", "bank", "structure", "laydown",
+)
+_KEYWORD_RE = re.compile(r"\b(" + "|".join(TARGET_KEYWORDS) + r")(?:e?s)?\b")
+
+
+def keywords(text: str) -> frozenset:
+    return frozenset(_KEYWORD_RE.findall(text.lower()))
+
+
+def _wind_class(wind_speed: float) -> int:
+    # Same cutoffs as the lure/tip/gear rules: <= 3 calm, >= 10 windy.
+    return 0 if wind_speed <= 3 else 2 if wind_speed >= 10 else 1
+
+
+def travel_hours(points: np.ndarray, speed_mph: float) -> np.ndarray:
+    """
+    Pairwise great-circle run times in hours for (lat, lon) rows.
+    """
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    miles = 2 * EARTH_RADIUS_MI * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return miles / speed_mph
+
+
+# ---------- Scoring ----------
+
+
+class ScoreTable:
+    """
+    Expected score of fishing each waypoint in each forecast hour.
+
+    Each (waypoint, hour) is run through build_pattern_summary, but the
+    engine's output only changes with the phase, depth zone, wind class,
+    bottom and sky (see app.sweep), so calls are memoized on that key and a
+    50 x 72 table needs a few dozen engine calls. An hour scores:
+
+      TARGET_WEIGHT * share of recommended targets the waypoint's features
+                      match (wind-blown targets weighted by how squarely the
+                      forecast wind hits the waypoint's bank)
+      + DEPTH_WEIGHT when the waypoint sits in the phase's natural depth zone
+    """
+
+    def __init__(
+        self,
+        waypoints: Sequence[dict],
+        forecast: Sequence[dict],
+        month: int,
+        clarity: str,
+        latitude: Optional[float] = None,
+        day_of_year: Optional[int] = None,
+        temp_trend: Optional[float] = None,
+        start_hour: int = 0,
+    ):
+        self.waypoints = list(waypoints)
+        self.forecast = list(forecast)
+        self.summaries: List[dict] = []
+        self._summary_ids: Dict[tuple, int] = {}
+        # (summary id, waypoint) -> (plain target share, wind-blown target share)
+        self._matches: Dict[Tuple[int, int], Tuple[float, float]] = {}
+
+        n_w, n_t = len(self.waypoints), len(self.forecast)
+        features = [keywords(" ".join(w.get("features") or [])) for w in self.waypoints]
+        self.summary_index = np.zeros((n_w, n_t), dtype=np.int32)
+        base = np.zeros((n_w, n_t))
+        windy = np.zeros((n_w, n_t))
+
+        for t, hour in enumerate(self.forecast):
+            doy = None
+            if day_of_year is not None:
+                doy = (day_of_year - 1 + (start_hour + t) // 24) % 365 + 1
+            phase = classify_phase(hour["temp_f"], month, latitude, doy, temp_trend)
+            natural_zone = infer_depth_zone(phase, None)
+            hour_key = (phase, _wind_class(hour["wind_speed"]), hour["sky_condition"])
+            for w, wp in enumerate(self.waypoints):
+                depth_ft = wp.get("depth_ft")
+                zone = infer_depth_zone(phase, depth_ft)
+                key = hour_key + (zone, wp.get("bottom_composition"))
+                sid = self._summary_ids.get(key)
+                if sid is None:
+                    sid = self._summary_ids[key] = len(self.summaries)
+                    summary = build_pattern_summary(
+                        hour["temp_f"],
+                        month,
+                        clarity,
+                        hour["wind_speed"],
+                        hour["sky_condition"],
+                        depth_ft,
+                        wp.get("bottom_composition"),
+                        latitude,
+                        doy,
+                        temp_trend,
+                    )
+                    self.summaries.append(summary)
+                self.summary_index[w, t] = sid
+                plain, blown = self._match(sid, w, features[w])
+                base[w, t] = TARGET_WEIGHT * plain + (DEPTH_WEIGHT if zone == natural_zone else 0.0)
+                windy[w, t] = TARGET_WEIGHT * blown
+
+        self.scores = base + windy * self._exposure()
+
+    def _match(self, sid: int, w: int, features: frozenset) -> Tuple[float, float]:
+        cached = self._matches.get((sid, w))
+        if cached is None:
+            targets = self.summaries[sid]["recommended_targets"]
+            plain = blown = 0
+            for target in targets:
+                if keywords(target) & features:
+                    if "wind-blown" in target:
+                        blown += 1
+                    else:
+                        plain += 1
+            n = max(len(targets), 1)
+            cached = self._matches[(sid, w)] = (plain / n, blown / n)
+        return cached
+
+    def _exposure(self) -> np.ndarray:
+        """
+        How directly each hour's wind blows onto each waypoint's bank: 1 when
+        the bank faces straight into the wind, 0 when sheltered. Waypoints
+        without a `facing_deg` count as half exposed.
+        """
+        facing = np.array([np.nan if w.get("facing_deg") is None else w["facing_deg"] for w in self.waypoints])
+        wind_from = np.array([h.get("wind_dir_deg", np.nan) for h in self.forecast], dtype=float)
+        exposure = np.clip(np.cos(np.radians(facing[:, None] - wind_from[None, :])), 0.0, 1.0)
+        return np.where(np.isnan(exposure), 0.5, exposure)
+
+
+# ---------- Scheduling ----------
+
+
+def fishing_days(n_hours: int, start_hour: int, window: Tuple[int, int]) -> List[List[int]]:
+    """
+    Forecast hour indices grouped into days, keeping only hours inside the
+    daily fishing window.
+    """
+    days: List[List[int]] = []
+    prev = None
+    for t in range(n_hours):
+        hod = (start_hour + t) % 24
+        if not window[0] <= hod < window[1]:
+            continue
+        if prev is None or t != prev + 1:
+            days.append([])
+        days[-1].append(t)
+        prev = t
+    return days
+
+
+def solve(
+    scores: np.ndarray,
+    travel: np.ndarray,
+    days: Sequence[Sequence[int]],
+    candidates_per_hour: Optional[int] = None,
+) -> Tuple[float, List[List[Tuple[int, int, float]]]]:
+    """
+    Best schedule by dynamic programming over (node, hour).
+
+    `scores` is waypoints x hours; `travel` is (waypoints + 1)^2 hours with
+    the launch ramp as the last node. Each day starts at the launch. In
+    each hour you either keep fishing where you are, or run from i to j:
+    a run of k + f hours (k whole) that leaves after hour t-k-1 at i fishes
+    only the remaining 1 - f of hour t at j.
+
+    Waypoints that never score are pruned (a detour through one can't beat
+    staying put), and with `candidates_per_hour` only waypoints that rank in
+    the top N for some hour are kept, which is faster but no longer exact.
+
+    Returns the total score and, per day, (node, hour, fraction fished).
+    """
+    n_w = scores.shape[0]
+    keep = np.flatnonzero(scores.max(axis=1, initial=0.0) > 0)
+    if candidates_per_hour is not None and len(keep) > candidates_per_hour:
+        top = np.argsort(-scores[keep], axis=0)[:candidates_per_hour]
+        keep = keep[np.unique(top)]
+    nodes = np.append(keep, n_w)  # launch last
+    m = len(nodes)
+    sub_travel = travel[np.ix_(nodes, nodes)]
+    whole = np.floor(sub_travel).astype(np.int64)
+    fished = 1.0 - (sub_travel - whole)
+    rows = np.arange(m)[:, None]
+    cols = np.arange(m)
+    diag = np.eye(m, dtype=bool)
+    scores_ext = np.vstack([scores[keep], np.zeros((1, scores.shape[1]))])
+
+    total = 0.0
+    plan: List[List[Tuple[int, int, float]]] = []
+    for hours in days:
+        n = len(hours)
+        # value[:, c] = best total after the c-th hour of the day; column 0 is
+        # before the first hour, when only the launch is reachable.
+        value = np.full((m, n + 1), -np.inf)
+        value[-1, 0] = 0.0
+        came_from = np.full((m, n + 1), -1, dtype=np.int64)
+        for c in range(1, n + 1):
+            s = scores_ext[:, hours[c - 1]]
+            src = c - 1 - whole
+            prev = np.where(src >= 0, value[rows, np.maximum(src, 0)], -np.inf)
+            move = prev + fished * s[None, :]
+            move[diag] = -np.inf
+            best = move.argmax(axis=0)
+            best_move = move[best, cols]
+            stay = value[:, c - 1] + s
+            take_move = best_move > stay
+            value[:, c] = np.where(take_move, best_move, stay)
+            came_from[:, c] = np.where(take_move, best, -1)
+
+        node = int(value[:, n].argmax())
+        total += float(value[node, n])
+        steps = []
+        c = n
+        while c > 0:
+            i = came_from[node, c]
+            if i < 0:
+                steps.append((int(nodes[node]), hours[c - 1], 1.0))
+                c -= 1
+            else:
+                steps.append((int(nodes[node]), hours[c - 1], float(fished[i, node])))
+                c -= 1 + int(whole[i, node])
+                node = int(i)
+        plan.append(steps[::-1])
+    return total, plan
+
+
+def plan_trip(
+    waypoints: Sequence[dict],
+    forecast: Sequence[dict],
+    month: int,
+    clarity: str,
+    launch: Tuple[float, float],
+    latitude: Optional[float] = None,
+    day_of_year: Optional[int] = None,
+    temp_trend: Optional[float] = None,
+    start_hour: int = 0,
+    fishing_hours: Tuple[int, int] = DEFAULT_FISHING_HOURS,
+    boat_speed_mph: float = DEFAULT_BOAT_SPEED_MPH,
+    candidates_per_hour: Optional[int] = None,
+) -> dict:
+    """
+    Plan which waypoint to fish in each hour of a multi-day trip.
+
+    `waypoints` are dicts with id, lat, lon and optional depth_ft,
+    bottom_composition, features (free text like "secondary point") and
+    facing_deg (compass direction the bank faces). `forecast` has one dict
+    per hour from `start_hour` (local hour of day of the first entry) with
+    temp_f, wind_speed, wind_dir_deg (direction the wind blows from) and
+    sky_condition. Returns stops with the engine's pattern and top setup
+    for each, plus the run legs between them.
+    """
+    if not waypoints:
+        raise ValueError("at least one waypoint is required")
+    if not forecast:
+        raise ValueError("forecast is empty")
+    if boat_speed_mph <= 0:
+        raise ValueError("boat_speed_mph must be positive")
+    if not 0 <= fishing_hours[0] < fishing_hours[1] <= 24:
+        raise ValueError("fishing_hours must be (start, end) within 0-24")
+
+    table = ScoreTable(waypoints, forecast, month, clarity, latitude, day_of_year, temp_trend, start_hour)
+    points = np.array([[w["lat"], w["lon"]] for w in waypoints] + [list(launch)], dtype=float)
+    travel = travel_hours(points, boat_speed_mph)
+    days = fishing_days(len(forecast), start_hour, fishing_hours)
+    total, plan = solve(table.scores, travel, days, candidates_per_hour)
+
+    launch_node = len(waypoints)
+    out_days = []
+    for d, steps in enumerate(plan):
+        stops: List[dict] = []
+        here = launch_node
+        for node, hour, fraction in steps:
+            if node == launch_node:
+                here = node
+                continue
+            if stops and node == here and fraction == 1.0:
+                stops[-1]["end_hour"] = hour + 1
+                stops[-1]["score"] += float(table.scores[node, hour])
+                continue
+            summary = table.summaries[table.summary_index[node, hour]]
+            stops.append({
+                "waypoint": waypoints[node].get("id", node),
+                "start_hour": hour,
+                "end_hour": hour + 1,
+                "run_hours": round(float(travel[here, node]), 3),
+                "score": fraction * float(table.scores[node, hour]),
+                "phase": summary["phase"],
+                "depth_zone": summary["depth_zone"],
+                "targets": summary["recommended_targets"],
+                "lures": summary["recommended_lures"][:3],
+                "setup": summary["lure_setups"][0] if summary["lure_setups"] else None,
+            })
+            here = node
+        for stop in stops:
+            stop["score"] = round(stop["score"], 4)
+        out_days.append({"day": d, "stops": stops})
+
+    return {
+        "score": round(total, 4),
+        "days": out_days,
+        "engine_calls": len(table.summaries),
+    }
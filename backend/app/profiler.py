@@ -0,0 +1,177 @@
+# app/profiler.py
+
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_HZ = 100
+MAX_HZ = 1000
+MAX_DEPTH = 128
+
+# Modules kept by the "app" filter: the request handlers and the engine.
+APP_MODULES = ("app.pattern_logic", "app.snapshot", "app.main")
+
+
+class SamplingProfiler:
+    """
+    In-process sampling profiler over all Python threads.
+
+    A background thread wakes `hz` times a second, grabs every thread's
+    current frame with sys._current_frames() and counts the stack. Stacks
+    are aggregated by code object, so a sample is a dict lookup per frame;
+    labels are only formatted when the result is read.
+
+    With `modules`, only frames from those modules (or their submodules) are
+    kept and samples that never touch them are dropped, which leaves just
+    the app's own call paths.
+    """
+
+    def __init__(
+        self,
+        hz: float = DEFAULT_HZ,
+        modules: Optional[Iterable[str]] = None,
+        ignore_threads: Iterable[int] = (),
+    ):
+        if not 0 < hz <= MAX_HZ:
+            raise ValueError(f"hz must be in (0, {MAX_HZ}]")
+        self.hz = hz
+        self.modules = tuple(modules) if modules else None
+        self._ignore = set(ignore_threads)
+        self._stacks: Counter = Counter()
+        # code object -> label, or None when the frame is filtered out
+        self._labels: Dict[object, Optional[str]] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.samples = 0
+        self.sample_time = 0.0
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def _label(self, frame) -> Optional[str]:
+        code = frame.f_code
+        try:
+            return self._labels[code]
+        except KeyError:
+            module = frame.f_globals.get("__name__", "?")
+            keep = self.modules is None or any(
+                module == m or module.startswith(m + ".") for m in self.modules
+            )
+            label = f"{module}:{code.co_name}" if keep else None
+            self._labels[code] = label
+            return label
+
+    def _sample(self) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident in self._ignore:
+                continue
+            stack = []
+            depth = 0
+            while frame is not None and depth < MAX_DEPTH:
+                label = self._label(frame)
+                if label is not None:
+                    stack.append(label)
+                frame = frame.f_back
+                depth += 1
+            if stack:
+                self._stacks[(ident, tuple(reversed(stack)))] += 1
+
+    def _run(self) -> None:
+        self._ignore.add(threading.get_ident())
+        interval = 1.0 / self.hz
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            self._sample()
+            self.samples += 1
+            self.sample_time += time.perf_counter() - t0
+            # Schedule against the clock so slow samples don't lower the rate.
+            next_at = max(next_at + interval, time.perf_counter())
+            self._stop.wait(next_at - time.perf_counter())
+
+    def _remember_thread_names(self) -> None:
+        for thread in threading.enumerate():
+            if thread.ident is not None:
+                self._thread_names[thread.ident] = thread.name
+
+    def start(self) -> "SamplingProfiler":
+        self._remember_thread_names()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        self.started_at = time.perf_counter()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        self._remember_thread_names()
+        return self
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """
+        Sample for `seconds` (blocking the caller) and return self.
+        """
+        self.start()
+        try:
+            self._stop.wait(seconds)
+        finally:
+            self.stop()
+        return self
+
+    # ---------- Output ----------
+
+    def stacks(self) -> List[Tuple[str, int]]:
+        """
+        (collapsed stack, count) pairs, most frequent first. Each stack is
+        root-first and prefixed with its thread name.
+        """
+        merged: Counter = Counter()
+        for (ident, frames), count in self._stacks.items():
+            thread = self._thread_names.get(ident, f"thread-{ident}").replace(";", "_").replace(" ", "_")
+            merged[";".join((thread,) + frames)] += count
+        return merged.most_common()
+
+    def collapsed(self) -> str:
+        """
+        Brendan Gregg's collapsed format ("a;b;c 42" per line), which
+        flamegraph.pl, speedscope and inferno read directly.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks())
+
+    def stats(self) -> dict:
+        # Fraction of one core spent inside the sampler itself.
+        overhead = self.sample_time / self.duration if self.duration else 0.0
+        return {
+            "hz": self.hz,
+            "samples": self.samples,
+            "duration_s": round(self.duration, 3),
+            "mean_sample_us": round(self.sample_time / self.samples * 1e6, 1) if self.samples else 0.0,
+            "overhead": round(overhead, 5),
+        }
+
+
+# One profile at a time per process; overlapping runs would double the cost.
+_profile_lock = threading.Lock()
+
+
+def profile(
+    seconds: float,
+    hz: float = DEFAULT_HZ,
+    modules: Optional[Iterable[str]] = None,
+) -> SamplingProfiler:
+    """
+    Run a profile of the whole process, excluding the calling thread, or
+    raise RuntimeError if one is already running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("a profile is already running")
+    try:
+        profiler = SamplingProfiler(hz, modules, ignore_threads=[threading.get_ident()])
+        return profiler.run(seconds)
+    finally:
+        _profile_lock.release()
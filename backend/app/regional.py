@@ -0,0 +1,358 @@
+# app/regional.py
+
+import math
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app import http_cache
+from app.pattern_logic import infer_depth_zone, recommend_techniques
+from app.phase_model import PHASES, classify_phase_array, mid_month_doy
+
+
+# A raster is an .npz with "temps" (2-D water temperature in °F, NaN = no
+# data, row 0 = north) and "bounds" (west, south, east, north in degrees).
+RASTER_DATA_DIR = os.environ.get(
+    "RASTER_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rasters"),
+)
+
+TILE_SIZE = 256
+MAX_CACHED_TILES = 2048
+LAYERS = ("phase", "depth_zone", "technique")
+
+# Class 0 is always "no data" and renders transparent.
+_PALETTE = [
+    (0, 0, 0),
+    (59, 130, 246),
+    (34, 197, 94),
+    (234, 179, 8),
+    (249, 115, 22),
+    (168, 85, 47),
+    (236, 72, 153),
+    (20, 184, 166),
+    (148, 163, 184),
+]
+
+
+def _layer_tables() -> Dict[str, Tuple[List[str], np.ndarray]]:
+    """
+    For each layer, its category labels (index 0 = no data) and a lookup
+    table from phase class to layer class.
+
+    Everything downstream of the phase is a pure function of it when no
+    depth is known, so each layer is one table lookup per cell.
+    """
+    tables = {}
+    for layer in LAYERS:
+        labels = ["no data"]
+        lut = [0]
+        for phase in PHASES:
+            depth_zone = infer_depth_zone(phase, None)
+            if layer == "phase":
+                label = phase
+            elif layer == "depth_zone":
+                label = depth_zone
+            else:
+                label = ", ".join(recommend_techniques(phase, depth_zone))
+            if label not in labels:
+                labels.append(label)
+            lut.append(labels.index(label))
+        tables[layer] = (labels, np.asarray(lut, dtype=np.uint8))
+    return tables
+
+
+LAYER_TABLES = _layer_tables()
+
+
+def row_latitudes(n_rows: int, bounds: tuple) -> np.ndarray:
+    """
+    Latitude of each raster row's center (row 0 = north).
+    """
+    _, south, _, north = bounds
+    return north - (np.arange(n_rows) + 0.5) * (north - south) / n_rows
+
+
+def classify_grid(temps: np.ndarray, month: int, bounds: Optional[tuple] = None) -> np.ndarray:
+    """
+    Vectorized classify_phase: phase class per cell (1-based index into
+    PHASES), 0 where the temperature is missing. With bounds, each row is
+    classified at its own latitude; otherwise at the default latitude.
+    """
+    temps = np.asarray(temps, dtype=np.float32)
+    if bounds is None:
+        phases = classify_phase_array(temps, mid_month_doy(month))
+    else:
+        lats = row_latitudes(temps.shape[0], bounds)[:, None]
+        phases = classify_phase_array(temps, mid_month_doy(month), lats)
+    return (phases + 1).astype(np.uint8)
+
+
+def legend(layer: str) -> List[dict]:
+    labels, _ = LAYER_TABLES[layer]
+    return [
+        {"class": i, "label": label, "color": "#%02x%02x%02x" % _PALETTE[i % len(_PALETTE)]}
+        for i, label in enumerate(labels)
+        if i > 0
+    ]
+
+
+def tile_lonlat(z: int, x: int, y: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Longitudes of the pixel columns and latitudes of the pixel rows of a
+    Web Mercator XYZ tile (pixel centers).
+    """
+    n = 2.0 ** z
+    frac = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    lons = (x + frac) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + frac) / n))))
+    return lons, lats
+
+
+def encode_png(pixels: np.ndarray, palette: List[Tuple[int, int, int]]) -> bytes:
+    """
+    Minimal 8-bit palette PNG with palette index 0 fully transparent.
+    """
+    height, width = pixels.shape
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    rows = np.zeros((height, width + 1), dtype=np.uint8)  # filter byte 0 per row
+    rows[:, 1:] = pixels
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+        chunk(b"PLTE", b"".join(bytes(rgb) for rgb in palette)),
+        chunk(b"tRNS", b"\x00" + b"\xff" * (len(palette) - 1)),
+        chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def raster_path(raster_id: str, data_dir: Optional[str] = None, suffix: str = ".npz") -> str:
+    if not raster_id.replace("-", "").replace("_", "").isalnum():
+        raise KeyError(raster_id)
+    return os.path.join(data_dir or RASTER_DATA_DIR, f"{raster_id}{suffix}")
+
+
+def load_raster(raster_id: str, data_dir: Optional[str] = None) -> Tuple[np.ndarray, tuple]:
+    path = raster_path(raster_id, data_dir)
+    if not os.path.exists(path):
+        raise KeyError(raster_id)
+    with np.load(path) as data:
+        return data["temps"].astype(np.float32), tuple(float(v) for v in data["bounds"])
+
+
+def precompute_phase_grids(
+    raster_id: str,
+    data_dir: Optional[str] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> str:
+    """
+    Classify a raster for every month and save the grids next to it
+    (<id>.phases.npz) along with the ENGINE_VERSION that classified them,
+    so serving tiles never has to classify a large raster inline. Returns
+    the path written.
+    """
+    temps, bounds = load_raster(raster_id, data_dir)
+    grids = {}
+    for month in range(1, 13):
+        grids[f"m{month}"] = classify_grid(temps, month, bounds)
+        if progress is not None:
+            progress(month / 12.0)
+    path = raster_path(raster_id, data_dir, ".phases.npz")
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, engine_version=np.array(http_cache.ENGINE_VERSION), **grids)
+    os.replace(tmp, path)
+    return path
+
+
+def load_phase_grid(raster_id: str, month: int, data_dir: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Precomputed phase grid for a month, if one exists, is newer than the
+    raster it was built from and was classified by the current rules.
+    """
+    try:
+        path = raster_path(raster_id, data_dir, ".phases.npz")
+        if os.path.getmtime(path) < os.path.getmtime(raster_path(raster_id, data_dir)):
+            return None
+    except OSError:
+        return None
+    with np.load(path) as grids:
+        if "engine_version" not in grids or str(grids["engine_version"]) != http_cache.ENGINE_VERSION:
+            return None
+        return grids[f"m{month}"]
+
+
+class RegionalTileStore:
+    """
+    Classified rasters plus an LRU of rendered tiles.
+
+    Each cached tile remembers the block of source cells it sampled, so a
+    raster update only evicts tiles whose cells actually changed class.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, max_tiles: int = MAX_CACHED_TILES):
+        self.data_dir = data_dir
+        self.max_tiles = max_tiles
+        self._rasters: Dict[str, dict] = {}
+        self._tiles: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._footprints: Dict[tuple, Optional[tuple]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0}
+
+    # ---------- Rasters ----------
+
+    def set_raster(self, raster_id: str, temps: np.ndarray, bounds: tuple) -> int:
+        """
+        Install or replace a raster. Returns how many cached tiles were
+        invalidated.
+        """
+        temps = np.asarray(temps, dtype=np.float32)
+        with self._lock:
+            old = self._rasters.get(raster_id)
+            self._rasters[raster_id] = {"temps": temps, "bounds": tuple(bounds), "phases": {}}
+            if old is None:
+                return 0
+
+            keys = [k for k in self._tiles if k[0] == raster_id]
+            if old["temps"].shape != temps.shape or old["bounds"] != tuple(bounds):
+                doomed = keys
+            else:
+                doomed = []
+                for month, old_phases in old["phases"].items():
+                    new_phases = classify_grid(temps, month, tuple(bounds))
+                    self._rasters[raster_id]["phases"][month] = new_phases
+                    phase_changed = old_phases != new_phases
+                    if not phase_changed.any():
+                        continue
+                    # Restrict the per-layer comparison to the changed block.
+                    rows = np.flatnonzero(phase_changed.any(axis=1))
+                    cols = np.flatnonzero(phase_changed.any(axis=0))
+                    br0, br1, bc0, bc1 = rows[0], rows[-1], cols[0], cols[-1]
+                    block = (slice(br0, br1 + 1), slice(bc0, bc1 + 1))
+                    for layer in LAYERS:
+                        lut = LAYER_TABLES[layer][1]
+                        changed = lut[old_phases[block]] != lut[new_phases[block]]
+                        if not changed.any():
+                            continue
+                        for key in keys:
+                            if key[1] != layer or key[2] != month:
+                                continue
+                            box = self._footprints.get(key)
+                            if box is None:
+                                continue
+                            r0, r1 = max(box[0], br0), min(box[1], br1)
+                            c0, c1 = max(box[2], bc0), min(box[3], bc1)
+                            if r0 > r1 or c0 > c1:
+                                continue
+                            if changed[r0 - br0:r1 - br0 + 1, c0 - bc0:c1 - bc0 + 1].any():
+                                doomed.append(key)
+
+            for key in doomed:
+                self._tiles.pop(key, None)
+                self._footprints.pop(key, None)
+            self.stats["invalidated"] += len(doomed)
+            return len(doomed)
+
+    def reload(self, raster_id: str) -> int:
+        temps, bounds = load_raster(raster_id, self.data_dir)
+        invalidated = self.set_raster(raster_id, temps, bounds)
+        self._rasters[raster_id]["from_disk"] = True
+        return invalidated
+
+    def _raster(self, raster_id: str) -> dict:
+        raster = self._rasters.get(raster_id)
+        if raster is None:
+            self.reload(raster_id)
+            raster = self._rasters[raster_id]
+        return raster
+
+    def phase_grid(self, raster_id: str, month: int) -> np.ndarray:
+        raster = self._raster(raster_id)
+        phases = raster["phases"].get(month)
+        if phases is None:
+            if raster.get("from_disk"):
+                phases = load_phase_grid(raster_id, month, self.data_dir)
+            if phases is None or phases.shape != raster["temps"].shape:
+                phases = classify_grid(raster["temps"], month, raster["bounds"])
+            raster["phases"][month] = phases
+        return phases
+
+    # ---------- Tiles ----------
+
+    def render(self, raster_id: str, layer: str, month: int, z: int, x: int, y: int) -> Tuple[bytes, Optional[tuple]]:
+        """
+        Render one tile (nearest-neighbour sampling) and return the PNG plus
+        the (row0, row1, col0, col1) block of source cells it touched.
+        """
+        if layer not in LAYER_TABLES:
+            raise KeyError(layer)
+        phases = self.phase_grid(raster_id, month)
+        west, south, east, north = self._rasters[raster_id]["bounds"]
+        n_rows, n_cols = phases.shape
+
+        lons, lats = tile_lonlat(z, x, y)
+        cols = np.floor((lons - west) / (east - west) * n_cols).astype(np.int64)
+        rows = np.floor((north - lats) / (north - south) * n_rows).astype(np.int64)
+        col_ok = (cols >= 0) & (cols < n_cols)
+        row_ok = (rows >= 0) & (rows < n_rows)
+
+        labels, lut = LAYER_TABLES[layer]
+        pixels = np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8)
+        footprint = None
+        if col_ok.any() and row_ok.any():
+            rr, cc = rows[row_ok], cols[col_ok]
+            pixels[np.ix_(row_ok, col_ok)] = lut[phases[np.ix_(rr, cc)]]
+            footprint = (int(rr.min()), int(rr.max()), int(cc.min()), int(cc.max()))
+
+        palette = [_PALETTE[i % len(_PALETTE)] for i in range(len(labels))]
+        return encode_png(pixels, palette), footprint
+
+    def tile(self, raster_id: str, layer: str, month: int, z: int, x: int, y: int) -> bytes:
+        if not (0 <= z <= 24 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise KeyError((z, x, y))
+        key = (raster_id, layer, month, z, x, y)
+        with self._lock:
+            png = self._tiles.get(key)
+            if png is not None:
+                self._tiles.move_to_end(key)
+                self.stats["hits"] += 1
+                return png
+
+        png, footprint = self.render(raster_id, layer, month, z, x, y)
+        with self._lock:
+            self.stats["misses"] += 1
+            self._tiles[key] = png
+            self._footprints[key] = footprint
+            while len(self._tiles) > self.max_tiles:
+                old_key, _ = self._tiles.popitem(last=False)
+                self._footprints.pop(old_key, None)
+        return png
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+regional_tiles = RegionalTileStore()
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple:
+    """
+    (west, south, east, north) of an XYZ tile, handy for tests and clients.
+    """
+    n = 2.0 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
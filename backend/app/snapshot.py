@@ -0,0 +1,400 @@
+# app/snapshot.py
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app import http_cache
+from app.pattern_logic import (
+    basic_pattern_core,
+    build_basic_pattern_summary,
+    build_pattern_summary,
+    classify_phase,
+    finish_basic_pattern_summary,
+    finish_pattern_summary,
+    infer_depth_zone,
+    pro_pattern_core,
+)
+from app.phase_model import PHASES
+
+
+# Prebuilt engine state (see `python -m app.snapshot build`). Workers map it
+# on startup; when it is missing, corrupt or stale they build as usual.
+ENGINE_SNAPSHOT_PATH = os.environ.get("ENGINE_SNAPSHOT_PATH")
+
+SNAPSHOT_MAGIC = b"AIQSNAP\x01"
+SNAPSHOT_FORMAT = 1
+_PREFIX = len(SNAPSHOT_MAGIC) + 32  # magic + sha256 of everything after it
+
+
+# ---------- Vocabularies ----------
+
+# The rules only look at these aspects of the free-form inputs, so every
+# request maps onto one cell of this grid and the cell's core summary is
+# exactly what the engine would build.
+
+DEPTH_ZONES = ("shallow", "mid-depth", "offshore")
+# <= 3 calm, >= 10 windy; one representative speed per class.
+WIND_CLASSES = ("calm", "breezy", "windy")
+WIND_SPEEDS = (2.0, 6.0, 12.0)
+CLARITIES = ("clear", "stained", "muddy")
+# Colors and baits only check for "sun" in the sky condition.
+SKIES = ("sunny", "cloudy")
+# Bottom substrings the lure, target and gear rules test for, one bit each.
+BOTTOM_FLAGS = (("rock",), ("grass", "vegetation"), ("sand", "clay"))
+
+PRO_DIMS = (len(PHASES), len(DEPTH_ZONES), len(WIND_CLASSES), len(CLARITIES), len(SKIES), 1 << len(BOTTOM_FLAGS))
+
+
+def clarity_id(clarity: str) -> Optional[int]:
+    clarity = clarity.lower().strip()
+    return CLARITIES.index(clarity) if clarity in CLARITIES else None
+
+
+def sky_id(sky_condition: str) -> int:
+    return 0 if "sun" in sky_condition.lower() else 1
+
+
+def wind_id(wind_speed: float) -> int:
+    return 0 if wind_speed <= 3 else 2 if wind_speed >= 10 else 1
+
+
+def bottom_id(bottom_composition: Optional[str]) -> int:
+    bottom = (bottom_composition or "").lower()
+    return sum(1 << i for i, words in enumerate(BOTTOM_FLAGS) if any(w in bottom for w in words))
+
+
+def bottom_text(bid: int) -> Optional[str]:
+    words = [words[0] for i, words in enumerate(BOTTOM_FLAGS) if bid & (1 << i)]
+    return " and ".join(words) or None
+
+
+# ---------- Snapshot ----------
+
+
+class EngineSnapshot:
+    """
+    Precomputed engine output for the whole discrete condition space.
+
+    Each PRO cell (phase x depth zone x wind class x clarity x sky x bottom
+    flags) and each BASIC phase stores its core summary as one row of ids
+    into a table of distinct JSON values. List fields (lures, tips, setups,
+    baits) are stored as lists of value ids, so an item shared by many
+    cells, such as a lure's setup, is stored once. Values are decoded on
+    first use; requests then only format their notes.
+    """
+
+    def __init__(
+        self,
+        pro_fields: List[str],
+        pro_rows: np.ndarray,
+        basic_fields: List[str],
+        basic_rows: np.ndarray,
+        list_fields: List[str],
+        values: np.ndarray,
+        value_offsets: np.ndarray,
+        sources: dict,
+    ):
+        self.pro_fields = pro_fields
+        self.pro_rows = pro_rows.reshape(-1, len(pro_fields))
+        self.basic_fields = basic_fields
+        self.basic_rows = basic_rows.reshape(-1, len(basic_fields))
+        self.list_fields = frozenset(list_fields)
+        self._values = values
+        self._value_offsets = value_offsets
+        self.sources = sources
+        self._decoded: Dict[int, object] = {}
+        self._lists: Dict[int, list] = {}
+
+    @property
+    def n_values(self) -> int:
+        return len(self._value_offsets) - 1
+
+    def _value(self, i: int):
+        try:
+            return self._decoded[i]
+        except KeyError:
+            blob = self._values[int(self._value_offsets[i]):int(self._value_offsets[i + 1])]
+            value = self._decoded[i] = json.loads(blob.tobytes())
+            return value
+
+    def _list(self, i: int) -> list:
+        try:
+            return self._lists[i]
+        except KeyError:
+            items = self._lists[i] = [self._value(j) for j in self._value(i)]
+            return items
+
+    def _row(self, fields: List[str], row) -> dict:
+        return {
+            name: self._list(int(i)) if name in self.list_fields else self._value(int(i))
+            for name, i in zip(fields, row)
+        }
+
+    @staticmethod
+    def pro_key(phase: int, zone: int, wind: int, clarity: int, sky: int, bottom: int) -> int:
+        return int(np.ravel_multi_index((phase, zone, wind, clarity, sky, bottom), PRO_DIMS))
+
+    # ---------- Serving ----------
+
+    def pattern_summary(
+        self,
+        temp_f: float,
+        month: int,
+        clarity: str,
+        wind_speed: float,
+        sky_condition: str,
+        depth_ft: Optional[float] = None,
+        bottom_composition: Optional[str] = None,
+        latitude: Optional[float] = None,
+        day_of_year: Optional[int] = None,
+        temp_trend: Optional[float] = None,
+    ) -> Optional[dict]:
+        """
+        Same result as build_pattern_summary, or None when the clarity is
+        outside the snapshot's vocabulary.
+        """
+        cid = clarity_id(clarity)
+        if cid is None:
+            return None
+        phase = classify_phase(temp_f, month, latitude, day_of_year, temp_trend)
+        zone = DEPTH_ZONES.index(infer_depth_zone(phase, depth_ft))
+        key = self.pro_key(
+            PHASES.index(phase), zone, wind_id(wind_speed), cid, sky_id(sky_condition), bottom_id(bottom_composition)
+        )
+        core = self._row(self.pro_fields, self.pro_rows[key])
+        return finish_pattern_summary(
+            core,
+            temp_f,
+            month,
+            clarity,
+            wind_speed,
+            sky_condition,
+            depth_ft,
+            bottom_composition,
+            latitude,
+            day_of_year,
+            temp_trend,
+        )
+
+    def basic_pattern_summary(
+        self,
+        temp_f: float,
+        month: int,
+        clarity: str,
+        wind_speed: float,
+        latitude: Optional[float] = None,
+        day_of_year: Optional[int] = None,
+        temp_trend: Optional[float] = None,
+    ) -> dict:
+        phase = classify_phase(temp_f, month, latitude, day_of_year, temp_trend)
+        core = self._row(self.basic_fields, self.basic_rows[PHASES.index(phase)])
+        return finish_basic_pattern_summary(core, temp_f, month, clarity, wind_speed)
+
+    # ---------- Build ----------
+
+    @classmethod
+    def build(cls) -> "EngineSnapshot":
+        """
+        Run the engine once per cell of the condition space.
+        """
+        interned: Dict[bytes, int] = {}
+
+        def intern(value) -> int:
+            blob = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            return interned.setdefault(blob, len(interned))
+
+        list_fields = set()
+
+        def intern_field(name: str, value) -> int:
+            if isinstance(value, list):
+                list_fields.add(name)
+                return intern([intern(item) for item in value])
+            return intern(value)
+
+        rows = []
+        pro_fields: List[str] = []
+        for p, z, w, c, s, b in np.ndindex(*PRO_DIMS):
+            core = pro_pattern_core(
+                PHASES[p], DEPTH_ZONES[z], CLARITIES[c], WIND_SPEEDS[w], SKIES[s], bottom_text(b)
+            )
+            pro_fields = pro_fields or list(core)
+            rows.append([intern_field(f, core[f]) for f in pro_fields])
+        pro_rows = np.array(rows, dtype=np.int32)
+
+        basic_cores = [basic_pattern_core(phase) for phase in PHASES]
+        basic_fields = list(basic_cores[0])
+        basic_rows = np.array(
+            [[intern_field(f, core[f]) for f in basic_fields] for core in basic_cores], dtype=np.int32
+        )
+
+        blobs = list(interned)
+        offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        values = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+        return cls(
+            pro_fields, pro_rows, basic_fields, basic_rows, sorted(list_fields), values, offsets, http_cache.engine_sources()
+        )
+
+    # ---------- Serialization ----------
+
+    def save(self, path: str) -> None:
+        """
+        One file: magic, sha256 of the rest, JSON header, then 8-byte aligned
+        arrays that load() maps without copying.
+        """
+        arrays = {
+            "pro_rows": np.ascontiguousarray(self.pro_rows, dtype=np.int32),
+            "basic_rows": np.ascontiguousarray(self.basic_rows, dtype=np.int32),
+            "value_offsets": np.asarray(self._value_offsets, dtype=np.int64),
+            "values": np.asarray(self._values, dtype=np.uint8),
+        }
+        layout, offset = {}, 0
+        for name, arr in arrays.items():
+            layout[name] = [offset, arr.dtype.str, int(arr.size)]
+            offset += -(-arr.nbytes // 8) * 8
+        header = json.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "sources": self.sources,
+            "vocab": {
+                "phase": list(PHASES),
+                "depth_zone": list(DEPTH_ZONES),
+                "wind": list(WIND_CLASSES),
+                "clarity": list(CLARITIES),
+                "sky": list(SKIES),
+                "bottom": [list(words) for words in BOTTOM_FLAGS],
+            },
+            "pro_fields": self.pro_fields,
+            "basic_fields": self.basic_fields,
+            "list_fields": sorted(self.list_fields),
+            "arrays": layout,
+        }).encode("utf-8")
+        header += b" " * (-(_PREFIX + 8 + len(header)) % 8)
+
+        body = [struct.pack("<Q", len(header)), header]
+        for arr in arrays.values():
+            data = arr.tobytes()
+            body.append(data)
+            body.append(b"\0" * (-len(data) % 8))
+        digest = hashlib.sha256()
+        for part in body:
+            digest.update(part)
+
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(SNAPSHOT_MAGIC)
+            fh.write(digest.digest())
+            for part in body:
+                fh.write(part)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EngineSnapshot":
+        """
+        Map a snapshot file, raising ValueError if it is not one, is
+        corrupt, or was built from other rules or gear/lure data.
+        """
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an engine snapshot")
+        if hashlib.sha256(memoryview(mm)[_PREFIX:]).digest() != mm[len(SNAPSHOT_MAGIC):_PREFIX]:
+            raise ValueError(f"{path} failed its checksum")
+        (header_len,) = struct.unpack_from("<Q", mm, _PREFIX)
+        start = _PREFIX + 8
+        header = json.loads(mm[start:start + header_len])
+        if header["format"] != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is snapshot format {header['format']}, expected {SNAPSHOT_FORMAT}")
+        sources = http_cache.engine_sources()
+        if header["sources"] != sources:
+            stale = sorted(k for k in sources if header["sources"].get(k) != sources[k])
+            raise ValueError(f"{path} is stale ({', '.join(stale)} changed)")
+        base = start + header_len
+
+        arrays = {}
+        for name, (offset, dtype, count) in header["arrays"].items():
+            arrays[name] = np.frombuffer(mm, dtype=np.dtype(dtype), count=count, offset=base + offset)
+        snapshot = cls(
+            header["pro_fields"],
+            arrays["pro_rows"],
+            header["basic_fields"],
+            arrays["basic_rows"],
+            header["list_fields"],
+            arrays["values"],
+            arrays["value_offsets"],
+            header["sources"],
+        )
+        snapshot._mm = mm
+        return snapshot
+
+
+_snapshot: Optional[EngineSnapshot] = None
+_snapshot_checked = False
+_snapshot_error: Optional[str] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[EngineSnapshot]:
+    """
+    Process-wide snapshot from ENGINE_SNAPSHOT_PATH, or None when it is
+    unset or unusable (the reason is kept for snapshot_status()).
+    """
+    global _snapshot, _snapshot_checked, _snapshot_error
+    if not _snapshot_checked:
+        with _snapshot_lock:
+            if not _snapshot_checked:
+                if ENGINE_SNAPSHOT_PATH:
+                    try:
+                        _snapshot = EngineSnapshot.load(ENGINE_SNAPSHOT_PATH)
+                    except (OSError, ValueError, KeyError) as exc:
+                        _snapshot_error = str(exc)
+                _snapshot_checked = True
+    return _snapshot
+
+
+def snapshot_status() -> dict:
+    snapshot = get_snapshot()
+    return {
+        "path": ENGINE_SNAPSHOT_PATH,
+        "loaded": snapshot is not None,
+        "error": _snapshot_error,
+        "values": snapshot.n_values if snapshot is not None else 0,
+    }
+
+
+def pattern_summary(**conditions) -> dict:
+    """
+    build_pattern_summary, served from the snapshot when one is loaded.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        summary = snapshot.pattern_summary(**conditions)
+        if summary is not None:
+            return summary
+    return build_pattern_summary(**conditions)
+
+
+def basic_pattern_summary(**conditions) -> dict:
+    """
+    build_basic_pattern_summary, served from the snapshot when one is loaded.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot.basic_pattern_summary(**conditions)
+    return build_basic_pattern_summary(**conditions)
+
+
+if __name__ == "__main__":
+    # python -m app.snapshot build <out-path>
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        sys.exit("usage: python -m app.snapshot build <out-path>")
+    built = EngineSnapshot.build()
+    built.save(sys.argv[2])
+    print(f"wrote {len(built.pro_rows)} PRO and {len(built.basic_rows)} BASIC cells, {built.n_values} distinct values to {sys.argv[2]}")
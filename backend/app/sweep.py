@@ -0,0 +1,212 @@
+# app/sweep.py
+
+import json
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.pattern_logic import build_basic_pattern_summary, build_pattern_summary
+from app.phase_model import phase_breaks
+
+
+BUILDERS: Dict[str, Callable[..., dict]] = {
+    "basic": build_basic_pattern_summary,
+    "pro": build_pattern_summary,
+}
+
+# Condition fields that may be swept, per tier. BASIC has no depth input.
+SWEEP_PARAMS = {
+    "basic": ("temp_f", "wind_speed"),
+    "pro": ("temp_f", "wind_speed", "depth_ft"),
+}
+
+MAX_AXES = 2
+
+# Output fields that echo the exact inputs (notes quote the temperature and
+# wind), so they vary inside an interval and are left out of summaries.
+VOLATILE_FIELDS = ("notes", "conditions")
+
+# (lo, hi, lo_closed, hi_closed)
+Interval = Tuple[float, float, bool, bool]
+
+
+# ---------- Breakpoints ----------
+
+
+def breakpoints(param: str, conditions: dict) -> List[Tuple[float, bool]]:
+    """
+    Thresholds where the engine's output can change as `param` moves with
+    the other conditions fixed, as (value, upper) pairs ascending. `upper`
+    says the threshold value itself behaves like the values above it.
+    """
+    if param == "temp_f":
+        # classify_phase: temp < threshold -> colder phase.
+        breaks = phase_breaks(
+            conditions["month"],
+            conditions.get("latitude"),
+            conditions.get("day_of_year"),
+            conditions.get("temp_trend"),
+        )
+        return [(t, True) for t in breaks]
+    if param == "depth_ft":
+        # infer_depth_zone: < 8 shallow, 8..15 mid-depth, > 15 offshore.
+        return [(8.0, True), (15.0, False)]
+    if param == "wind_speed":
+        # Lure, tip and gear rules: <= 3 calm, >= 10 windy.
+        return [(3.0, False), (10.0, True)]
+    raise ValueError(f"cannot sweep {param!r}")
+
+
+def intervals(param: str, lo: float, hi: float, conditions: dict) -> List[Interval]:
+    """
+    Split the closed range [lo, hi] at the breakpoints of `param`. The
+    engine output (minus VOLATILE_FIELDS) is constant on each interval.
+    """
+    out: List[Interval] = []
+    start, start_closed = lo, True
+    for b, upper in breakpoints(param, conditions):
+        if b < lo or b > hi or (b == lo and upper) or (b == hi and not upper):
+            continue
+        if out and out[-1][1] == b:
+            continue  # duplicate threshold
+        out.append((start, b, start_closed, not upper))
+        start, start_closed = b, upper
+    out.append((start, hi, start_closed, True))
+    return out
+
+
+def representative(interval: Interval) -> float:
+    lo, hi = interval[0], interval[1]
+    return lo if lo == hi else (lo + hi) / 2
+
+
+def _closed(lo_closed: bool, hi_closed: bool) -> str:
+    if lo_closed and hi_closed:
+        return "both"
+    if lo_closed:
+        return "left"
+    if hi_closed:
+        return "right"
+    return "neither"
+
+
+def _render(interval: Interval) -> dict:
+    lo, hi, lo_closed, hi_closed = interval
+    return {"from": lo, "to": hi, "closed": _closed(lo_closed, hi_closed)}
+
+
+def _merge(items: Sequence[Interval], keys: Sequence) -> Tuple[List[Interval], List[int]]:
+    """
+    Join runs of adjacent intervals whose keys are equal. Returns the merged
+    intervals and, for each, the index of the first original it covers.
+    """
+    merged: List[Interval] = []
+    firsts: List[int] = []
+    for i, interval in enumerate(items):
+        if merged and keys[i] == keys[firsts[-1]]:
+            lo, _, lo_closed, _ = merged[-1]
+            merged[-1] = (lo, interval[1], lo_closed, interval[3])
+        else:
+            merged.append(interval)
+            firsts.append(i)
+    return merged, firsts
+
+
+# ---------- Sweep ----------
+
+
+class _Summaries:
+    """
+    Evaluates the engine and interns the (non-volatile) results, so equal
+    summaries are returned once and referenced by index.
+    """
+
+    def __init__(self, builder: Callable[..., dict], conditions: dict):
+        self.builder = builder
+        self.conditions = conditions
+        self.items: List[dict] = []
+        self._ids: Dict[str, int] = {}
+        self.evaluations = 0
+
+    def evaluate(self, point: dict) -> int:
+        result = self.builder(**{**self.conditions, **point})
+        self.evaluations += 1
+        summary = {k: v for k, v in result.items() if k not in VOLATILE_FIELDS}
+        key = json.dumps(summary, sort_keys=True)
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = self._ids[key] = len(self.items)
+            self.items.append(summary)
+        return idx
+
+
+def validate_axes(tier: str, axes: Sequence[dict]) -> None:
+    if tier not in BUILDERS:
+        raise ValueError(f"unknown tier {tier!r}")
+    if not 1 <= len(axes) <= MAX_AXES:
+        raise ValueError(f"sweep takes 1 to {MAX_AXES} axes")
+    params = [a["param"] for a in axes]
+    if len(set(params)) != len(params):
+        raise ValueError("axes must sweep different fields")
+    for a in axes:
+        if a["param"] not in SWEEP_PARAMS[tier]:
+            raise ValueError(f"{tier} sweeps support {', '.join(SWEEP_PARAMS[tier])}, not {a['param']!r}")
+        if not (math.isfinite(a["min"]) and math.isfinite(a["max"])) or a["min"] > a["max"]:
+            raise ValueError(f"bad range for {a['param']}: min must be <= max")
+
+
+def sweep(tier: str, conditions: dict, axes: Sequence[dict]) -> dict:
+    """
+    Evaluate the engine across one or two condition ranges.
+
+    `axes` are {"param", "min", "max"} dicts. Instead of sampling, each range
+    is split at the rules' thresholds and the engine runs once per interval
+    (once per cell in 2-D); adjacent intervals with identical summaries are
+    merged. Summaries leave out VOLATILE_FIELDS and are listed once in
+    "summaries", referenced by index from segments (1-D) or "cells" (2-D,
+    rows follow the first axis).
+    """
+    validate_axes(tier, axes)
+    summaries = _Summaries(BUILDERS[tier], conditions)
+    splits = [intervals(a["param"], a["min"], a["max"], conditions) for a in axes]
+
+    if len(axes) == 1:
+        (axis,), (split,) = axes, splits
+        ids = [summaries.evaluate({axis["param"]: representative(iv)}) for iv in split]
+        merged, firsts = _merge(split, ids)
+        segments = [{**_render(iv), "summary": ids[i]} for iv, i in zip(merged, firsts)]
+        out_axes = [{**axis, "segments": segments}]
+        cells = None
+    else:
+        (ax, ay), (sx, sy) = axes, splits
+        grid = [
+            [
+                summaries.evaluate({ax["param"]: representative(ix), ay["param"]: representative(iy)})
+                for iy in sy
+            ]
+            for ix in sx
+        ]
+        sx, rows = _merge(sx, [tuple(row) for row in grid])
+        grid = [grid[i] for i in rows]
+        sy, cols = _merge(sy, [tuple(row[j] for row in grid) for j in range(len(sy))])
+        cells = [[row[j] for j in cols] for row in grid]
+        out_axes = [
+            {**ax, "segments": [_render(iv) for iv in sx]},
+            {**ay, "segments": [_render(iv) for iv in sy]},
+        ]
+
+    out = {"tier": tier, "axes": out_axes, "summaries": summaries.items, "evaluations": summaries.evaluations}
+    if cells is not None:
+        out["cells"] = cells
+    return out
+
+
+def locate(segments: Sequence[dict], value: float) -> Optional[int]:
+    """
+    Index of the rendered segment containing `value`, or None.
+    """
+    for i, seg in enumerate(segments):
+        lo_ok = value > seg["from"] or (value == seg["from"] and seg["closed"] in ("left", "both"))
+        hi_ok = value < seg["to"] or (value == seg["to"] and seg["closed"] in ("right", "both"))
+        if lo_ok and hi_ok:
+            return i
+    return None
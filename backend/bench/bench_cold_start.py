@@ -0,0 +1,101 @@
+# bench/bench_cold_start.py
+"""
+Worker cold start: time from process spawn to the first fast /pattern/pro
+response, with and without a prebuilt engine snapshot.
+
+Each run spawns a fresh interpreter that imports app.main and sends PRO
+requests through the ASGI app (TestClient, no network) until one comes
+back under FAST_MS. It reports spawn -> app imported, spawn -> first
+response and spawn -> first fast response. Without a snapshot the first
+requests also build the gear memo and phase tables; with one they only
+format notes. The corrupt-snapshot case checks that the checksum fallback
+costs no more than running without one.
+
+Run from backend/:
+
+    python -m bench.bench_cold_start
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.snapshot import EngineSnapshot
+
+FAST_MS = 5.0
+
+CHILD = r"""
+import json, sys, time
+t_spawn = float(sys.argv[1])
+from fastapi.testclient import TestClient
+import app.main
+t_import = time.time()
+client = TestClient(app.main.app)
+first = None
+for i in range(200):
+    # Distinct conditions each time so the HTTP result cache never answers.
+    body = {"temp_f": 50.0 + i * 0.1, "month": 5, "clarity": "stained", "wind_speed": 6.0, "sky_condition": "cloudy"}
+    start = time.perf_counter()
+    resp = client.post("/pattern/pro", json=body)
+    elapsed = (time.perf_counter() - start) * 1e3
+    assert resp.status_code == 200
+    now = time.time()
+    first = first or now
+    if elapsed < %(fast_ms)s:
+        break
+print(json.dumps({
+    "import_s": t_import - t_spawn,
+    "first_s": first - t_spawn,
+    "fast_s": now - t_spawn,
+    "requests": i + 1,
+    "snapshot": client.get("/metrics").json()["engine_snapshot"]["loaded"],
+}))
+""" % {"fast_ms": FAST_MS}
+
+
+def spawn(snapshot_path) -> dict:
+    env = dict(os.environ)
+    env.pop("ENGINE_SNAPSHOT_PATH", None)
+    if snapshot_path:
+        env["ENGINE_SNAPSHOT_PATH"] = snapshot_path
+    env["HISTORY_ENABLED"] = "0"
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, repr(time.time())],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int = 5) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "engine.snap")
+        start = time.perf_counter()
+        EngineSnapshot.build().save(path)
+        print(f"snapshot build: {time.perf_counter() - start:.2f} s, {os.path.getsize(path) / 1e3:.0f} kB")
+
+        corrupt = os.path.join(tmp, "corrupt.snap")
+        data = bytearray(open(path, "rb").read())
+        data[-1] ^= 0xFF
+        with open(corrupt, "wb") as fh:
+            fh.write(data)
+
+        print(f"{'mode':18s} {'import s':>9s} {'first resp s':>13s} {'first fast s':>13s} {'requests':>9s}")
+        for label, snapshot_path in (("no snapshot", None), ("snapshot", path), ("corrupt snapshot", corrupt)):
+            results = [spawn(snapshot_path) for _ in range(runs)]
+            assert all(r["snapshot"] == (snapshot_path == path) for r in results)
+            med = {k: statistics.median(r[k] for r in results) for k in ("import_s", "first_s", "fast_s", "requests")}
+            print(
+                f"{label:18s} {med['import_s']:9.3f} {med['first_s']:13.3f} "
+                f"{med['fast_s']:13.3f} {med['requests']:9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
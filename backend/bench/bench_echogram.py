@@ -0,0 +1,70 @@
+# bench/bench_echogram.py
+"""
+Echogram pyramid build time and tile serve latency.
+
+Synthesizes an hour-long recording (10 pings/s x 1024 depth samples), builds
+its pyramid, then reads random tiles from every level.
+
+Run from backend/:
+
+    python -m bench.bench_echogram
+"""
+
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from app.echogram import build_pyramid, open_pyramid
+
+
+def main(pings: int = 36000, samples: int = 1024, reads: int = 5000) -> None:
+    with tempfile.TemporaryDirectory() as data_dir:
+        rng = np.random.default_rng(0)
+        # Bottom return + noise so tiles compress like real echograms.
+        data = rng.integers(0, 40, size=(pings, samples), dtype=np.uint8)
+        bottom = (600 + 80 * np.sin(np.arange(pings) / 900.0)).astype(int)
+        data[np.arange(pings), bottom] = 250
+        np.save(f"{data_dir}/hour.npy", data)
+        raw_mb = data.nbytes / 1e6
+
+        for pooling in ("max", "mean"):
+            start = time.perf_counter()
+            index = build_pyramid("hour", pooling=pooling, data_dir=data_dir)
+            build_s = time.perf_counter() - start
+            print(
+                f"build ({pooling}): {build_s:.2f}s for {raw_mb:.0f} MB raw, "
+                f"{len(index['levels'])} levels"
+            )
+
+        pyramid = open_pyramid("hour", data_dir=data_dir)
+        stored_mb = len(pyramid._mm) / 1e6
+        print(f"stored tiles: {stored_mb:.1f} MB")
+
+        coords = []
+        for level, info in enumerate(index["levels"]):
+            for _ in range(reads // len(index["levels"])):
+                coords.append((
+                    level,
+                    random.randrange(info["tiles_x"]),
+                    random.randrange(info["tiles_y"]),
+                ))
+
+        for label, read in (
+            ("compressed range read", pyramid.tile_compressed),
+            ("decompressed tile", pyramid.tile),
+        ):
+            timings = []
+            for level, tx, ty in coords:
+                t0 = time.perf_counter()
+                read(level, tx, ty)
+                timings.append((time.perf_counter() - t0) * 1e6)
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[int(len(timings) * 0.99)]
+            print(f"{label:22s} p50={p50:7.1f} us  p99={p99:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench/bench_gear.py
+"""
+Gear catalog matching throughput on a 10k-item catalog.
+
+Reports catalog build time, uncached spec -> top-k matching (every query
+goes through the attribute indexes), memoized lookups, and end-to-end
+build_pro_setups setups/sec.
+
+Run from backend/:
+
+    python -m bench.bench_gear
+"""
+
+import itertools
+import time
+
+from app import gear
+from app.gear import PROFILES, generate_catalog, setup_spec
+from app.pattern_logic import build_pro_setups
+
+DEPTH_ZONES = ("shallow", "mid-depth", "offshore")
+CLARITIES = ("clear", "stained", "muddy")
+BOTTOMS = (None, "rock", "grass", "sand")
+WINDS = (4.0, 14.0)
+
+
+def main(rounds: int = 5) -> None:
+    start = time.perf_counter()
+    catalog = generate_catalog()
+    print(f"catalog: {len(catalog)} items built and indexed in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    combos = list(itertools.product(PROFILES, DEPTH_ZONES, CLARITIES, BOTTOMS, WINDS))
+    specs = [setup_spec(*c) for c in combos]
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for spec in specs:
+            catalog.match(spec)
+        best = min(best, time.perf_counter() - start)
+    print(f"uncached match: {len(specs) / best:9.0f} setups/s ({best / len(specs) * 1e6:.1f} us per top-{gear.TOP_K})")
+
+    for c in combos:
+        catalog.best_setups(*c)
+    start = time.perf_counter()
+    n = 0
+    for _ in range(rounds * 20):
+        for c in combos:
+            catalog.best_setups(*c)
+            n += 1
+    elapsed = time.perf_counter() - start
+    print(f"memoized:       {n / elapsed:9.0f} setups/s ({elapsed / n * 1e6:.2f} us)")
+
+    gear._catalog = catalog
+    lures = ["medium-diving crankbait", "spinnerbait", "texas-rigged creature bait", "finesse worm on light line"]
+    start = time.perf_counter()
+    n = 0
+    for _ in range(rounds):
+        for depth_zone, clarity, bottom, wind in itertools.product(DEPTH_ZONES, CLARITIES, BOTTOMS, WINDS):
+            n += len(build_pro_setups(lures, "summer", depth_zone, clarity, wind, bottom, "sunny"))
+    elapsed = time.perf_counter() - start
+    print(f"build_pro_setups: {n / elapsed:7.0f} setups/s ({elapsed / n * 1e6:.1f} us per lure)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# bench/bench_history.py
+"""
+History recorder overhead and throughput.
+
+Measures the cost of record() on the request path, the p99 latency of
+/pattern/pro with recording enabled vs disabled (interleaved blocks, with
+the background flusher running), flush throughput, and range-query latency
+over a large table.
+
+Run from backend/:
+
+    python -m bench.bench_history
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import history
+from app.history import HistoryRecorder
+from app.main import app
+
+CONDITIONS = {
+    "temp_f": 64.0,
+    "month": 5,
+    "clarity": "stained",
+    "wind_speed": 8.0,
+    "sky_condition": "cloudy",
+    "depth_ft": 6.0,
+    "bottom_composition": "rock",
+}
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100.0 * len(values)))]
+
+
+def bench_record(rec: HistoryRecorder, n: int = 200_000) -> None:
+    rec.capacity = n + 1
+    start = time.perf_counter()
+    for i in range(n):
+        rec.record("pro", CONDITIONS, "W/\"key\"")
+    per_call = (time.perf_counter() - start) / n
+    print(f"record():        {per_call * 1e9:8.0f} ns/call")
+
+    start = time.perf_counter()
+    written = rec.flush()
+    elapsed = time.perf_counter() - start
+    print(f"flush:           {written / elapsed / 1e3:8.1f} k rows/s ({written} rows)")
+
+
+def bench_latency(rec: HistoryRecorder, blocks: int = 20, per_block: int = 250) -> None:
+    client = TestClient(app)
+    payloads = [
+        dict(CONDITIONS, temp_f=float(t), clarity=c)
+        for t in range(45, 86, 5)
+        for c in ("clear", "stained", "muddy")
+    ]
+    for p in payloads:  # warm the result cache
+        client.post("/pattern/pro", json=p)
+
+    timings = {True: [], False: []}
+    for block in range(blocks):
+        enabled = block % 2 == 0
+        rec.enabled = enabled
+        for i in range(per_block):
+            t0 = time.perf_counter()
+            client.post("/pattern/pro", json=payloads[i % len(payloads)])
+            timings[enabled].append(time.perf_counter() - t0)
+
+    off_p99 = _pct(timings[False], 99)
+    on_p99 = _pct(timings[True], 99)
+    print(
+        f"/pattern/pro p50 off={_pct(timings[False], 50) * 1e3:.3f} ms on={_pct(timings[True], 50) * 1e3:.3f} ms  "
+        f"p99 off={off_p99 * 1e3:.3f} ms on={on_p99 * 1e3:.3f} ms  ({(on_p99 / off_p99 - 1) * 100:+.1f}%)"
+    )
+    print(f"recorder: {rec.snapshot()}")
+
+
+def bench_query(rec: HistoryRecorder, rows: int = 1_000_000) -> None:
+    rng = random.Random(0)
+    now = time.time()
+    batch = []
+    for i in range(rows):
+        ts = now - 30 * 86400 + i * (30 * 86400 / rows)
+        conditions = dict(CONDITIONS, month=rng.randint(1, 12), clarity=rng.choice(("clear", "stained", "muddy")))
+        batch.append(
+            (ts, rng.choice(("basic", "pro")))
+            + tuple(conditions.get(name) for name in history.CONDITION_FIELDS)
+            + ("k", 200)
+        )
+    start = time.perf_counter()
+    with rec._write_conn:
+        rec._write_conn.execute("BEGIN")
+        rec._write_conn.executemany(history._INSERT, batch)
+    print(f"bulk load:       {rows / (time.perf_counter() - start) / 1e3:8.1f} k rows/s")
+
+    queries = {
+        "last hour": dict(since=now - 3600),
+        "last day, muddy": dict(since=now - 86400, clarity="muddy"),
+        "month=4, pro, last week": dict(since=now - 7 * 86400, tier="pro", month=4),
+    }
+    for label, kwargs in queries.items():
+        timings = []
+        for _ in range(20):
+            t0 = time.perf_counter()
+            rec.query(limit=100, **kwargs)
+            timings.append(time.perf_counter() - t0)
+        print(f"query {label:26s} p50={_pct(timings, 50) * 1e3:7.3f} ms")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        rec = HistoryRecorder(os.path.join(tmp, "history.sqlite3"))
+        history._history = rec
+        bench_record(rec)
+        rec.capacity = history.HISTORY_QUEUE_SIZE
+        rec.start()
+        bench_latency(rec)
+        rec.stop()
+        bench_query(rec)
+
+
+if __name__ == "__main__":
+    main()
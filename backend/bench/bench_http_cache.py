@@ -0,0 +1,101 @@
+# bench/bench_http_cache.py
+"""
+CPU per request and bytes saved by the pattern HTTP cache.
+
+Run from backend/:
+
+    python -m bench.bench_http_cache
+"""
+
+import gzip
+import json
+import time
+
+from starlette.requests import Request
+
+from app.http_cache import ResultCache, cached_json_response, condition_key, make_etag
+from app.pattern_logic import build_pattern_summary
+
+CONDITIONS = [
+    {
+        "temp_f": float(temp),
+        "month": month,
+        "clarity": clarity,
+        "wind_speed": float(wind),
+        "sky_condition": sky,
+        "depth_ft": None,
+        "bottom_composition": "rock and grass",
+    }
+    for temp in (45, 55, 65, 75, 85)
+    for month in (3, 6, 10)
+    for clarity in ("clear", "stained", "muddy")
+    for wind in (2, 8, 15)
+    for sky in ("sunny", "cloudy")
+]
+
+
+def make_request(headers: dict) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def cpu_per_request(fn, rounds: int) -> float:
+    start = time.process_time()
+    for _ in range(rounds):
+        for conditions in CONDITIONS:
+            fn(conditions)
+    return (time.process_time() - start) / (rounds * len(CONDITIONS))
+
+
+def main(rounds: int = 20) -> None:
+    gzip_request = make_request({"accept-encoding": "gzip"})
+
+    def uncached(conditions):
+        body = json.dumps(build_pattern_summary(**conditions), ensure_ascii=False)
+        gzip.compress(body.encode("utf-8"))
+
+    cache = ResultCache()
+
+    def cached(conditions):
+        cached_json_response(
+            gzip_request, "pro", conditions,
+            lambda: build_pattern_summary(**conditions), cache=cache,
+        )
+
+    revalidations = {
+        id(conditions): make_request(
+            {"if-none-match": make_etag(condition_key("pro", conditions))}
+        )
+        for conditions in CONDITIONS
+    }
+
+    def revalidate(conditions):
+        cached_json_response(
+            revalidations[id(conditions)], "pro", conditions,
+            lambda: build_pattern_summary(**conditions), cache=cache,
+        )
+
+    # Warm the cache once so the timed loops measure steady-state hits.
+    for conditions in CONDITIONS:
+        cached(conditions)
+
+    print(f"distinct conditions: {len(CONDITIONS)}")
+    for label, fn in (
+        ("build + json + gzip per request", uncached),
+        ("cached body (gzip)", cached),
+        ("If-None-Match -> 304", revalidate),
+    ):
+        us = cpu_per_request(fn, rounds) * 1e6
+        print(f"{label:34s} {us:8.1f} us CPU/request")
+
+    stats = cache.stats
+    saved = stats["bytes_identity"] - stats["bytes_sent"]
+    print(
+        f"bytes identity={stats['bytes_identity']} sent={stats['bytes_sent']} "
+        f"saved={saved} ({100.0 * saved / max(stats['bytes_identity'], 1):.1f}%)"
+    )
+    print(f"hits={stats['hits']} misses={stats['misses']} 304s={stats['not_modified']}")
+
+
+if __name__ == "__main__":
+    main()
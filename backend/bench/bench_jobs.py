@@ -0,0 +1,88 @@
+# bench/bench_jobs.py
+"""
+Background job throughput and /pattern/pro tail latency while jobs run.
+
+Queues sonar pyramid builds for synthetic recordings and, meanwhile, keeps
+hitting /pattern/pro in the server process. Compare the latency
+percentiles against the idle baseline printed first.
+
+Run from backend/:
+
+    python -m bench.bench_jobs
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import http_cache
+from app.jobs import FINAL_STATES, JobQueue
+from app.main import app
+
+PAYLOADS = [
+    {
+        "temp_f": float(t), "month": 4, "clarity": c, "wind_speed": float(w),
+        "sky_condition": "cloudy", "depth_ft": None, "bottom_composition": "rock",
+    }
+    for t in range(40, 90) for c in ("clear", "stained", "muddy") for w in (2, 12)
+]
+
+
+def route_latencies(client: TestClient, seconds: float) -> list:
+    timings = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        # Clear the result cache so every call does the real pattern work.
+        http_cache.result_cache.clear()
+        t0 = time.perf_counter()
+        client.post("/pattern/pro", json=PAYLOADS[i % len(PAYLOADS)])
+        timings.append((time.perf_counter() - t0) * 1e3)
+        i += 1
+    return sorted(timings)
+
+
+def report(label: str, timings: list) -> None:
+    p50 = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"{label:22s} n={len(timings):6d}  p50={p50:6.2f} ms  p99={p99:6.2f} ms")
+
+
+def main(n_jobs: int = 8, pings: int = 4000, samples: int = 1024) -> None:
+    client = TestClient(app)
+    report("/pattern/pro idle", route_latencies(client, 3.0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(0)
+        for i in range(n_jobs):
+            data = rng.integers(0, 60, size=(pings, samples), dtype=np.uint8)
+            np.save(os.path.join(tmp, f"rec{i}.npy"), data)
+
+        queue = JobQueue(os.path.join(tmp, "jobs.sqlite3"))
+        queue.start()
+        start = time.perf_counter()
+        job_ids = [
+            queue.submit("sonar_pyramid", {"recording_id": f"rec{i}", "data_dir": tmp})["job_id"]
+            for i in range(n_jobs)
+        ]
+
+        timings = []
+        while True:
+            timings.extend(route_latencies(client, 0.5))
+            if all(queue.get(j)["status"] in FINAL_STATES for j in job_ids):
+                break
+        elapsed = time.perf_counter() - start
+        queue.stop()
+
+        print(
+            f"jobs: {n_jobs} in {elapsed:.2f}s on {queue.max_workers} workers "
+            f"({n_jobs / elapsed:.2f} jobs/s), statuses={queue.counts()}"
+        )
+        report("/pattern/pro with jobs", sorted(timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench/bench_knowledge.py
+"""
+Knowledge index build, load and query latency at 100k documents.
+
+The engine corpus is padded with synthetic documents drawn from a
+Zipf-distributed vocabulary so posting lists have realistic skew.
+
+Run from backend/:
+
+    python -m bench.bench_knowledge
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.knowledge import BM25Index, engine_documents, tokenize
+
+QUERIES = [
+    "what do I throw on riprap in muddy water",
+    "dropshot rod for offshore summer fish",
+    "colors for clear sunny water",
+    "wind-blown banks spinnerbait",
+    "grass edges swim jig",
+    "cold winter jerkbait steep channel swings",
+]
+
+
+def synthetic_documents(n: int, seed: int = 0) -> list:
+    engine = engine_documents()
+    vocab = sorted({tok for doc in engine for tok in tokenize(doc["text"])})
+    vocab += [f"term{i}" for i in range(50000)]
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, size=n * 24), len(vocab)) - 1
+    docs = list(engine)
+    for i in range(n - len(docs)):
+        words = [vocab[r] for r in ranks[i * 24:(i + 1) * 24]]
+        docs.append({"text": " ".join(words), "source": "synthetic"})
+    return docs
+
+
+def main(n_docs: int = 100000, rounds: int = 200) -> None:
+    docs = synthetic_documents(n_docs)
+
+    start = time.perf_counter()
+    index = BM25Index.build(docs)
+    print(f"build: {time.perf_counter() - start:.2f}s ({index.n_docs} docs, {len(index.vocab)} terms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "kb.idx")
+        index.save(path)
+        print(f"serialized size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        loaded = BM25Index.load(path)
+        print(f"load (mmap): {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+        for label, idx in (("in-memory", index), ("mmap", loaded)):
+            timings = []
+            for _ in range(rounds):
+                for query in QUERIES:
+                    t0 = time.perf_counter()
+                    idx.search(query, k=5)
+                    timings.append((time.perf_counter() - t0) * 1e6)
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[int(len(timings) * 0.99)]
+            print(f"query ({label:9s}) p50={p50:7.1f} us  p99={p99:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench/bench_lures.py
+"""
+Lure SKU index build time and color-match query latency.
+
+Builds the Lab-space KD-tree index over the generated catalog (tens of
+thousands of SKUs), times a snapshot save/load, then measures single
+nearest-neighbour queries and uncached baits_for() calls.
+
+Run from backend/:
+
+    python -m bench.bench_lures
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.lures import FAMILIES, PALETTES, LureIndex, generate_skus
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100.0 * len(values)))]
+
+
+def main(per_color: int = 80, queries: int = 20000) -> None:
+    skus = generate_skus(per_color=per_color)
+    start = time.perf_counter()
+    index = LureIndex.build(skus)
+    print(f"build: {len(index)} SKUs, {len(index.trees)} trees in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lures.npz")
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        LureIndex.load(path)
+        print(f"snapshot: save {saved * 1e3:.0f} ms, load {(time.perf_counter() - start) * 1e3:.0f} ms "
+              f"({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform([0, -60, -60], [100, 60, 90], (queries, 3))
+    families = [FAMILIES[i % len(FAMILIES)] for i in range(queries)]
+    for k in (1, 5):
+        timings = []
+        for family, q in zip(families, points):
+            t0 = time.perf_counter()
+            index.nearest(family, q, k=k)
+            timings.append(time.perf_counter() - t0)
+        print(f"nearest k={k}:  p50={_pct(timings, 50) * 1e6:6.1f} us  p99={_pct(timings, 99) * 1e6:6.1f} us")
+
+    lures = ["medium-diving crankbait", "black/blue jig", "spinnerbait", "texas-rigged creature bait"]
+    timings = []
+    for i in range(2000):
+        index._memo.clear()
+        palette = list(PALETTES.values())[i % len(PALETTES)]
+        t0 = time.perf_counter()
+        index.baits_for(lures[i % len(lures)], palette)
+        timings.append(time.perf_counter() - t0)
+    print(f"baits_for (uncached): p50={_pct(timings, 50) * 1e6:6.1f} us  p99={_pct(timings, 99) * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
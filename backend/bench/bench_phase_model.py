@@ -0,0 +1,70 @@
+# bench/bench_phase_model.py
+"""
+Per-call cost of the phase classifier: the old fixed-cutoff branch chain
+vs the month-only fast path, the latitude/day-of-year grid lookup (cold,
+and with the repeated lakes and dates real traffic sends), and the
+vectorized classifier.
+
+Run from backend/:
+
+    python -m bench.bench_phase_model
+"""
+
+import time
+
+import numpy as np
+
+from app.phase_model import classify_phase_array, classify_phase_index
+from app.pattern_logic import classify_phase
+
+
+def _branch_chain(temp_f: float, month: int) -> str:
+    # The classifier before the threshold grid, for comparison.
+    if temp_f < 50:
+        return "winter"
+    if 50 <= temp_f < 60:
+        return "pre-spawn"
+    if 60 <= temp_f < 70:
+        return "spawn/post-spawn"
+    if 70 <= temp_f < 80:
+        return "summer"
+    return "fall"
+
+
+def _time(label: str, fn, args, rounds: int = 5) -> None:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for a in args:
+            fn(*a)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:32s} {best / len(args) * 1e9:8.0f} ns/call")
+
+
+def main(n: int = 200_000) -> None:
+    rng = np.random.default_rng(0)
+    temps = rng.uniform(35, 95, n).tolist()
+    months = rng.integers(1, 13, n).tolist()
+    lats = rng.uniform(20, 50, n).tolist()
+    doys = rng.integers(1, 366, n).tolist()
+
+    _time("old branch chain", _branch_chain, list(zip(temps, months)))
+    _time("classify_phase (month)", classify_phase, list(zip(temps, months)))
+    _time("classify_phase (lat/doy)", classify_phase, list(zip(temps, months, lats, doys)))
+    _time("classify_phase_index (lat/doy)", classify_phase_index, list(zip(temps, months, lats, doys)))
+    # 500 lakes fished over a week: every point after the first is cached.
+    lakes = rng.uniform(20, 50, 500).tolist()
+    repeat = [(t, m, lakes[k % 500], 120 + k % 7) for k, (t, m) in enumerate(zip(temps, months))]
+    _time("classify_phase (lat/doy, repeat)", classify_phase, repeat)
+
+    grid = np.asarray(temps, dtype=np.float32).reshape(-1, 1000)
+    row_lats = np.linspace(50, 25, grid.shape[0])[:, None]
+    start = time.perf_counter()
+    for _ in range(5):
+        classify_phase_array(grid, 120, row_lats)
+    elapsed = (time.perf_counter() - start) / 5
+    print(f"{'classify_phase_array':32s} {grid.size / elapsed / 1e6:8.1f} M cells/s")
+
+
+if __name__ == "__main__":
+    main()
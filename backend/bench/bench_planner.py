@@ -0,0 +1,93 @@
+# bench/bench_planner.py
+"""
+Trip planner on 50 waypoints x 72 forecast hours (three fishing days).
+
+Reports the score-table build (engine calls are memoized on the pattern
+key, so this is mostly dictionary work), the exact DP solve, the solve
+with top-N candidate pruning, and the end-to-end plan_trip time, which
+must stay under a second.
+
+Run from backend/:
+
+    python -m bench.bench_planner
+"""
+
+import time
+
+import numpy as np
+
+from app.pattern_logic import build_pattern_summary
+from app.planner import ScoreTable, fishing_days, plan_trip, solve, travel_hours
+
+FEATURES = [
+    "secondary point", "spawning flat", "channel swing", "dock", "offshore hump", "ledge",
+    "riprap bank", "grass edge", "creek arm pocket", "steep bank", "main-lake point", "laydowns",
+]
+BOTTOMS = ["rock", "grass", "sand", None]
+LAUNCH = (36.1, -85.9)
+
+
+def make_trip(n_waypoints: int = 50, n_hours: int = 72, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    waypoints = [
+        {
+            "id": f"wp{i}",
+            "lat": 36.0 + rng.uniform(0, 0.25),
+            "lon": -86.0 + rng.uniform(0, 0.35),
+            "depth_ft": float(rng.choice([4.0, 10.0, 22.0])) if rng.random() < 0.8 else None,
+            "bottom_composition": BOTTOMS[rng.integers(len(BOTTOMS))],
+            "features": list(rng.choice(FEATURES, 2, replace=False)),
+            "facing_deg": float(rng.uniform(0, 360)),
+        }
+        for i in range(n_waypoints)
+    ]
+    t = np.arange(n_hours)
+    forecast = [
+        {
+            "temp_f": float(58 + 6 * np.sin((h - 9) / 24 * 2 * np.pi) + 0.15 * h),
+            "wind_speed": float(abs(8 + 7 * np.sin(h / 7))),
+            "wind_dir_deg": float((200 + 4 * h) % 360),
+            "sky_condition": "sunny" if (h // 5) % 2 else "cloudy",
+        }
+        for h in t
+    ]
+    return waypoints, forecast
+
+
+def best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(rounds: int = 5) -> None:
+    waypoints, forecast = make_trip()
+    kwargs = dict(month=4, clarity="stained", latitude=36.0, day_of_year=105, start_hour=0)
+
+    # Warm the gear memo so the first row isn't a cold start.
+    build_pattern_summary(60.0, 4, "stained", 5.0, "sunny")
+
+    t_table, table = best_of(lambda: ScoreTable(waypoints, forecast, **kwargs), rounds)
+    print(f"score table: {len(waypoints)}x{len(forecast)} in {t_table * 1e3:6.1f} ms ({len(table.summaries)} engine calls)")
+
+    points = np.array([[w["lat"], w["lon"]] for w in waypoints] + [list(LAUNCH)])
+    travel = travel_hours(points, 40.0)
+    days = fishing_days(len(forecast), 0, (6, 19))
+
+    t_exact, (exact, _) = best_of(lambda: solve(table.scores, travel, days), rounds)
+    print(f"exact DP:    {t_exact * 1e3:6.1f} ms  score {exact:.3f}")
+    for n in (3, 8):
+        t_pruned, (pruned, _) = best_of(lambda: solve(table.scores, travel, days, candidates_per_hour=n), rounds)
+        print(f"top-{n} DP:    {t_pruned * 1e3:6.1f} ms  score {pruned:.3f} ({pruned / exact:.1%} of exact)")
+
+    t_plan, plan = best_of(lambda: plan_trip(waypoints, forecast, launch=LAUNCH, **kwargs), rounds)
+    stops = sum(len(d["stops"]) for d in plan["days"])
+    print(f"plan_trip:   {t_plan * 1e3:6.1f} ms  {stops} stops over {len(plan['days'])} days")
+    assert t_plan < 1.0, "plan_trip must finish 50 x 72 in under a second"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench/bench_regional.py
+"""
+Regional raster classification throughput and tile render latency.
+
+Run from backend/:
+
+    python -m bench.bench_regional
+"""
+
+import time
+
+import numpy as np
+
+from app.regional import RegionalTileStore, classify_grid, tile_bounds
+
+
+def main(size: int = 4096, rounds: int = 5) -> None:
+    rng = np.random.default_rng(0)
+    # Smooth north-south gradient plus noise, 40-90°F.
+    temps = (np.linspace(40, 90, size)[:, None] + rng.normal(0, 3, (size, size))).astype(np.float32)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        classify_grid(temps, 6)
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"classify: {size * size / elapsed / 1e6:.1f} M cells/s ({elapsed * 1e3:.1f} ms per {size}x{size})")
+
+    store = RegionalTileStore(max_tiles=100000)
+    store.set_raster("bench", temps, tile_bounds(4, 3, 5))
+    store.phase_grid("bench", 6)
+
+    tiles = [(z, x, y) for z in (5, 6, 7) for x in range(3 * 2 ** (z - 4), 4 * 2 ** (z - 4))
+             for y in range(5 * 2 ** (z - 4), 6 * 2 ** (z - 4))]
+    for label in ("cold render", "cached"):
+        timings = []
+        for layer in ("phase", "technique"):
+            for z, x, y in tiles:
+                t0 = time.perf_counter()
+                store.tile("bench", layer, 6, z, x, y)
+                timings.append((time.perf_counter() - t0) * 1e6)
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"{label:12s} {len(timings)} tiles  p50={p50:8.1f} us  p99={p99:8.1f} us")
+
+    changed = temps.copy()
+    changed[:64, :64] += 20.0
+    start = time.perf_counter()
+    invalidated = store.set_raster("bench", changed, tile_bounds(4, 3, 5))
+    print(
+        f"update: {invalidated} of {2 * len(tiles)} tiles invalidated "
+        f"in {(time.perf_counter() - start) * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench/bench_sweep.py
+"""
+Interval sweep vs dense sampling of the PRO engine.
+
+Dense sampling is what a client looping over /pattern/pro does: one engine
+call per grid point (here without the HTTP round trip, so the real gap is
+larger). The sweep splits each range at the rule thresholds and calls the
+engine once per interval. Both are checked to agree at every dense point.
+
+Run from backend/:
+
+    python -m bench.bench_sweep
+"""
+
+import time
+
+import numpy as np
+
+from app.pattern_logic import build_pattern_summary
+from app.sweep import VOLATILE_FIELDS, locate, sweep
+
+FIXED = {
+    "month": 5,
+    "clarity": "clear",
+    "sky_condition": "sunny",
+    "bottom_composition": "rock",
+    "depth_ft": None,
+}
+
+CASES = [
+    ("temp 40-90°F @0.1", [("temp_f", 40.0, 90.0, 0.1)], {"wind_speed": 6.0}),
+    ("wind 0-25 mph @0.1", [("wind_speed", 0.0, 25.0, 0.1)], {"temp_f": 66.0}),
+    ("temp x wind @0.5", [("temp_f", 40.0, 90.0, 0.5), ("wind_speed", 0.0, 25.0, 0.5)], {}),
+]
+
+
+def strip(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k not in VOLATILE_FIELDS}
+
+
+def dense(fixed: dict, axes) -> list:
+    grids = [np.linspace(lo, hi, int(round((hi - lo) / step)) + 1) for _, lo, hi, step in axes]
+    points = np.stack(np.meshgrid(*grids, indexing="ij"), -1).reshape(-1, len(axes))
+    names = [name for name, *_ in axes]
+    return [
+        (point, strip(build_pattern_summary(**fixed, **dict(zip(names, map(float, point))))))
+        for point in points
+    ]
+
+
+def check(result: dict, samples: list) -> None:
+    segments = [a["segments"] for a in result["axes"]]
+    for point, expected in samples:
+        idx = [locate(segs, float(v)) for segs, v in zip(segments, point)]
+        summary = result["cells"][idx[0]][idx[1]] if "cells" in result else segments[0][idx[0]]["summary"]
+        assert result["summaries"][summary] == expected, point
+
+
+def main(rounds: int = 3) -> None:
+    print(f"{'sweep':22s} {'dense calls':>11s} {'dense ms':>9s} {'intervals':>9s} {'sweep ms':>9s} {'speedup':>8s}")
+    for label, axes, extra in CASES:
+        fixed = {**FIXED, **extra}
+        spec = [{"param": name, "min": lo, "max": hi} for name, lo, hi, _ in axes]
+
+        dense_best = sweep_best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            samples = dense(fixed, axes)
+            dense_best = min(dense_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = sweep("pro", fixed, spec)
+            sweep_best = min(sweep_best, time.perf_counter() - start)
+
+        check(result, samples)
+        print(
+            f"{label:22s} {len(samples):11d} {dense_best * 1e3:9.1f} {result['evaluations']:9d} "
+            f"{sweep_best * 1e3:9.2f} {dense_best / sweep_best:7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# bench/loadtest.py
+"""
+Open-loop load generator for app.main:app.
+
+Launches the app under uvicorn with a given worker count, then drives
+/pattern/basic, /pattern/pro and /health at fixed arrival rates. Requests
+are fired on schedule whether or not earlier ones finished, and latency is
+measured from the scheduled send time, so a saturated server shows up as
+growing latency instead of a politely slower client.
+
+Run from backend/:
+
+    python -m bench.loadtest --workers 1,2 --rates 50,100,200,400 --duration 10
+
+Results are written as JSON and CSV under bench/results/ so runs from
+different commits can be compared. Admission-control rejections (503) are
+counted as "shed" rather than errors, so at saturation the per-route rows
+show BASIC being shed while PRO latency holds.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "bench", "results")
+
+# Payloads cycle so results aren't all served from a single cache entry.
+BASIC_PAYLOADS = [
+    {"temp_f": float(t), "month": m, "clarity": c, "wind_speed": float(w)}
+    for t in (45, 55, 65, 75, 85)
+    for m in (3, 7, 10)
+    for c in ("clear", "stained", "muddy")
+    for w in (2, 12)
+]
+PRO_PAYLOADS = [
+    dict(p, sky_condition=s, depth_ft=d, bottom_composition=b)
+    for p in BASIC_PAYLOADS
+    for s in ("sunny", "cloudy")
+    for d in (None, 12.0)
+    for b in ("rock", "grass")
+]
+# (weight, method, path, payloads)
+ROUTES = [
+    (4, "POST", "/pattern/basic", BASIC_PAYLOADS),
+    (4, "POST", "/pattern/pro", PRO_PAYLOADS),
+    (1, "GET", "/health", [None]),
+]
+
+CSV_FIELDS = [
+    "workers", "route", "offered_rps", "achieved_rps", "sent", "ok", "shed", "errors",
+    "p50_ms", "p90_ms", "p99_ms", "max_ms", "max_in_flight",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (0.0 if empty).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[tuple], offered_rps: float, elapsed: float) -> dict:
+    """
+    Turn (latency_s, status) samples for one step into throughput/latency
+    figures. Status 0 means the request failed without a response.
+    """
+    latencies = sorted(lat * 1000.0 for lat, status in samples if 0 < status < 400)
+    ok_count = len(latencies)
+    shed = sum(1 for _, status in samples if status == 503)
+    return {
+        "offered_rps": offered_rps,
+        "achieved_rps": round(ok_count / elapsed, 2) if elapsed > 0 else 0.0,
+        "sent": len(samples),
+        "ok": ok_count,
+        "shed": shed,
+        "errors": len(samples) - ok_count - shed,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def find_saturation(
+    steps: List[dict],
+    min_ratio: float = 0.9,
+    p99_slo_ms: float = 250.0,
+) -> Optional[float]:
+    """
+    First offered rate where the server stops keeping up: achieved
+    throughput falls below min_ratio of offered, requests are shed or
+    fail, or p99 exceeds the SLO. Returns None if every step was healthy.
+    """
+    for step in steps:
+        if (
+            step["achieved_rps"] < min_ratio * step["offered_rps"]
+            or step["errors"] > 0
+            or step.get("shed", 0) > 0
+            or step["p99_ms"] > p99_slo_ms
+        ):
+            return step["offered_rps"]
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR)
+
+
+def wait_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} did not become healthy")
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    rate: float,
+    duration: float,
+) -> dict:
+    """
+    Fire requests at a fixed arrival rate for `duration` seconds.
+
+    Returns per-route summaries plus an "all" summary.
+    """
+    schedule = []
+    for weight, method, path, payloads in ROUTES:
+        schedule.extend([(method, path, itertools.cycle(payloads))] * weight)
+    picks = itertools.cycle(schedule)
+
+    samples = {path: [] for _, _, path, _ in ROUTES}
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fire(method, path, payload, scheduled):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        status = 0
+        try:
+            resp = await client.request(method, path, json=payload)
+            status = resp.status_code
+        except httpx.HTTPError:
+            pass
+        finally:
+            in_flight -= 1
+        samples[path].append((time.perf_counter() - scheduled, status))
+
+    total = int(rate * duration)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        method, path, payloads = next(picks)
+        tasks.append(asyncio.create_task(fire(method, path, next(payloads), scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    result = {}
+    weights = {path: weight for weight, _, path, _ in ROUTES}
+    total_weight = sum(weights.values())
+    for path, route_samples in samples.items():
+        result[path] = summarize(route_samples, rate * weights[path] / total_weight, elapsed)
+    all_samples = [s for route_samples in samples.values() for s in route_samples]
+    result["all"] = summarize(all_samples, rate, elapsed)
+    result["all"]["max_in_flight"] = max_in_flight
+    return result
+
+
+async def run_curve(base_url: str, rates: List[float], duration: float) -> List[dict]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=256)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        steps = []
+        for rate in rates:
+            step = await run_step(client, rate, duration)
+            all_ = step["all"]
+            print(
+                f"  {rate:8.1f} rps offered -> {all_['achieved_rps']:8.1f} achieved, "
+                f"p50={all_['p50_ms']:.1f}ms p99={all_['p99_ms']:.1f}ms "
+                f"shed={all_['shed']} errors={all_['errors']} in-flight<={all_['max_in_flight']}"
+            )
+            steps.append(step)
+        return steps
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(run: dict, out_prefix: str) -> None:
+    os.makedirs(os.path.dirname(out_prefix) or ".", exist_ok=True)
+    with open(f"{out_prefix}.json", "w") as fh:
+        json.dump(run, fh, indent=2)
+    with open(f"{out_prefix}.csv", "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for curve in run["curves"]:
+            for step in curve["steps"]:
+                for route, summary in step.items():
+                    writer.writerow({"workers": curve["workers"], "route": route, **summary})
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="1", help="comma-separated uvicorn worker counts")
+    parser.add_argument("--rates", default="25,50,100,200,400", help="comma-separated arrival rates (req/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate step")
+    parser.add_argument("--p99-slo-ms", type=float, default=250.0)
+    parser.add_argument("--url", default=None, help="drive an already running server instead of launching one")
+    parser.add_argument("--out", default=None, help="output path prefix (without extension)")
+    args = parser.parse_args(argv)
+
+    rates = [float(r) for r in args.rates.split(",")]
+    commit = git_commit()
+    run = {
+        "commit": commit,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "duration_s": args.duration,
+        "rates": rates,
+        "p99_slo_ms": args.p99_slo_ms,
+        "curves": [],
+    }
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        server = None
+        base_url = args.url
+        if base_url is None:
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            server = start_server(workers, port)
+        try:
+            wait_healthy(base_url)
+            print(f"workers={workers} ({base_url})")
+            steps = asyncio.run(run_curve(base_url, rates, args.duration))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        saturation = find_saturation([s["all"] for s in steps], p99_slo_ms=args.p99_slo_ms)
+        print(f"  saturation point: {saturation if saturation is not None else 'not reached'}")
+        run["curves"].append({
+            "workers": workers,
+            "saturation_rps": saturation,
+            "steps": steps,
+        })
+
+    out_prefix = args.out or os.path.join(
+        RESULTS_DIR, f"loadtest-{commit}-{time.strftime('%Y%m%d-%H%M%S')}"
+    )
+    write_results(run, out_prefix)
+    print(f"wrote {out_prefix}.json and {out_prefix}.csv")
+    return run
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+# tests/conftest.py
+
+import pytest
+
+from app import history
+
+
+@pytest.fixture(scope="session", autouse=True)
+def history_db(tmp_path_factory):
+    """
+    Keep the app's history recorder out of backend/data while tests run.
+    """
+    path = str(tmp_path_factory.mktemp("history") / "history.sqlite3")
+    saved = history.HISTORY_DB_PATH, history._history
+    history.HISTORY_DB_PATH, history._history = path, None
+    yield path
+    if history._history is not None:
+        history._history.stop()
+    history.HISTORY_DB_PATH, history._history = saved
@@ -0,0 +1,175 @@
+# tests/test_admission.py
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.admission import AdmissionController, AdmissionMiddleware, Shed, TierPolicy
+from app.main import app
+
+client = TestClient(app)
+
+
+def make_controller(capacity=2, basic_reserve=0, basic_timeout=0.05, basic_queue=4):
+    return AdmissionController(
+        capacity=capacity,
+        policies={
+            "pro": TierPolicy(priority=0, max_queue=8, queue_timeout=1.0),
+            "basic": TierPolicy(priority=1, max_queue=basic_queue, queue_timeout=basic_timeout, reserve=basic_reserve),
+        },
+    )
+
+
+def test_admits_until_capacity_then_queues_and_hands_off():
+    async def scenario():
+        ctl = make_controller(capacity=1)
+        assert await ctl.acquire("pro") == 0.0
+
+        waiter = asyncio.ensure_future(ctl.acquire("pro"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        ctl.release(0.01)
+        queued = await waiter
+        assert queued > 0
+        assert ctl.in_flight == 1
+        return ctl
+
+    ctl = asyncio.run(scenario())
+    assert ctl.snapshot()["tiers"]["pro"]["admitted"] == 2
+
+
+def test_basic_respects_reserve_and_is_dropped_at_deadline():
+    async def scenario():
+        ctl = make_controller(capacity=2, basic_reserve=1)
+        await ctl.acquire("basic")
+        with pytest.raises(Shed) as exc:
+            await ctl.acquire("basic")
+        assert exc.value.reason == "deadline"
+        assert exc.value.retry_after >= 1
+
+        # The reserved slot is still available to PRO.
+        assert await ctl.acquire("pro") == 0.0
+        return ctl
+
+    ctl = asyncio.run(scenario())
+    assert ctl.stats["basic"]["shed_deadline"] == 1
+
+
+def test_basic_shed_immediately_while_pro_waits_and_pro_served_first():
+    async def scenario():
+        ctl = make_controller(capacity=1, basic_timeout=1.0)
+        await ctl.acquire("pro")
+        basic_waiter = asyncio.ensure_future(ctl.acquire("basic"))
+        await asyncio.sleep(0)
+        pro_waiter = asyncio.ensure_future(ctl.acquire("pro"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Shed) as exc:
+            await ctl.acquire("basic")
+        assert exc.value.reason == "overload"
+
+        ctl.release()
+        await pro_waiter
+        assert not basic_waiter.done()
+        ctl.release()
+        await basic_waiter
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_sheds_new_arrivals():
+    async def scenario():
+        ctl = make_controller(capacity=1, basic_queue=1, basic_timeout=1.0)
+        await ctl.acquire("basic")
+        waiter = asyncio.ensure_future(ctl.acquire("basic"))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as exc:
+            await ctl.acquire("basic")
+        assert exc.value.reason == "queue_full"
+        ctl.release()
+        await waiter
+
+    asyncio.run(scenario())
+
+
+def test_middleware_returns_503_with_retry_after():
+    # BASIC must leave the only slot free for PRO, so it always times out.
+    mini = FastAPI()
+    mini.add_middleware(AdmissionMiddleware, controller=make_controller(capacity=1, basic_reserve=1))
+
+    @mini.get("/pattern/basic")
+    def basic():
+        return {"tier": "basic"}
+
+    @mini.get("/pattern/pro")
+    def pro():
+        return {"tier": "pro"}
+
+    @mini.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    local = TestClient(mini)
+    shed = local.get("/pattern/basic")
+    assert shed.status_code == 503
+    assert int(shed.headers["retry-after"]) >= 1
+    assert shed.json()["reason"] == "deadline"
+
+    assert local.get("/pattern/pro").json() == {"tier": "pro"}
+    assert local.get("/health").status_code == 200
+
+
+def test_pro_latency_holds_while_basic_is_shed():
+    # Default policies, 4 slots, 20 ms per request: about 200 req/s of
+    # capacity. Offer twice that, one PRO request in four, open loop.
+    mini = FastAPI()
+    controller = AdmissionController(capacity=4)
+    mini.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @mini.get("/pattern/basic")
+    async def basic():
+        await asyncio.sleep(0.02)
+        return {}
+
+    @mini.get("/pattern/pro")
+    async def pro():
+        await asyncio.sleep(0.02)
+        return {}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=mini)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as local:
+            start = time.perf_counter()
+
+            async def fire(path, at):
+                await asyncio.sleep(max(0.0, start + at - time.perf_counter()))
+                resp = await local.get(path)
+                # Latency from the scheduled send time, as in bench/loadtest.py.
+                return path, resp.status_code, time.perf_counter() - (start + at)
+
+            return await asyncio.gather(*(
+                fire("/pattern/pro" if i % 4 == 0 else "/pattern/basic", i / 400.0) for i in range(400)
+            ))
+
+    results = asyncio.run(scenario())
+    pro_latencies = sorted(lat for path, status, lat in results if path == "/pattern/pro" and status == 200)
+    basic_statuses = [status for path, status, _ in results if path == "/pattern/basic"]
+
+    assert len(pro_latencies) == 100, "no PRO request is shed"
+    assert pro_latencies[98] < 0.15, f"PRO p99 {pro_latencies[98] * 1e3:.0f} ms"
+    assert basic_statuses.count(503) > len(basic_statuses) // 4
+    assert set(basic_statuses) == {200, 503}
+
+
+def test_metrics_reports_admission_stats():
+    client.get("/pattern/basic", params={"temp_f": 55, "month": 3, "clarity": "clear", "wind_speed": 2})
+    body = client.get("/metrics").json()["admission"]
+
+    assert body["capacity"] > 0
+    assert body["tiers"]["basic"]["admitted"] >= 1
+    assert set(body["tiers"]["pro"]["queue_time_ms"]) == {"p50", "p99", "max"}
@@ -0,0 +1,150 @@
+# tests/test_echogram.py
+
+import os
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import echogram, jobs
+from app.echogram import (
+    TILE_SIZE,
+    build_pyramid,
+    open_pyramid,
+    pool_2x2,
+    pyramid_status,
+)
+from app.main import app
+
+client = TestClient(app)
+
+
+def wait_for_job(job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in jobs.FINAL_STATES:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def make_recording(data_dir, recording_id="rec1", pings=TILE_SIZE * 3 + 10, samples=300):
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 255, size=(pings, samples), dtype=np.uint8)
+    np.save(data_dir / f"{recording_id}.npy", data)
+    return data
+
+
+def test_pool_2x2_max_and_mean():
+    block = np.array([[1, 3, 5], [7, 9, 11]], dtype=np.uint8)
+
+    assert pool_2x2(block, "max").tolist() == [[9, 11]]
+    assert pool_2x2(block, "mean").tolist() == [[5, 8]]
+
+
+def test_build_pyramid_levels_and_tiles_match_source(tmp_path):
+    data = make_recording(tmp_path)
+    index = build_pyramid("rec1", data_dir=str(tmp_path))
+
+    levels = index["levels"]
+    assert levels[0]["pings"] == data.shape[0]
+    assert levels[0]["tiles_x"] == 4
+    assert levels[0]["tiles_y"] == 2
+    assert max(levels[-1]["pings"], levels[-1]["samples"]) <= TILE_SIZE
+
+    pyramid = open_pyramid("rec1", data_dir=str(tmp_path))
+    tile = np.frombuffer(pyramid.tile(0, 1, 0), dtype=np.uint8).reshape(TILE_SIZE, TILE_SIZE)
+    assert (tile == data[TILE_SIZE:2 * TILE_SIZE, :TILE_SIZE]).all()
+
+    # Level 1 tile 0 is the max-pool of the top-left 512 x 512 block.
+    top = np.frombuffer(pyramid.tile(1, 0, 0), dtype=np.uint8).reshape(TILE_SIZE, TILE_SIZE)
+    expected = pool_2x2(data[:2 * TILE_SIZE], "max")
+    assert (top[:, :expected.shape[1]] == expected[:TILE_SIZE]).all()
+
+
+def test_rebuild_swaps_pyramid_for_open_readers(tmp_path):
+    make_recording(tmp_path, "rec4", pings=TILE_SIZE * 2, samples=20)
+    build_pyramid("rec4", data_dir=str(tmp_path))
+    before = open_pyramid("rec4", data_dir=str(tmp_path))
+    assert before.index["pooling"] == "max"
+
+    # Rebuilds usually run in a job worker, so the reader only has the files
+    # on disk to notice the swap.
+    build_pyramid("rec4", pooling="mean", data_dir=str(tmp_path))
+    after = open_pyramid("rec4", data_dir=str(tmp_path))
+    assert after is not before and after.index["pooling"] == "mean"
+    assert open_pyramid("rec4", data_dir=str(tmp_path)) is after
+    # A request still holding the old pyramid can finish reading it.
+    assert before.tile(0, 0, 0) == after.tile(0, 0, 0)
+
+    for pooling in ("max", "mean", "max"):
+        build_pyramid("rec4", pooling=pooling, data_dir=str(tmp_path))
+    versions = [name for name in os.listdir(tmp_path) if name.startswith("rec4.pyramid.v")]
+    assert len(versions) == 2
+
+
+def test_pyramid_status_transitions_and_progress(tmp_path):
+    assert pyramid_status("rec2", data_dir=str(tmp_path)) == "missing"
+    make_recording(tmp_path, "rec2", pings=TILE_SIZE * 5, samples=20)
+    assert pyramid_status("rec2", data_dir=str(tmp_path)) == "pending"
+
+    reported = []
+    build_pyramid("rec2", data_dir=str(tmp_path), progress=reported.append)
+    assert pyramid_status("rec2", data_dir=str(tmp_path)) == "ready"
+    assert reported == sorted(reported) and 0 < reported[-1] < 1
+
+
+def test_failed_or_abandoned_build_is_not_building_forever(tmp_path, monkeypatch):
+    make_recording(tmp_path, "rec3", pings=TILE_SIZE * 5, samples=20)
+
+    def cancel(fraction):
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        build_pyramid("rec3", data_dir=str(tmp_path), progress=cancel)
+    assert not os.path.exists(echogram.pyramid_dir("rec3", str(tmp_path)) + ".tmp")
+    assert pyramid_status("rec3", data_dir=str(tmp_path)) == "pending"
+
+    # A builder killed outright leaves its directory behind; once it stops
+    # changing it no longer counts as a build in progress.
+    os.makedirs(echogram.pyramid_dir("rec3", str(tmp_path)) + ".tmp")
+    assert pyramid_status("rec3", data_dir=str(tmp_path)) == "building"
+    monkeypatch.setattr(echogram, "STALE_BUILD_S", 0.0)
+    assert pyramid_status("rec3", data_dir=str(tmp_path)) == "pending"
+
+
+def test_sonar_routes_build_and_serve_tiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(echogram, "SONAR_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "_queue", jobs.JobQueue(str(tmp_path / "jobs.sqlite3"), max_workers=1))
+    jobs._queue.start()
+    data = make_recording(tmp_path, "lake1")
+
+    assert client.get("/sonar/lake1/pyramid").status_code == 404
+
+    resp = client.post("/sonar", json={"video_id": "lake1"})
+    assert resp.json()["pyramid"] == "pending"
+    job = wait_for_job(resp.json()["job_id"])
+    jobs._queue.stop()
+    assert job["status"] == "succeeded", job
+
+    index = client.get("/sonar/lake1/pyramid").json()
+    assert index["tile_size"] == TILE_SIZE
+
+    tile = client.get("/sonar/lake1/tiles/0/0/0", headers={"Accept-Encoding": "identity"})
+    assert tile.status_code == 200
+    assert tile.content == data[:TILE_SIZE, :TILE_SIZE].tobytes()
+
+    deflated = client.get(
+        "/sonar/lake1/tiles/0/0/0",
+        headers={"Accept-Encoding": "deflate"},
+    )
+    assert deflated.content == tile.content
+    assert deflated.headers["content-encoding"] == "deflate"
+    refused = client.get("/sonar/lake1/tiles/0/0/0", headers={"Accept-Encoding": "deflate;q=0, gzip"})
+    assert "content-encoding" not in refused.headers
+    assert refused.content == tile.content
+
+    assert client.get("/sonar/lake1/tiles/0/99/0").status_code == 404
+    assert client.get("/sonar/..%2Fetc/pyramid").status_code == 404
@@ -0,0 +1,156 @@
+# tests/test_gear.py
+
+import json
+
+import numpy as np
+import pytest
+
+from app import gear
+from app.gear import generate_catalog, load_catalog, lure_profile, setup_spec
+from app.pattern_logic import build_pro_setups
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return generate_catalog(rods=800, reels=600, lines=600, seed=1)
+
+
+def brute_force(items, equals, ranges):
+    out = []
+    for i, item in enumerate(items):
+        if all(item[k] in allowed for k, allowed in equals.items()) and all(
+            lo <= item[k] <= hi for k, (lo, hi) in ranges.items()
+        ):
+            out.append(i)
+    return out
+
+
+def test_select_matches_brute_force(catalog):
+    rods = catalog.rods
+    queries = [
+        ({"type": ["casting"], "power": ["medium", "medium-heavy"]}, {"length_in": (80, 88)}),
+        ({"action": ["fast"]}, {"length_in": (70, 90), "line_min_lb": (-np.inf, 12), "line_max_lb": (12, np.inf)}),
+        ({}, {"price": (100, 120)}),
+        ({"type": ["spinning"], "power": ["extra-heavy"]}, {}),
+        ({"type": ["trolling"]}, {}),
+    ]
+    for equals, ranges in queries:
+        got = sorted(rods.select(equals, ranges).tolist())
+        assert got == brute_force(rods.items, equals, ranges)
+
+
+def test_top_k_is_sorted_and_closest(catalog):
+    rows = catalog.reels.select({"type": ["casting"]}, None)
+    best = catalog.reels.top_k(rows, {"gear_ratio": (7.3, 0.5)}, 5)
+    scores = [score for _, score in best]
+    assert scores == sorted(scores)
+    assert all(catalog.reels.items[r]["gear_ratio"] == 7.3 for r, _ in best)
+
+
+def test_lure_profiles_split_moving_baits():
+    assert lure_profile("medium-diving crankbait", "moving") == "cranking"
+    assert lure_profile("squarebill deflected off rock", "moving") == "cranking"
+    assert lure_profile("suspending jerkbait", "moving") == "jerkbait"
+    assert lure_profile("spinnerbait", "moving") == "moving"
+    assert lure_profile("jig", "bottom") == "bottom"
+
+
+def test_spec_adjusts_for_conditions():
+    base = setup_spec("bottom", "mid-depth", "stained", None, 5.0)
+    clear = setup_spec("bottom", "mid-depth", "clear", None, 5.0)
+    grass = setup_spec("bottom", "shallow", "stained", "grass", 5.0)
+    deep_crank = setup_spec("cranking", "offshore", "stained", None, 5.0)
+
+    assert clear["line"][1][2] < base["line"][1][2]
+    assert grass["line"][0] == "braid"
+    assert deep_crank["gear_ratio"][2] < gear.PROFILES["cranking"]["gear_ratio"][2]
+    assert setup_spec("finesse", "mid-depth", "clear", None, 15.0)["length_in"][2] > 84
+    # Specs are copies; profiles are never mutated.
+    assert gear.PROFILES["bottom"]["line"] == ("fluorocarbon", (12, 20, 16))
+
+
+def test_matches_respect_spec(catalog):
+    spec = setup_spec("finesse", "offshore", "clear", "rock", 4.0)
+    setups = catalog.match(spec, k=3)
+    assert len(setups) == 3
+    for s in setups:
+        assert s["rod"]["type"] == s["reel"]["type"] == "spinning"
+        assert s["rod"]["power"] in spec["powers"]
+        assert s["line"]["material"] == "braid"
+        assert s["leader"]["material"] == "fluorocarbon"
+    assert [s["score"] for s in setups] == sorted(s["score"] for s in setups)
+    assert len({s["rod"]["id"] for s in setups}) == 3
+
+
+def test_best_setups_are_memoized(catalog):
+    a = catalog.best_setups("moving", "shallow", "muddy", None, 12.0)
+    b = catalog.best_setups("moving", "shallow", "muddy", None, 15.0)
+    assert a is b
+
+
+def test_pro_setups_use_catalog_gear_per_lure(monkeypatch, catalog):
+    monkeypatch.setattr(gear, "_catalog", catalog)
+    setups = build_pro_setups(
+        lures=["medium-diving crankbait", "spinnerbait"],
+        phase="pre-spawn",
+        depth_zone="mid-depth",
+        clarity="stained",
+        wind_speed=6.0,
+        bottom_composition=None,
+        sky_condition="cloudy",
+    )
+    crank, spinner = setups
+    # Both are "moving" baits but no longer share one template.
+    assert crank["rod"] != spinner["rod"]
+    assert "moderate" in crank["rod"]
+    assert len(crank["alternatives"]) == 2
+
+
+def test_empty_catalog_falls_back_to_templates(monkeypatch, tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"rods": [], "reels": [], "lines": []}))
+    monkeypatch.setattr(gear, "_catalog", load_catalog(str(path)))
+
+    (setup,) = build_pro_setups(["jig"], "summer", "offshore", "clear", 5.0, None, "sunny")
+    assert setup["rod"] == "7'1\"–7'3\" medium-heavy casting rod, fast action"
+    assert "alternatives" not in setup
+
+
+def test_memo_is_bounded_by_spec_space(catalog):
+    for i in range(200):
+        catalog.best_setups("bottom", "shallow", ("clear", " CLEAR ", "Clear")[i % 3], f"chunk rock #{i}", 5.0)
+        catalog.best_setups("bottom", "shallow", "stained", f"mud {i}", 5.0)
+    keys = [k for k in catalog._memo if k[:2] == ("bottom", "shallow")]
+    assert len(keys) == 2
+
+
+def test_no_configured_catalog_keeps_templates(monkeypatch):
+    monkeypatch.setattr(gear, "GEAR_CATALOG_PATH", None)
+    monkeypatch.setattr(gear, "_catalog", None)
+    assert gear.get_catalog() is None
+
+    (setup,) = build_pro_setups(["jig"], "summer", "offshore", "clear", 5.0, None, "sunny")
+    assert setup["rod"] == "7'1\"–7'3\" medium-heavy casting rod, fast action"
+    assert "alternatives" not in setup
+
+
+def test_unreadable_catalog_falls_back_and_is_reported(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    path = tmp_path / "catalog.json"
+    path.write_text('{"rods": [')
+    monkeypatch.setattr(gear, "GEAR_CATALOG_PATH", str(path))
+    monkeypatch.setattr(gear, "_catalog", None)
+    monkeypatch.setattr(gear, "_catalog_failed_path", None)
+    monkeypatch.setattr(gear, "_catalog_error", None)
+
+    (setup,) = build_pro_setups(["jig"], "summer", "offshore", "clear", 5.0, None, "sunny")
+    assert setup["rod"] == "7'1\"–7'3\" medium-heavy casting rod, fast action"
+    assert "alternatives" not in setup
+
+    client = TestClient(app)
+    body = {"temp_f": 58.0, "month": 3, "clarity": "muddy", "wind_speed": 12.0, "sky_condition": "cloudy"}
+    assert client.post("/pattern/pro", json=body).status_code == 200
+    status = client.get("/metrics").json()["gear_catalog"]
+    assert not status["loaded"] and status["error"]
@@ -0,0 +1,136 @@
+# tests/test_history.py
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import history, main
+from app.history import HistoryRecorder
+from app.main import app
+
+client = TestClient(app)
+
+PRO_BODY = {
+    "temp_f": 64.0,
+    "month": 5,
+    "clarity": "stained",
+    "wind_speed": 8.0,
+    "sky_condition": "cloudy",
+    "depth_ft": 6.0,
+    "bottom_composition": "rock",
+}
+
+
+@pytest.fixture
+def recorder(tmp_path, monkeypatch):
+    rec = HistoryRecorder(str(tmp_path / "history.sqlite3"), capacity=100, flush_interval=60.0)
+    monkeypatch.setattr(history, "_history", rec)
+    yield rec
+    rec.stop()
+
+
+def test_record_is_invisible_until_flushed(recorder):
+    recorder.record("basic", {"temp_f": 55.0, "month": 3, "clarity": "clear"}, "W/\"k1\"")
+    assert recorder.query() == []
+
+    assert recorder.flush() == 1
+    rows = recorder.query()
+    assert rows[0]["tier"] == "basic"
+    assert rows[0]["conditions"] == {"temp_f": 55.0, "month": 3, "clarity": "clear"}
+    assert rows[0]["result_key"] == "W/\"k1\""
+    assert recorder.snapshot()["flushed"] == 1
+
+
+def test_query_filters_by_time_and_condition(recorder):
+    recorder.record("pro", {"month": 4, "clarity": "muddy"}, "a")
+    recorder.record("pro", {"month": 4, "clarity": "clear"}, "b")
+    recorder.flush()
+    mid = time.time()
+    time.sleep(0.01)
+    recorder.record("basic", {"month": 4, "clarity": "muddy"}, "c")
+    recorder.record("pro", {"month": 9, "clarity": "muddy"}, "d")
+    recorder.flush()
+
+    keys = lambda rows: sorted(r["result_key"] for r in rows)
+    assert keys(recorder.query(clarity="muddy")) == ["a", "c", "d"]
+    assert keys(recorder.query(clarity="muddy", month=4)) == ["a", "c"]
+    assert keys(recorder.query(since=mid)) == ["c", "d"]
+    assert keys(recorder.query(until=mid, tier="pro")) == ["a", "b"]
+    assert len(recorder.query(limit=2)) == 2
+
+    with pytest.raises(ValueError):
+        recorder.query(phase="summer")
+
+
+def test_text_conditions_are_stored_normalized(recorder):
+    recorder.record("pro", {"clarity": " Muddy ", "sky_condition": "CLOUDY", "bottom_composition": "Rock "}, "a")
+    recorder.record("pro", {"clarity": "muddy", "sky_condition": "cloudy"}, "b")
+    recorder.flush()
+
+    rows = recorder.query(clarity="MUDDY")
+    assert sorted(r["result_key"] for r in rows) == ["a", "b"]
+    assert rows[-1]["conditions"] == {"clarity": "muddy", "sky_condition": "cloudy", "bottom_composition": "rock"}
+
+
+def test_full_queue_drops_and_counts(recorder):
+    for i in range(150):
+        recorder.record("basic", {"month": 1}, str(i))
+
+    stats = recorder.snapshot()
+    assert stats["pending"] == 100
+    assert stats["recorded"] == 100
+    assert stats["dropped"] == 50
+
+    recorder.flush()
+    assert recorder.snapshot()["pending"] == 0
+    assert recorder.record("basic", {"month": 1}, "again")
+
+
+def test_disabled_recorder_records_nothing(recorder):
+    recorder.enabled = False
+    assert not recorder.record("basic", {"month": 1}, "x")
+    assert recorder.snapshot()["pending"] == 0
+
+
+def test_background_flusher_writes_batches(tmp_path):
+    rec = HistoryRecorder(str(tmp_path / "h.sqlite3"), batch_size=10, flush_interval=0.05)
+    rec.start()
+    try:
+        for i in range(35):
+            rec.record("pro", {"month": 6}, str(i))
+        deadline = time.monotonic() + 5.0
+        while rec.snapshot()["flushed"] < 35 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert rec.snapshot()["flushed"] == 35
+        assert rec.snapshot()["batches"] >= 4
+    finally:
+        rec.stop()
+
+
+def test_disabled_recorder_opens_nothing(tmp_path):
+    rec = HistoryRecorder(str(tmp_path / "off" / "h.sqlite3"), enabled=False)
+    rec.start()
+    assert rec._thread is None
+    assert not (tmp_path / "off").exists()
+    assert rec.query() == [] and rec.flush() == 0
+    rec.stop()
+
+
+def test_pattern_routes_are_recorded_and_queryable(recorder, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    resp = client.post("/pattern/pro", json=PRO_BODY)
+    assert resp.status_code == 200
+    again = client.get("/pattern/pro", params=PRO_BODY, headers={"If-None-Match": resp.headers["etag"]})
+    assert again.status_code == 304
+    recorder.flush()
+
+    params = {"tier": "pro", "clarity": "stained", "month": 5}
+    assert client.get("/history", params=params).status_code == 403
+    body = client.get("/history", params=params, headers={"X-Admin-Token": "s3cret"}).json()
+    assert body["count"] == 2
+    assert {r["status"] for r in body["records"]} == {200, 304}
+    assert all(r["result_key"] == resp.headers["etag"] for r in body["records"])
+    assert body["records"][0]["conditions"]["bottom_composition"] == "rock"
+
+    assert client.get("/metrics").json()["history"]["flushed"] == 2
@@ -0,0 +1,161 @@
+# tests/test_http_cache.py
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app import gear, lures
+from app.http_cache import (
+    CACHE_CONTROL,
+    STOCK_CACHE_CONTROL,
+    canonical_query,
+    choose_encoding,
+    condition_key,
+    etag_matches,
+    make_etag,
+    result_cache,
+)
+from app.lures import LureIndex, generate_skus
+from app.main import app
+
+client = TestClient(app)
+
+PRO_PAYLOAD = {
+    "temp_f": 55.0,
+    "month": 3,
+    "clarity": "stained",
+    "wind_speed": 8.0,
+    "sky_condition": "cloudy",
+    "depth_ft": 10.0,
+    "bottom_composition": "rock",
+}
+
+
+def test_canonical_query_drops_none_and_normalizes_numbers():
+    q1 = canonical_query({"temp_f": 55, "month": 3, "depth_ft": None})
+    q2 = canonical_query({"temp_f": 55.0, "month": 3})
+
+    assert q1 == "temp_f=55&month=3"
+    assert q2 == "temp_f=55.0&month=3"
+    assert canonical_query({"temp_f": 55.00}) == q2.split("&")[0]
+    assert condition_key("pro", {"temp_f": 55.0}) != condition_key("basic", {"temp_f": 55.0})
+
+
+def test_etag_is_deterministic_and_weakly_compared():
+    etag = make_etag("pro?temp_f=55.0")
+
+    assert etag == make_etag("pro?temp_f=55.0")
+    assert etag != make_etag("pro?temp_f=56.0")
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)
+    assert etag_matches(f'"nope", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"nope"', etag)
+
+
+def test_choose_encoding_respects_q_values():
+    assert choose_encoding(None) == "identity"
+    assert choose_encoding("gzip;q=0") == "identity"
+    assert choose_encoding("deflate, gzip") in ("gzip", "br")
+
+
+def test_pattern_pro_sets_cache_headers_and_honors_if_none_match():
+    resp = client.post("/pattern/pro", json=PRO_PAYLOAD)
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "max-age" in resp.headers["cache-control"]
+    assert "Accept-Encoding" in resp.headers["vary"]
+
+    again = client.get("/pattern/pro", params=PRO_PAYLOAD, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_post_with_matching_etag_still_gets_a_body():
+    etag = client.post("/pattern/pro", json=PRO_PAYLOAD).headers["etag"]
+
+    again = client.post("/pattern/pro", json=PRO_PAYLOAD, headers={"If-None-Match": etag})
+    assert again.status_code == 200
+    assert again.json()["phase"]
+    assert again.headers["etag"] == etag
+
+
+def test_pattern_get_matches_post_and_shares_etag():
+    post = client.post("/pattern/pro", json=PRO_PAYLOAD)
+    get = client.get("/pattern/pro", params=PRO_PAYLOAD)
+
+    assert get.status_code == 200, get.json()
+    assert get.json() == post.json()
+    assert get.headers["etag"] == post.headers["etag"]
+    assert get.headers["content-location"].startswith("/pattern/pro?temp_f=55.0&month=3")
+    as_int = client.get("/pattern/pro", params={**PRO_PAYLOAD, "temp_f": 55})
+    assert as_int.headers["etag"] == post.headers["etag"]
+
+    basic = client.get(
+        "/pattern/basic",
+        params={"temp_f": 55, "month": 3, "clarity": "stained", "wind_speed": 8},
+    )
+    assert basic.status_code == 200
+    assert "recommended_techniques" in basic.json()
+
+
+def test_compressed_body_is_built_once_and_reused():
+    result_cache.clear()
+    headers = {"Accept-Encoding": "gzip"}
+
+    first = client.post("/pattern/pro", json=PRO_PAYLOAD, headers=headers)
+    second = client.post("/pattern/pro", json=PRO_PAYLOAD, headers=headers)
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.json() == second.json()
+    assert result_cache.stats["misses"] == 1
+    assert result_cache.stats["hits"] == 1
+    assert result_cache.stats["bytes_sent"] < result_cache.stats["bytes_identity"]
+
+
+def test_inventory_changes_etag_and_shortens_max_age(tmp_path, monkeypatch):
+    result_cache.clear()
+    before = client.post("/pattern/pro", json=PRO_PAYLOAD)
+    assert before.headers["cache-control"] == CACHE_CONTROL
+    assert before.json()["recommended_baits"] == []
+
+    path = str(tmp_path / "lures.npz")
+    LureIndex.build(generate_skus(per_color=2, seed=5)).save(path)
+    monkeypatch.setattr(lures, "LURE_INDEX_PATH", path)
+    monkeypatch.setattr(lures, "_index", None)
+
+    # The old tag no longer validates and the cached body is rebuilt.
+    after = client.post("/pattern/pro", json=PRO_PAYLOAD, headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.headers["cache-control"] == STOCK_CACHE_CONTROL
+    assert after.json()["recommended_baits"]
+
+    basic = client.get("/pattern/basic", params={"temp_f": 55, "month": 3, "clarity": "stained", "wind_speed": 8})
+    assert basic.headers["cache-control"] == CACHE_CONTROL
+
+
+def test_etag_tracks_the_loaded_catalog_not_the_file(tmp_path, monkeypatch):
+    def write(path, seed):
+        catalog = gear.generate_catalog(rods=300, reels=200, lines=200, seed=seed)
+        path.write_text(json.dumps({"rods": catalog.rods.items, "reels": catalog.reels.items, "lines": catalog.lines.items}))
+
+    path = tmp_path / "catalog.json"
+    write(path, 1)
+    monkeypatch.setattr(gear, "GEAR_CATALOG_PATH", str(path))
+    monkeypatch.setattr(gear, "_catalog", None)
+    first = client.get("/pattern/pro", params=PRO_PAYLOAD)
+
+    # The process keeps serving the catalog it loaded, so the validator
+    # must not change just because the file did.
+    write(path, 2)
+    second = client.get("/pattern/pro", params=PRO_PAYLOAD)
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.json() == first.json()
+
+    monkeypatch.setattr(gear, "_catalog", None)
+    reloaded = client.get("/pattern/pro", params=PRO_PAYLOAD)
+    assert reloaded.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,135 @@
+# tests/test_jobs.py
+
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import jobs, regional
+from app.jobs import FINAL_STATES, JobQueue, validate_params
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    q = JobQueue(str(tmp_path / "jobs.sqlite3"), max_workers=1)
+    monkeypatch.setattr(jobs, "_queue", q)
+    yield q
+    q.stop()
+
+
+def wait(queue, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in FINAL_STATES:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def make_raster(tmp_path, raster_id="lake"):
+    temps = np.full((16, 16), 65.0, dtype=np.float32)
+    np.savez(tmp_path / f"{raster_id}.npz", temps=temps, bounds=np.array([-90.0, 30.0, -89.0, 31.0]))
+
+
+def test_validate_params_rejects_unknown_and_missing():
+    validate_params("sonar_pyramid", {"recording_id": "abc", "pooling": "mean"})
+    with pytest.raises(ValueError):
+        validate_params("nope", {})
+    with pytest.raises(ValueError):
+        validate_params("sonar_pyramid", {})
+    with pytest.raises(ValueError):
+        validate_params("sonar_pyramid", {"recording_id": "abc", "data_dir": "/etc"})
+
+
+def test_queue_claims_by_priority_then_age(queue):
+    low = queue.submit("regional_precompute", {"raster_id": "a"}, priority="low")
+    normal = queue.submit("regional_precompute", {"raster_id": "b"})
+    high = queue.submit("regional_precompute", {"raster_id": "c"}, priority="high")
+
+    claimed = [queue._claim_next()["id"] for _ in range(3)]
+    assert claimed == [high["job_id"], normal["job_id"], low["job_id"]]
+    assert queue._claim_next() is None
+
+
+def test_cancel_queued_job_and_dedupe(queue):
+    first = queue.submit("regional_precompute", {"raster_id": "a"}, dedupe_key="k")
+    again = queue.submit("regional_precompute", {"raster_id": "a"}, dedupe_key="k")
+    assert again["job_id"] == first["job_id"]
+
+    cancelled = queue.cancel(first["job_id"])
+    assert cancelled["status"] == "cancelled"
+    assert queue.submit("regional_precompute", {"raster_id": "a"}, dedupe_key="k")["job_id"] != first["job_id"]
+
+
+def test_claim_is_atomic_across_queues(tmp_path):
+    db = str(tmp_path / "jobs.sqlite3")
+    q1, q2 = JobQueue(db, max_workers=1), JobQueue(db, max_workers=1)
+    job = q1.submit("regional_precompute", {"raster_id": "a"})
+
+    claimed = q1._claim_next()
+    assert claimed["id"] == job["job_id"] and claimed["owner"] == q1.owner
+    assert q2._claim_next() is None
+
+
+def test_only_jobs_of_a_dead_owner_are_requeued(tmp_path):
+    db = str(tmp_path / "jobs.sqlite3")
+    make_raster(tmp_path)
+    q1 = JobQueue(db, max_workers=1)
+    live = q1.submit("regional_precompute", {"raster_id": "lake", "data_dir": str(tmp_path)})
+    dead = q1.submit("regional_precompute", {"raster_id": "lake", "data_dir": str(tmp_path)})
+    q1._claim_next()
+    q1._claim_next()
+    # The owner of `dead` stopped heartbeating a while ago.
+    q1._conn.execute(
+        "UPDATE jobs SET heartbeat_at = ? WHERE id = ?",
+        (time.time() - jobs.HEARTBEAT_TIMEOUT_S - 1, dead["job_id"]),
+    )
+
+    q2 = JobQueue(db, max_workers=1)
+    q2.start()
+    try:
+        assert wait(q2, dead["job_id"])["status"] == "succeeded"
+        assert q2.get(live["job_id"])["status"] == "running"
+    finally:
+        q2.stop()
+
+
+def test_stop_does_not_hang_with_all_slots_busy(queue):
+    queue._slots.acquire()
+    queue.start()
+    start = time.monotonic()
+    queue.stop()
+    assert time.monotonic() - start < 5.0
+
+
+def test_precompute_job_runs_in_worker_and_reports_progress(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(regional, "RASTER_DATA_DIR", str(tmp_path))
+    make_raster(tmp_path)
+    queue.start()
+
+    resp = client.post("/regional/lake/precompute")
+    assert resp.status_code == 202
+    job = wait(queue, resp.json()["job_id"])
+
+    assert job["status"] == "succeeded", job
+    assert job["progress"] == 1.0
+    assert regional.load_phase_grid("lake", 7, str(tmp_path)) is not None
+
+    events = client.get(f"/jobs/{job['job_id']}/events")
+    assert events.headers["content-type"].startswith("text/event-stream")
+    assert '"status": "succeeded"' in events.text
+
+
+def test_job_routes_validate_and_404(queue):
+    assert client.post("/jobs", json={"kind": "nope"}).status_code == 400
+    assert client.get("/jobs/does-not-exist").status_code == 404
+    assert client.delete("/jobs/does-not-exist").status_code == 404
+
+    resp = client.post("/jobs", json={"kind": "sonar_pyramid", "params": {"recording_id": "x"}})
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "queued"
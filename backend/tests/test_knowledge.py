@@ -0,0 +1,106 @@
+# tests/test_knowledge.py
+
+from fastapi.testclient import TestClient
+
+from app import gear, http_cache, knowledge
+from app.knowledge import BM25Index, build_default_index, file_documents, knowledge_sources, tokenize
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("What do I throw on the wind-blown banks?") == ["throw", "wind", "blown", "bank"]
+    assert tokenize("grass") == ["grass"]
+
+
+def test_bm25_ranks_matching_document_first():
+    index = BM25Index.build([
+        {"text": "slow roll a spinnerbait along riprap", "source": "a"},
+        {"text": "dropshot on offshore humps", "source": "b"},
+        {"text": "riprap riprap and chunk rock banks", "source": "c"},
+    ])
+
+    results = index.search("riprap banks", k=2)
+    assert [r["source"] for r in results] == ["c", "a"]
+    assert results[0]["score"] > results[1]["score"]
+    assert index.search("nothing matches this") == []
+
+
+def test_engine_corpus_answers_riprap_in_muddy_water():
+    index = build_default_index(knowledge_dir="/nonexistent")
+    texts = " ".join(r["text"] for r in index.search("what do I throw on riprap in muddy water", k=3))
+
+    assert "riprap" in texts
+    assert "muddy" in texts.lower()
+
+
+def test_saved_index_loads_by_mmap_with_same_results(tmp_path):
+    index = build_default_index(knowledge_dir="/nonexistent")
+    path = str(tmp_path / "kb.idx")
+    index.save(path)
+    loaded = BM25Index.load(path)
+
+    assert loaded.n_docs == index.n_docs
+    for query in ("dropshot offshore", "clear sunny colors", "grass edges"):
+        assert loaded.search(query) == index.search(query)
+
+
+def test_file_documents_split_paragraphs(tmp_path):
+    (tmp_path / "notes.md").write_text("Skip jigs under docks.\n\nFish the shade line at noon.\n")
+    (tmp_path / "ignored.csv").write_text("a,b\n")
+
+    docs = file_documents(str(tmp_path))
+    assert [d["text"] for d in docs] == ["Skip jigs under docks.", "Fish the shade line at noon."]
+    assert docs[0]["source"] == "file:notes.md"
+
+
+def test_chat_returns_retrieved_answers():
+    resp = client.post("/chat", json={"message": "colors for clear sunny water"})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert body["message"].startswith("SAGE received:")
+    assert len(body["answers"]) > 0
+    assert "clear" in body["answers"][0]["text"].lower()
+
+
+def test_stale_prebuilt_index_is_rebuilt(tmp_path, monkeypatch):
+    kdir = tmp_path / "knowledge"
+    kdir.mkdir()
+    (kdir / "notes.md").write_text("Skip jigs under docks.\n")
+    path = str(tmp_path / "kb.idx")
+    build_default_index(str(kdir)).save(path)
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_DIR", str(kdir))
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_INDEX_PATH", path)
+    assert BM25Index.load(path, sources=knowledge_sources()).n_docs > 0
+
+    def fresh_index():
+        monkeypatch.setattr(knowledge, "_index", None)
+        monkeypatch.setattr(knowledge, "_index_error", None)
+        return knowledge.get_index()
+
+    assert fresh_index()._mm is not None
+    assert knowledge.index_status()["loaded"]
+
+    (kdir / "notes.md").write_text("Skip jigs under docks.\n\nFlip laydowns.\n")
+    index = fresh_index()
+    assert index._mm is None and "knowledge_files" in knowledge.index_status()["error"]
+    assert index.search("laydowns")
+
+    monkeypatch.setattr(http_cache, "ENGINE_VERSION", "stale-test")
+    fresh_index()
+    assert "engine_version" in knowledge.index_status()["error"]
+
+    build_default_index(str(kdir)).save(path)
+    assert fresh_index()._mm is not None
+    monkeypatch.setattr(gear, "catalog_digest", lambda: "other-catalog")
+    fresh_index()
+    assert "gear_catalog" in knowledge.index_status()["error"]
+
+
+def test_index_is_built_at_startup(monkeypatch):
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_INDEX_PATH", None)
+    monkeypatch.setattr(knowledge, "_index", None)
+    with TestClient(app):
+        assert knowledge._index is not None
@@ -0,0 +1,36 @@
+# tests/test_loadtest.py
+
+from bench.loadtest import find_saturation, percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 99) == 0.0
+
+
+def test_summarize_counts_errors_shed_and_throughput():
+    samples = [(0.010, 200), (0.020, 200), (0.500, 0), (0.030, 200), (0.001, 503)]
+    summary = summarize(samples, offered_rps=4.0, elapsed=1.0)
+
+    assert summary["sent"] == 5
+    assert summary["ok"] == 3
+    assert summary["shed"] == 1
+    assert summary["errors"] == 1
+    assert summary["achieved_rps"] == 3.0
+    assert summary["max_ms"] == 30.0
+
+
+def test_find_saturation_returns_first_unhealthy_step():
+    healthy = {"offered_rps": 100.0, "achieved_rps": 99.0, "errors": 0, "p99_ms": 20.0}
+    shedding = dict(healthy, offered_rps=150.0, shed=3)
+    slow = {"offered_rps": 200.0, "achieved_rps": 198.0, "errors": 0, "p99_ms": 900.0}
+    behind = {"offered_rps": 400.0, "achieved_rps": 150.0, "errors": 0, "p99_ms": 20.0}
+
+    assert find_saturation([healthy]) is None
+    assert find_saturation([healthy, slow, behind]) == 200.0
+    assert find_saturation([healthy, behind]) == 400.0
+    assert find_saturation([healthy, shedding]) == 150.0
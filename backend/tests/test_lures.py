@@ -0,0 +1,137 @@
+# tests/test_lures.py
+
+import json
+
+import numpy as np
+import pytest
+
+from app import lures
+from app.lures import (
+    COLORS,
+    KDTree,
+    LureIndex,
+    generate_skus,
+    lure_family,
+    named_colors,
+    srgb_to_lab,
+    target_palette,
+)
+from app.pattern_logic import build_pattern_summary
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LureIndex.build(generate_skus(per_color=12, seed=3))
+
+
+def test_srgb_to_lab_reference_points():
+    white, black, red = srgb_to_lab([(255, 255, 255), (0, 0, 0), (255, 0, 0)])
+    assert np.allclose(white, [100.0, 0.0, 0.0], atol=0.05)
+    assert np.allclose(black, [0.0, 0.0, 0.0], atol=0.05)
+    assert np.allclose(red, [53.24, 80.09, 67.20], atol=0.05)
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-50, 50, (500, 3))
+    tree = KDTree.build(points, leaf_size=8)
+    for q in rng.uniform(-60, 60, (100, 3)):
+        dists = np.sqrt(((points - q) ** 2).sum(axis=1))
+        got = tree.query(q, k=4)
+        assert [i for _, i in got] == np.argsort(dists)[:4].tolist()
+        assert np.allclose([d for d, _ in got], np.sort(dists)[:4])
+
+
+def test_lure_text_maps_to_family_and_colors():
+    assert lure_family("swim jig over grass") == "swim jig"
+    assert lure_family("jig dragged on rock") == "jig"
+    assert lure_family("lipless crankbait ticking bottom") == "lipless crankbait"
+    assert lure_family("carolina rig") == "lizard"
+    assert lure_family("topwater frog") is None
+    assert named_colors("black/blue jig") == ["black/blue"]
+    assert named_colors("spinnerbait") == []
+
+
+def test_baits_are_in_stock_and_follow_the_palette(index):
+    palette = target_palette("stained", "cloudy")
+    baits = index.baits_for("medium-diving crankbait", palette)
+    assert [b["target"] for b in baits] == palette
+    for bait in baits:
+        assert bait["stock"] > 0
+        assert bait["color"] == bait["target"]
+        assert "crankbait" in bait["name"]
+    assert len({b["sku"] for b in baits}) == len(baits)
+
+
+def test_colors_named_in_the_lure_come_first(index):
+    baits = index.baits_for("black/blue jig", target_palette("clear", "sunny"))
+    assert baits[0]["target"] == "black/blue"
+    assert baits[0]["color"] == "black/blue"
+
+
+def test_snapshot_round_trip(index, tmp_path):
+    path = str(tmp_path / "lures.npz")
+    index.save(path)
+    loaded = LureIndex.load(path)
+
+    assert len(loaded) == len(index)
+    palette = target_palette("muddy", "sunny")
+    for lure in ("chatterbait", "texas-rigged creature bait", "finesse worm on light line"):
+        assert loaded.baits_for(lure, palette) == index.baits_for(lure, palette)
+
+
+def test_snapshot_version_is_checked(index, tmp_path, monkeypatch):
+    path = str(tmp_path / "lures.npz")
+    index.save(path)
+    monkeypatch.setattr(lures, "LURE_INDEX_VERSION", lures.LURE_INDEX_VERSION + 1)
+    with pytest.raises(ValueError):
+        LureIndex.load(path)
+
+
+def test_summary_includes_concrete_baits(monkeypatch, index):
+    monkeypatch.setattr(lures, "_index", index)
+    summary = build_pattern_summary(58.0, 3, "muddy", 12.0, "cloudy", 6.0, "rock")
+    by_lure = {entry["lure"]: entry["baits"] for entry in summary["recommended_baits"]}
+    assert set(by_lure) <= set(summary["recommended_lures"])
+    assert by_lure["chatterbait"][0]["color"] in COLORS
+    assert by_lure["chatterbait"][0]["target"] == "black"
+
+
+def test_no_configured_inventory_recommends_no_baits(monkeypatch):
+    monkeypatch.setattr(lures, "LURE_INDEX_PATH", None)
+    monkeypatch.setattr(lures, "_index", None)
+    summary = build_pattern_summary(58.0, 3, "muddy", 12.0, "cloudy", 6.0, "rock")
+    assert summary["recommended_baits"] == []
+    assert lures._index is None
+
+
+def test_index_builds_from_inventory_json(tmp_path, monkeypatch):
+    inventory = tmp_path / "inventory.json"
+    inventory.write_text(json.dumps(generate_skus(per_color=2, seed=1)))
+    path = str(tmp_path / "lures.npz")
+    LureIndex.build(lures.load_skus(str(inventory))).save(path)
+
+    monkeypatch.setattr(lures, "LURE_INDEX_PATH", path)
+    monkeypatch.setattr(lures, "_index", None)
+    assert len(lures.get_lure_index()) == len(generate_skus(per_color=2, seed=1))
+
+
+def test_unusable_index_file_falls_back_and_is_reported(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    bad = tmp_path / "lures.npz"
+    bad.write_bytes(b"not an index")
+    monkeypatch.setattr(lures, "LURE_INDEX_PATH", str(bad))
+    monkeypatch.setattr(lures, "_index", None)
+    monkeypatch.setattr(lures, "_index_failed_path", None)
+    monkeypatch.setattr(lures, "_index_error", None)
+
+    client = TestClient(app)
+    body = {"temp_f": 58.0, "month": 3, "clarity": "muddy", "wind_speed": 12.0, "sky_condition": "cloudy"}
+    for _ in range(2):
+        resp = client.post("/pattern/pro", json=body)
+        assert resp.status_code == 200
+        assert resp.json()["recommended_baits"] == []
+    status = client.get("/metrics").json()["lure_index"]
+    assert not status["loaded"] and status["error"]
@@ -0,0 +1,117 @@
+# tests/test_phase_model.py
+
+import numpy as np
+
+from app import phase_model
+from app.pattern_logic import build_pattern_summary, classify_phase
+from app.phase_model import (
+    PHASES,
+    classify_phase_array,
+    classify_phase_index,
+    mid_month_doy,
+    phase_thresholds,
+    reference_thresholds,
+)
+
+
+def test_grid_lookup_matches_reference_model():
+    rng = np.random.default_rng(0)
+    for lat, doy in zip(rng.uniform(20, 55, 200), rng.uniform(1, 365, 200)):
+        got = phase_thresholds(float(lat), float(doy))
+        want = reference_thresholds(float(lat), float(doy))
+        # Bilinear on a 2.5° x 7-day grid; the model bends at a few days
+        # (trough, equinoxes, peak), so allow a small interpolation error.
+        assert max(abs(g - w) for g, w in zip(got, want)) < 1.5
+
+
+def test_grid_lookup_is_exact_on_nodes():
+    got = phase_thresholds(35.0, 140.0)
+    assert got == reference_thresholds(35.0, 140.0)
+
+
+def test_northern_lakes_reach_each_phase_at_cooler_water():
+    assert classify_phase(58.5, 4, latitude=27.0) == "pre-spawn"
+    assert classify_phase(58.5, 4, latitude=47.0) == "spawn/post-spawn"
+
+
+def test_same_temperature_is_spawn_in_spring_and_fall_in_autumn():
+    assert classify_phase(66.0, 5) == "spawn/post-spawn"
+    assert classify_phase(66.0, 10) == "fall"
+
+
+def test_month_only_baseline_outside_the_autumn_shift():
+    # Winter cooling and just past the summer peak: warm water is summer.
+    assert classify_phase(80.0, 1) == "summer"
+    assert classify_phase(74.0, 8) == "summer"
+    assert classify_phase(60.0, 1) == "fall"
+    assert classify_phase(45.0, 1) == "winter"
+    # Around the equinox shortening days still call warm water fall, and
+    # the shift has faded by December.
+    assert classify_phase(80.0, 9) == "fall"
+    assert classify_phase(80.0, 12) == "summer"
+
+
+def test_temp_trend_overrides_calendar_season():
+    # Early September: calendar says the lake is cooling.
+    assert classify_phase(66.0, 9, day_of_year=250) == "fall"
+    assert classify_phase(66.0, 9, day_of_year=250, temp_trend=1.0) == "spawn/post-spawn"
+    # A weak trend leaves the calendar in charge.
+    assert classify_phase(66.0, 9, day_of_year=250, temp_trend=0.2) == "fall"
+
+
+def test_southern_hemisphere_is_shifted_half_a_year():
+    north = classify_phase(66.0, 10, latitude=35.0, day_of_year=mid_month_doy(10))
+    south = classify_phase(66.0, 4, latitude=-35.0, day_of_year=mid_month_doy(4))
+    assert north == south == "fall"
+
+
+def test_array_matches_scalar():
+    temps = np.arange(35.0, 95.0, 0.5)
+    for lat in (22.0, 34.3, 47.9, -33.0):
+        for doy in (10, 60, 100, 180, 230, 300, 350):
+            arr = classify_phase_array(temps, doy, lat)
+            scalar = [classify_phase_index(float(t), 1, latitude=lat, day_of_year=doy) for t in temps]
+            assert arr.tolist() == scalar
+
+    trend = np.where(np.arange(len(temps)) % 2 == 0, 1.0, -1.0)
+    arr = classify_phase_array(temps, 250, 35.0, trend)
+    scalar = [
+        classify_phase_index(float(t), 9, latitude=35.0, day_of_year=250, temp_trend=float(tr))
+        for t, tr in zip(temps, trend)
+    ]
+    assert arr.tolist() == scalar
+
+
+def test_season_cache_is_bounded_and_transparent(monkeypatch):
+    monkeypatch.setattr(phase_model, "SEASON_CACHE_SIZE", 16)
+    monkeypatch.setattr(phase_model, "_SEASONS", {})
+    temps = np.arange(35.0, 95.0, 0.5)
+    for lat in np.linspace(-40.0, 50.0, 40):
+        want = classify_phase_array(temps, 130, float(lat)).tolist()
+        # First call fills the cache, the rest read it.
+        for _ in range(2):
+            got = [classify_phase_index(float(t), 5, latitude=float(lat), day_of_year=130) for t in temps]
+            assert got == want
+        assert len(phase_model._SEASONS) <= 16
+
+
+def test_array_marks_missing_temperatures():
+    out = classify_phase_array(np.array([np.nan, 60.0]), 120)
+    assert out[0] == -1
+    assert PHASES[out[1]] in PHASES
+
+
+def test_summary_reports_location_inputs():
+    summary = build_pattern_summary(
+        temp_f=66.0,
+        month=9,
+        clarity="clear",
+        wind_speed=5.0,
+        sky_condition="sunny",
+        latitude=44.0,
+        day_of_year=255,
+        temp_trend=-0.8,
+    )
+    assert summary["phase"] == "fall"
+    assert summary["conditions"]["latitude"] == 44.0
+    assert summary["conditions"]["temp_trend"] == -0.8
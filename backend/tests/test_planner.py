@@ -0,0 +1,125 @@
+# tests/test_planner.py
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.planner import ScoreTable, fishing_days, keywords, plan_trip, solve
+
+client = TestClient(app)
+
+LAUNCH = (36.0, -86.0)
+
+
+def brute_force(scores, travel, days):
+    launch = scores.shape[0]
+    scores = np.vstack([scores, np.zeros((1, scores.shape[1]))])
+    whole = np.floor(travel).astype(int)
+    fished = 1.0 - (travel - whole)
+
+    def best(node, c, hours):
+        if c == len(hours):
+            return 0.0
+        options = [scores[node, hours[c]] + best(node, c + 1, hours)]
+        for j in range(len(scores)):
+            arrive = c + whole[node, j]
+            if j != node and arrive < len(hours):
+                options.append(fished[node, j] * scores[j, hours[arrive]] + best(j, arrive + 1, hours))
+        return max(options)
+
+    return sum(best(launch, 0, hours) for hours in days)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_solve_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(0, 2, (4, 12)) * (rng.random((4, 12)) < 0.7)
+    travel = rng.uniform(0, 2.5, (5, 5))
+    travel = (travel + travel.T) / 2
+    np.fill_diagonal(travel, 0)
+    days = [[0, 1, 2, 3, 4], [7, 8, 9, 10, 11]]
+
+    total, plan = solve(scores, travel, days)
+    assert total == pytest.approx(brute_force(scores, travel, days))
+    # The returned steps add up to the reported total.
+    replay = sum(f * scores[n, h] for steps in plan for n, h, f in steps if n < 4)
+    assert replay == pytest.approx(total)
+
+
+def test_fishing_days_split_on_window():
+    days = fishing_days(48, start_hour=4, window=(6, 9))
+    assert days == [[2, 3, 4], [26, 27, 28]]
+
+
+def test_keywords_match_plurals():
+    assert keywords("Secondary points near spawning flats") == {"point", "flat"}
+    assert keywords("riprap") == {"riprap"}
+
+
+def wp(id, lat, lon, features, **extra):
+    return {"id": id, "lat": lat, "lon": lon, "features": features, **extra}
+
+
+def hours(n, **values):
+    base = {"temp_f": 55.0, "wind_speed": 6.0, "wind_dir_deg": 180.0, "sky_condition": "cloudy"}
+    return [{**base, **values} for _ in range(n)]
+
+
+def test_wind_blown_bank_scores_higher_when_windy():
+    # March, 55°F: pre-spawn points; wind-blown banks get their own target.
+    waypoints = [
+        wp("facing", 36.0, -86.0, ["point", "bank"], facing_deg=180.0),
+        wp("sheltered", 36.0, -86.0, ["point", "bank"], facing_deg=0.0),
+    ]
+    calm = ScoreTable(waypoints, hours(1, wind_speed=5.0), 3, "stained")
+    windy = ScoreTable(waypoints, hours(1, wind_speed=15.0), 3, "stained")
+    assert calm.scores[0, 0] == calm.scores[1, 0]
+    assert windy.scores[0, 0] > windy.scores[1, 0]
+    assert len(windy.summaries) == 1
+
+
+def test_plan_follows_the_pattern_and_pays_for_runs():
+    # Shallow spawning flat early (pre-spawn) and offshore hump once the
+    # water warms into summer.
+    forecast = hours(6, temp_f=55.0) + hours(6, temp_f=84.0)
+    flat = wp("flat", 36.0, -86.0, ["spawning flat", "secondary point"], depth_ft=5.0)
+    hump = wp("hump", 36.0, -86.05, ["offshore hump", "ledge"], depth_ft=25.0)
+    result = plan_trip([flat, hump], forecast, 5, "stained", LAUNCH, start_hour=6, fishing_hours=(6, 18))
+    (day,) = result["days"]
+    assert [s["waypoint"] for s in day["stops"]] == ["flat", "hump"]
+    first, second = day["stops"]
+    assert first["phase"] == "pre-spawn" and second["phase"] == "summer"
+    assert second["start_hour"] == 6 and 0 < second["run_hours"] < 1
+    assert second["setup"]["rod"]
+
+    # Nearly three hours away: the run's whole hours are spent off the water.
+    far = {**hump, "lon": -88.0}
+    result = plan_trip([flat, far], forecast, 5, "stained", LAUNCH, start_hour=6, fishing_hours=(6, 18))
+    first, second = result["days"][0]["stops"]
+    assert second["run_hours"] > 2
+    assert second["start_hour"] >= first["end_hour"] + 2
+
+    # A spot further than a day's run is never chosen.
+    unreachable = {**hump, "lon": -100.0}
+    result = plan_trip([flat, unreachable], forecast, 5, "stained", LAUNCH, start_hour=6, fishing_hours=(6, 18))
+    assert [s["waypoint"] for s in result["days"][0]["stops"]] == ["flat"]
+
+
+def test_trip_plan_route():
+    body = {
+        "waypoints": [wp("a", 36.01, -86.0, ["dock"]), wp("b", 36.02, -86.01, ["channel swing"], depth_ft=12)],
+        "forecast": hours(48),
+        "month": 4,
+        "clarity": "clear",
+        "launch_lat": LAUNCH[0],
+        "launch_lon": LAUNCH[1],
+    }
+    resp = client.post("/trip/plan", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data["days"]) == 2
+    assert all(day["stops"] for day in data["days"])
+
+    bad = client.post("/trip/plan", json={**body, "boat_speed_mph": 0})
+    assert bad.status_code == 400
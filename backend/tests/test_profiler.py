@@ -0,0 +1,97 @@
+# tests/test_profiler.py
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.pattern_logic import build_pattern_summary
+from app.profiler import APP_MODULES, SamplingProfiler, profile
+
+client = TestClient(app)
+
+
+def busy_engine(stop: threading.Event) -> None:
+    while not stop.is_set():
+        build_pattern_summary(66.0, 5, "stained", 8.0, "cloudy", 6.0, "rock")
+
+
+@pytest.fixture
+def engine_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_engine, args=(stop,), name="engine worker")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_profiler_samples_other_threads(engine_thread):
+    profiler = SamplingProfiler(hz=200).run(0.3)
+    stats = profiler.stats()
+    assert stats["samples"] > 10
+
+    lines = profiler.collapsed().splitlines()
+    engine = [line for line in lines if line.startswith("engine_worker;")]
+    assert engine
+    assert any("app.pattern_logic:build_pattern_summary" in line for line in engine)
+    # Stacks are root-first and end in a count.
+    stack, count = engine[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[1].startswith("threading:")
+    # The sampler never profiles itself.
+    assert not any("sampling-profiler" in line for line in lines)
+
+
+def test_module_filter_keeps_only_app_frames(engine_thread):
+    profiler = SamplingProfiler(hz=200, modules=APP_MODULES).run(0.3)
+    stacks = [stack for stack, _ in profiler.stacks()]
+    assert stacks
+    for stack in stacks:
+        frames = stack.split(";")[1:]
+        assert all(f.split(":")[0] in APP_MODULES for f in frames)
+    assert any("app.pattern_logic:build_pattern_summary" in s for s in stacks)
+
+
+def test_only_one_profile_at_a_time():
+    results = []
+    t = threading.Thread(target=lambda: results.append(profile(0.3, 50)))
+    t.start()
+    try:
+        threading.Event().wait(0.05)
+        with pytest.raises(RuntimeError):
+            profile(0.1, 50)
+    finally:
+        t.join()
+    assert results[0].samples > 0
+
+
+def test_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        SamplingProfiler(hz=0)
+
+
+def test_admin_profile_requires_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.get("/admin/profile", params={"seconds": 0.1}).status_code == 403
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    resp = client.get("/admin/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": "wrong"})
+    assert resp.status_code == 403
+
+
+def test_admin_profile_returns_collapsed_stacks(monkeypatch, engine_thread):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    headers = {"X-Admin-Token": "s3cret"}
+
+    resp = client.get("/admin/profile", params={"seconds": 0.3, "hz": 100, "filter": "app"}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert int(resp.headers["x-profile-samples"]) > 5
+    assert float(resp.headers["x-profile-overhead"]) < 0.5
+    assert "app.pattern_logic:build_pattern_summary" in resp.text
+
+    bad = client.get("/admin/profile", params={"seconds": 600}, headers=headers)
+    assert bad.status_code == 400
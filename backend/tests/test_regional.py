@@ -0,0 +1,121 @@
+# tests/test_regional.py
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import http_cache, regional
+from app.main import app
+from app.pattern_logic import PHASES, classify_phase
+from app.regional import (
+    LAYER_TABLES,
+    RegionalTileStore,
+    classify_grid,
+    encode_png,
+    load_phase_grid,
+    precompute_phase_grids,
+    tile_bounds,
+)
+
+client = TestClient(app)
+
+
+def test_classify_grid_matches_scalar_classifier():
+    temps = np.array([[40.0, 49.9, 50.0, 59.9], [60.0, 70.0, 79.9, 95.0]], dtype=np.float32)
+    for month in (3, 6, 10):
+        classes = classify_grid(temps, month)
+        for (r, c), temp in np.ndenumerate(temps):
+            assert PHASES[classes[r, c] - 1] == classify_phase(float(temp), month)
+
+    assert classify_grid(np.array([[np.nan]]), 6)[0, 0] == 0
+
+
+def test_classify_grid_uses_row_latitudes():
+    temps = np.full((8, 3), 58.5, dtype=np.float32)
+    bounds = (-100.0, 25.0, -90.0, 49.0)
+    classes = classify_grid(temps, 4, bounds)
+    lats = regional.row_latitudes(8, bounds)
+
+    for r in range(8):
+        assert PHASES[classes[r, 0] - 1] == classify_phase(58.5, 4, latitude=float(lats[r]))
+    # Same water is pre-spawn down south but already spawning up north.
+    assert PHASES[classes[-1, 0] - 1] == "pre-spawn"
+    assert PHASES[classes[0, 0] - 1] == "spawn/post-spawn"
+
+
+def test_layer_tables_map_every_phase():
+    for layer, (labels, lut) in LAYER_TABLES.items():
+        assert labels[0] == "no data"
+        assert len(lut) == len(PHASES) + 1
+        assert lut[0] == 0
+        assert all(1 <= v < len(labels) for v in lut[1:])
+
+
+def test_encode_png_has_signature_and_chunks():
+    png = encode_png(np.zeros((4, 4), dtype=np.uint8), [(0, 0, 0), (255, 0, 0)])
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    assert b"IHDR" in png and b"PLTE" in png and b"tRNS" in png and png.endswith(b"IEND\xaeB`\x82")
+
+
+def make_store(temps):
+    # Raster covering exactly XYZ tile 6/16/24 (roughly the central US).
+    store = RegionalTileStore()
+    store.set_raster("lake", temps, tile_bounds(6, 16, 24))
+    return store
+
+
+def test_tile_cache_hits_and_invalidates_only_changed_tiles():
+    temps = np.full((64, 64), 55.0, dtype=np.float32)
+    store = make_store(temps)
+
+    # Four z=7 children of the raster's tile, each sampling one quadrant.
+    children = [(32, 48), (33, 48), (32, 49), (33, 49)]
+    for x, y in children:
+        store.tile("lake", "phase", 6, 7, x, y)
+    store.tile("lake", "phase", 6, 7, 32, 48)
+    assert store.stats == {"hits": 1, "misses": 4, "invalidated": 0}
+
+    # Warming a few cells in the north-west quadrant changes only that tile.
+    changed = temps.copy()
+    changed[2:5, 2:5] = 75.0
+    assert store.set_raster("lake", changed, tile_bounds(6, 16, 24)) == 1
+    assert len(store) == 3
+
+    # A change that keeps every cell in the same phase invalidates nothing.
+    same_phase = changed.copy()
+    same_phase[40:50, 40:50] = 58.0
+    assert store.set_raster("lake", same_phase, tile_bounds(6, 16, 24)) == 0
+
+
+def test_precomputed_grids_from_other_rules_are_ignored(tmp_path, monkeypatch):
+    temps = np.linspace(40.0, 90.0, 64, dtype=np.float32).reshape(8, 8)
+    np.savez(tmp_path / "lake.npz", temps=temps, bounds=np.array([-90.0, 30.0, -89.0, 31.0]))
+    precompute_phase_grids("lake", str(tmp_path))
+    grid = load_phase_grid("lake", 4, str(tmp_path))
+    assert grid is not None and (grid == classify_grid(temps, 4, (-90.0, 30.0, -89.0, 31.0))).all()
+
+    monkeypatch.setattr(http_cache, "ENGINE_VERSION", "stale-test")
+    assert load_phase_grid("lake", 4, str(tmp_path)) is None
+    store = RegionalTileStore(data_dir=str(tmp_path))
+    assert store.phase_grid("lake", 4).shape == temps.shape
+
+
+def test_regional_routes_serve_png_tiles(tmp_path, monkeypatch):
+    temps = np.full((32, 32), 72.0, dtype=np.float32)
+    temps[:4, :4] = np.nan
+    np.savez(tmp_path / "lake.npz", temps=temps, bounds=np.array(tile_bounds(6, 16, 24)))
+    monkeypatch.setattr(regional, "regional_tiles", RegionalTileStore(data_dir=str(tmp_path)))
+    monkeypatch.setattr("app.main.regional_tiles", regional.regional_tiles)
+
+    resp = client.get("/regional/lake/tiles/phase/6/16/24.png", params={"month": 7})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/png"
+    assert resp.content.startswith(b"\x89PNG")
+
+    assert client.get("/regional/lake/tiles/bogus/6/16/24.png").status_code == 404
+    assert client.get("/regional/missing/tiles/phase/6/16/24.png").status_code == 404
+
+    reload = client.post("/regional/lake/reload")
+    assert reload.json() == {"raster_id": "lake", "invalidated_tiles": 0}
+
+    labels = [c["label"] for c in client.get("/regional/legend").json()["phase"]]
+    assert labels == PHASES
@@ -103,3 +103,13 @@ def test_sonar_placeholder_returns_message_and_inputs():
     assert "message" in body
     assert "input" in body
     assert body["input"]["video_id"] == "abc123"
+
+
+def test_out_of_range_conditions_are_rejected():
+    payload = {"temp_f": 55.0, "month": 3, "clarity": "stained", "wind_speed": 8.0}
+    for bad in ({"month": 13}, {"month": 0}, {"day_of_year": 367}, {"latitude": -91.0}):
+        assert client.post("/pattern/basic", json={**payload, **bad}).status_code == 422, bad
+        pro = {**payload, "sky_condition": "cloudy", **bad}
+        assert client.get("/pattern/pro", params=pro).status_code == 422, bad
+
+    assert client.get("/regional/lake/tiles/phase/0/0/0.png", params={"month": 13}).status_code == 422
@@ -0,0 +1,106 @@
+# tests/test_snapshot.py
+
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import http_cache, snapshot
+from app.main import app
+from app.pattern_logic import build_basic_pattern_summary, build_pattern_summary
+from app.snapshot import EngineSnapshot
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("snapshot") / "engine.snap")
+    EngineSnapshot.build().save(path)
+    return path
+
+
+@pytest.fixture
+def use_snapshot(monkeypatch):
+    def install(path):
+        monkeypatch.setattr(snapshot, "ENGINE_SNAPSHOT_PATH", path)
+        monkeypatch.setattr(snapshot, "_snapshot", None)
+        monkeypatch.setattr(snapshot, "_snapshot_checked", False)
+        monkeypatch.setattr(snapshot, "_snapshot_error", None)
+        return snapshot.get_snapshot()
+
+    return install
+
+
+def test_snapshot_matches_live_engine(snapshot_path):
+    snap = EngineSnapshot.load(snapshot_path)
+    # Free-form spellings land on the same cells as the rules see them.
+    inputs = itertools.product(
+        [38.0, 58.0, 68.0, 86.0],
+        [3, 5, 10],
+        ["clear", " Stained", "MUDDY"],
+        [0.0, 3.0, 7.5, 10.0],
+        ["sunny", "Partly Sunny", "overcast"],
+        [None, 8.0, 15.0, 15.5],
+        [None, "chunk Rock", "vegetation and clay", "mud"],
+    )
+    for args in inputs:
+        assert json.dumps(snap.pattern_summary(*args)) == json.dumps(build_pattern_summary(*args)), args
+
+    kwargs = dict(latitude=44.0, day_of_year=250, temp_trend=-1.0)
+    assert snap.pattern_summary(70.0, 9, "clear", 5.0, "sunny", **kwargs) == build_pattern_summary(
+        70.0, 9, "clear", 5.0, "sunny", **kwargs
+    )
+    for temp in (40.0, 55.0, 65.0, 75.0, 85.0):
+        assert snap.basic_pattern_summary(temp, 4, "clear", 6.0) == build_basic_pattern_summary(temp, 4, "clear", 6.0)
+
+
+def test_unknown_clarity_falls_back_to_engine(snapshot_path):
+    snap = EngineSnapshot.load(snapshot_path)
+    assert snap.pattern_summary(60.0, 5, "tannic", 5.0, "sunny") is None
+
+
+def test_corrupt_file_fails_checksum(snapshot_path, tmp_path):
+    data = bytearray(open(snapshot_path, "rb").read())
+    data[-10] ^= 0xFF
+    bad = tmp_path / "bad.snap"
+    bad.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="checksum"):
+        EngineSnapshot.load(str(bad))
+
+    other = tmp_path / "other.snap"
+    other.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError, match="not an engine snapshot"):
+        EngineSnapshot.load(str(other))
+
+
+def test_stale_snapshot_is_rejected(snapshot_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "ENGINE_VERSION", "stale-test")
+    with pytest.raises(ValueError, match="engine_version"):
+        EngineSnapshot.load(snapshot_path)
+
+
+def test_routes_serve_from_snapshot(snapshot_path, use_snapshot):
+    assert use_snapshot(snapshot_path) is not None
+    status = client.get("/metrics").json()["engine_snapshot"]
+    assert status["loaded"] and status["error"] is None
+
+    params = {"temp_f": 63.0, "month": 5, "clarity": "stained", "wind_speed": 12.0, "sky_condition": "cloudy"}
+    resp = client.get("/pattern/pro", params=params)
+    assert resp.status_code == 200
+    assert resp.json() == json.loads(json.dumps(build_pattern_summary(**params)))
+
+
+def test_bad_snapshot_falls_back_to_rebuilding(tmp_path, use_snapshot):
+    bad = tmp_path / "bad.snap"
+    bad.write_bytes(b"garbage")
+    assert use_snapshot(str(bad)) is None
+    status = client.get("/metrics").json()["engine_snapshot"]
+    assert not status["loaded"] and "not an engine snapshot" in status["error"]
+
+    resp = client.post(
+        "/pattern/basic", json={"temp_f": 55.0, "month": 4, "clarity": "clear", "wind_speed": 4.0}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["phase"] == build_basic_pattern_summary(55.0, 4, "clear", 4.0)["phase"]
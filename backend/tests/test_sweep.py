@@ -0,0 +1,107 @@
+# tests/test_sweep.py
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.pattern_logic import build_basic_pattern_summary, build_pattern_summary
+from app.sweep import VOLATILE_FIELDS, intervals, locate, sweep
+
+client = TestClient(app)
+
+PRO = {
+    "month": 5,
+    "clarity": "clear",
+    "sky_condition": "sunny",
+    "bottom_composition": "rock",
+    "depth_ft": None,
+    "latitude": None,
+    "day_of_year": None,
+    "temp_trend": None,
+}
+
+
+def strip(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k not in VOLATILE_FIELDS}
+
+
+def test_intervals_follow_rule_comparisons():
+    # wind <= 3 is calm and wind >= 10 is windy, so 3 and 10 close differently.
+    assert intervals("wind_speed", 0.0, 25.0, {}) == [
+        (0.0, 3.0, True, True),
+        (3.0, 10.0, False, False),
+        (10.0, 25.0, True, True),
+    ]
+    # A range starting on a "<=" threshold gets a single-point interval.
+    assert intervals("wind_speed", 3.0, 5.0, {})[0] == (3.0, 3.0, True, True)
+    assert intervals("depth_ft", 8.0, 15.0, {}) == [(8.0, 15.0, True, True)]
+    assert intervals("wind_speed", 5.0, 5.0, {}) == [(5.0, 5.0, True, True)]
+
+
+@pytest.mark.parametrize(
+    "conditions",
+    [
+        {**PRO, "wind_speed": 6.0},
+        {**PRO, "wind_speed": 12.0, "month": 10, "clarity": "muddy", "depth_ft": 20.0},
+        {**PRO, "wind_speed": 2.0, "latitude": 46.0, "day_of_year": 130, "temp_trend": -1.0},
+    ],
+)
+def test_temperature_sweep_matches_dense_sampling(conditions):
+    fixed = {k: v for k, v in conditions.items() if k != "temp_f"}
+    result = sweep("pro", fixed, [{"param": "temp_f", "min": 40.0, "max": 90.0}])
+    segments = result["axes"][0]["segments"]
+    assert result["evaluations"] < 10
+
+    for temp in np.linspace(40.0, 90.0, 501):
+        expected = strip(build_pattern_summary(temp_f=float(temp), **fixed))
+        seg = segments[locate(segments, float(temp))]
+        assert result["summaries"][seg["summary"]] == expected, temp
+    # Merged: neighbouring segments always differ.
+    ids = [s["summary"] for s in segments]
+    assert all(a != b for a, b in zip(ids, ids[1:]))
+
+
+def test_two_dimensional_sweep_matches_dense_sampling():
+    axes = [{"param": "wind_speed", "min": 0.0, "max": 25.0}, {"param": "depth_ft", "min": 0.0, "max": 30.0}]
+    result = sweep("pro", {**PRO, "temp_f": 66.0}, axes)
+    wind_segs, depth_segs = (a["segments"] for a in result["axes"])
+    assert len(result["cells"]) == len(wind_segs)
+    assert all(len(row) == len(depth_segs) for row in result["cells"])
+
+    for wind in np.arange(0.0, 25.5, 0.5):
+        for depth in np.arange(0.0, 30.5, 1.0):
+            expected = strip(build_pattern_summary(66.0, 5, "clear", float(wind), "sunny", float(depth), "rock"))
+            cell = result["cells"][locate(wind_segs, wind)][locate(depth_segs, depth)]
+            assert result["summaries"][cell] == expected, (wind, depth)
+
+
+def test_basic_sweep_merges_wind():
+    result = sweep(
+        "basic",
+        {"temp_f": 55.0, "month": 4, "clarity": "stained"},
+        [{"param": "wind_speed", "min": 0.0, "max": 25.0}],
+    )
+    # BASIC output ignores wind entirely, so the whole range is one segment.
+    (segment,) = result["axes"][0]["segments"]
+    assert (segment["from"], segment["to"], segment["closed"]) == (0.0, 25.0, "both")
+    assert result["summaries"] == [strip(build_basic_pattern_summary(55.0, 4, "stained", 0.0))]
+
+
+def test_sweep_route():
+    body = {
+        "conditions": {"month": 5, "clarity": "clear", "sky_condition": "sunny"},
+        "axes": [{"param": "temp_f", "min": 40, "max": 90}, {"param": "wind_speed", "min": 0, "max": 25}],
+    }
+    resp = client.post("/pattern/pro/sweep", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [a["param"] for a in data["axes"]] == ["temp_f", "wind_speed"]
+    assert data["evaluations"] == len(data["axes"][0]["segments"]) * len(data["axes"][1]["segments"])
+
+    bad_param = {**body, "axes": [{"param": "depth_ft", "min": 0, "max": 20}]}
+    assert client.post("/pattern/basic/sweep", json=bad_param).status_code == 400
+    bad_range = {**body, "axes": [{"param": "temp_f", "min": 90, "max": 40}]}
+    assert client.post("/pattern/pro/sweep", json=bad_range).status_code == 400
+    missing = {**body, "conditions": {"month": 5}}
+    assert client.post("/pattern/pro/sweep", json=missing).status_code == 422